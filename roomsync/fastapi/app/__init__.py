@@ -1,29 +1,38 @@
 # fastapi/app/__init__.py
-from fastapi import FastAPI, APIRouter, Request, HTTPException
+from fastapi import FastAPI, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.db import Base, engine, SessionLocal
+from app.db import Base, engine
 from app.routers import auth
 from app.routers.profiles import router as profiles_router
 from app.routers.rooms import router as rooms_router
 from app.routers.equipments import router as equipments_router
 from app.routers.room_equipments import router as room_equipments_router
 from app.routers.bookings import router as bookings_router
+from app.routers.booking_series import router as booking_series_router
 from app.routers.damage_reports import router as damage_reports_router
+from app.routers.imports import router as imports_router
 from app.env_detector import should_auto_create_tables
-
-# Auto-migration on startup
+from app.pagination import NEXT_CURSOR_HEADER
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from app.request_metrics import RequestTimingMiddleware
+from app.services.identity_cache import identity_cache
+from app.services.oauth_http import oauth_http
+from app.services.password_hashing import password_hasher
+from app.services.db_sync import sync_worker
+from app.services.room_equipment_summary import ensure_summary_columns
+
+# ลงทะเบียนตารางก่อน create_all
 from app.models.authuser import AuthUser
 from app.models.room import Room
 
 import logging
 import os
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from jose import JWTError
 from jose.exceptions import ExpiredSignatureError
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request as StarletteRequest
-from jose import jwt
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 # Configure logging
 logging.basicConfig(
@@ -52,43 +61,72 @@ fastapi_app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
+)
+
+
+# path ที่ไม่ต้องเช็ค JWT/CSRF (รวมแบบมี api_prefix ตอนรันบน Vercel)
+JWT_EXCLUDED_PATHS = frozenset(
+    prefix + path
+    for path in ("/", "/login", "/login/email", "/register", "/google/auth", "/logout")
+    for prefix in {"", api_prefix}
 )
+JWT_PROTECTED_METHODS = frozenset(("POST", "PUT", "DELETE"))
+
+
+class JWTAndCSRFMiddleware:
+    """
+    เช็ค JWT cookie + X-CSRF-Token ของ POST/PUT/DELETE (pure ASGI)
 
+    ไม่ใช้ BaseHTTPMiddleware → ไม่มี task/memory stream ต่อ request และไม่บล็อก streaming response
+    request อื่น ๆ ส่งต่อทันทีโดยไม่แตะ header เลย
+    """
 
-class JWTAndCSRFMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: StarletteRequest, call_next):
-        excluded_paths = ["/", "/login", "/login/email", "/register", "/google/auth", "/logout"]
-        logger.debug(f"Request method: {request.method}, path: {request.url.path}")
-        if request.method not in ["POST", "PUT", "DELETE"] or request.url.path in excluded_paths:
-            logger.debug("Skipping JWT/CSRF validation for this request")
-            return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        token = request.cookies.get("jwt")
-        logger.debug(f"JWT cookie: {token}")
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in JWT_PROTECTED_METHODS
+            or scope["path"] in JWT_EXCLUDED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        cookie_header = client_csrf = None
+        for name, value in scope["headers"]:
+            if name == b"cookie" and cookie_header is None:
+                cookie_header = value.decode("latin-1")
+            elif name == b"x-csrf-token" and client_csrf is None:
+                client_csrf = value.decode("latin-1")
+
+        token = cookie_parser(cookie_header).get("jwt") if cookie_header else None
         if not token:
             logger.error("Missing JWT cookie in middleware")
-            raise HTTPException(status_code=401, detail="Missing JWT cookie")
+            await JSONResponse(status_code=401, content={"detail": "Missing JWT cookie"})(scope, receive, send)
+            return
 
         try:
-            payload = jwt.decode(
-                token, settings.jwt_secret_key, algorithms=["HS256"])
-            logger.debug(f"JWT payload: {payload}")
+            # verify ครั้งเดียวต่อ token (cache จนถึง exp) แล้วฝากไว้ให้ get_current_user ใช้ต่อ
+            identity = identity_cache.verify(token)
         except JWTError as e:
             logger.error(f"JWT decoding failed in middleware: {e}")
-            raise HTTPException(
-                status_code=401, detail="Invalid or expired token")
+            await JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})(scope, receive, send)
+            return
 
-        client_csrf = request.headers.get("X-CSRF-Token")
-        logger.debug(f"Client CSRF token: {client_csrf}")
-        if not client_csrf or payload.get("csrf_token") != client_csrf:
+        if not client_csrf or identity.payload.get("csrf_token") != client_csrf:
             logger.error("CSRF token mismatch in middleware")
-            raise HTTPException(status_code=403, detail="CSRF token mismatch")
+            await JSONResponse(status_code=403, content={"detail": "CSRF token mismatch"})(scope, receive, send)
+            return
 
-        response = await call_next(request)
-        return response
+        scope.setdefault("state", {})["identity"] = identity  # → request.state.identity
+        await self.app(scope, receive, send)
 
 
 fastapi_app.add_middleware(JWTAndCSRFMiddleware)
+# ชั้นนอกสุด → เวลารวมนับ JWT/CORS ด้วย (Server-Timing + /metrics ต่อ route)
+fastapi_app.add_middleware(RequestTimingMiddleware)
 fastapi_app.state.settings = settings
 
 # Auto-detect environment and conditionally create tables
@@ -96,6 +134,7 @@ try:
     if should_auto_create_tables():
         logger.info("Auto-creating database tables (Docker)")
         Base.metadata.create_all(bind=engine)
+        ensure_summary_columns(engine)  # DB เก่าที่ยังไม่มี rooms.equipment_types / equipment_total
     else:
         logger.info("Skipping table creation (Vercel/Local)")
 except Exception as e:
@@ -103,34 +142,12 @@ except Exception as e:
     # Don't fail the app if table creation fails
 
 
-# Auto-migration on startup
-async def migrate_on_startup():
-    """Automatically migrate AuthUser data from Supabase to local DB if enabled"""
-    if not settings.use_supabase:
-        logger.info("Skipping AuthUser migration (USE_SUPABASE=false)")
-        return
-    
-    try:
-        logger.info("Starting AuthUser migration from Supabase to local...")
-        db = SessionLocal()
-        
-        # Count existing users
-        existing_users = db.query(AuthUser).count()
-        existing_rooms = db.query(Room).count()
-        logger.info(f"Local database has {existing_users} AuthUsers")
-        logger.info(f"Local database has {existing_rooms} Rooms")
-        
-        # Perform migration (users should already be in local due to table creation)
-        # This is a placeholder for any additional sync logic
-        logger.info("Data migration complete")
-        
-        db.close()
-    except Exception as e:
-        logger.error(f"Error during AuthUser migration: {e}")
-        # Don't fail the app if migration fails
-
-
-fastapi_app.add_event_handler("startup", migrate_on_startup)
+# Incremental sync Supabase → local (SUPABASE_SYNC_INTERVAL_SECONDS > 0, see app/services/db_sync.py)
+fastapi_app.add_event_handler("startup", sync_worker.start)
+fastapi_app.add_event_handler("startup", oauth_http.start)
+fastapi_app.add_event_handler("shutdown", sync_worker.stop)
+fastapi_app.add_event_handler("shutdown", password_hasher.shutdown)
+fastapi_app.add_event_handler("shutdown", oauth_http.aclose)
 
 auth_router = APIRouter()
 auth.register_routes(auth_router)
@@ -142,7 +159,21 @@ fastapi_app.include_router(rooms_router, prefix=f"{api_prefix}/api/v1")
 fastapi_app.include_router(equipments_router, prefix=f"{api_prefix}/api/v1")
 fastapi_app.include_router(room_equipments_router, prefix=f"{api_prefix}/api/v1")
 fastapi_app.include_router(bookings_router, prefix=f"{api_prefix}/api/v1")
+fastapi_app.include_router(booking_series_router, prefix=f"{api_prefix}/api/v1")
 fastapi_app.include_router(damage_reports_router, prefix=f"{api_prefix}/api/v1")
+fastapi_app.include_router(imports_router, prefix=f"{api_prefix}/api/v1")
+
+
+@fastapi_app.get(f"{api_prefix}/health")
+async def health_check():
+    """เช็คสถานะ API (สำหรับ monitoring)"""
+    return {"status": "healthy"}
+
+
+@fastapi_app.get(f"{api_prefix}/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics ของ worker นี้ (DB pool, latency / SQL ต่อ route ฯลฯ)"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
 
 
 @fastapi_app.exception_handler(JWTError)
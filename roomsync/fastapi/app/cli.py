@@ -1,23 +1,26 @@
 #!/usr/bin/env python3
 """
 CLI commands for app management
-Usage: python -m app.cli migrate
+Usage: python -m app.cli migrate [--workers 4] [--table bookings] [--restart]
+       python -m app.cli sync [--watch 300] [--reset]
+       python -m app.cli import-data rooms rooms.csv [--dry-run]
+       python -m app.cli reconcile-room-equipment [--dry-run]
+       python -m app.cli generate-data [--rooms 10000 --profiles 100000 --bookings 1000000] [--seed 7]
 """
+import asyncio
 import sys
 import click
 from pathlib import Path
 from dotenv import load_dotenv
-from roomsync.fastapi.app.models.room import Room
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 # Load environment
 env_file = Path(__file__).resolve().parent.parent / ".env"
 if env_file.exists():
     load_dotenv(env_file)
 
-from app.models.authuser import AuthUser
 from app.db import Base
+from app.services.room_equipment_summary import ensure_summary_columns
 import os
 
 @click.group()
@@ -27,92 +30,280 @@ def cli():
 
 
 @cli.command()
-def migrate():
-    """Migrate AuthUser data from Supabase to local database"""
-    
+@click.option("--table", "tables", multiple=True, help="Copy only these tables (repeatable, default: all)")
+@click.option("--chunk-size", type=int, default=None, help="Rows per keyset read/upsert/commit batch (default: MIGRATE_CHUNK_SIZE)")
+@click.option("--workers", type=int, default=1, show_default=True, help="Tables copied in parallel (tables without FKs between them)")
+@click.option("--checkpoint", default="migrate_checkpoint.json", show_default=True, help="Resume file, removed after a complete run")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint and copy everything again")
+def migrate(tables, chunk_size, workers, checkpoint, restart):
+    """Copy all tables from Supabase (SUPABASE_DB_URL) to the local database (DATABASE_URL)"""
+    from app.config import settings
+    from app.services.db_copy import COPY_TABLES, CopyError, copy_database
+
     SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
     LOCAL_DB_URL = os.getenv("DATABASE_URL")
-    
+
     if not SUPABASE_DB_URL or not LOCAL_DB_URL:
         click.echo("❌ Error: SUPABASE_DB_URL or DATABASE_URL not set in .env", err=True)
         sys.exit(1)
-    
+    unknown = [name for name in tables if name not in COPY_TABLES]
+    if unknown:
+        click.echo(f"❌ Error: unknown tables {', '.join(unknown)} (choose from {', '.join(COPY_TABLES)})", err=True)
+        sys.exit(1)
+
     click.echo(f"📦 Source: {SUPABASE_DB_URL[:40]}...")
     click.echo(f"📦 Destination: {LOCAL_DB_URL[:40]}...")
-    
+
+    pool_size = max(workers, 1) + 1
+    supabase_engine = create_engine(SUPABASE_DB_URL, pool_pre_ping=True, pool_size=pool_size)
+    local_engine = create_engine(LOCAL_DB_URL, pool_pre_ping=True, pool_size=pool_size)
     try:
-        supabase_engine = create_engine(SUPABASE_DB_URL, pool_pre_ping=True)
-        local_engine = create_engine(LOCAL_DB_URL, pool_pre_ping=True)
-        
-        SupabaseSession = sessionmaker(bind=supabase_engine)
-        LocalSession = sessionmaker(bind=local_engine)
-        
         Base.metadata.create_all(local_engine)
+        ensure_summary_columns(local_engine)
         click.echo("✓ Tables ready")
-        
-        supabase_db = SupabaseSession()
-        local_db = LocalSession()
-        
-        supabase_users = supabase_db.query(AuthUser).all()
-        supabase_rooms = supabase_db.query(Room).all()
-        
-        click.echo(f"Found {len(supabase_users)} users\n")
-        click.echo(f"Found {len(supabase_rooms)} rooms\n")
-        
-        if len(supabase_users) == 0 and len(supabase_rooms) == 0:
-            click.echo("✅ No data to migrate")
-            return
-        
-        existing_emails = set(u.email for u in local_db.query(AuthUser).all())
-        migrated_users_count = 0
-        migrated_rooms_count = 0
-        
-        for user in supabase_users:
-            if user.email in existing_emails:
-                click.echo(f"  ⊘ Skipped: {user.email}")
-                continue
-            
-            new_user = AuthUser(
-                email=user.email,
-                name=user.name,
-                avatar_url=user.avatar_url,
-                password_hash=user.password_hash
+
+        report = copy_database(
+            supabase_engine,
+            local_engine,
+            tables=tables or None,
+            chunk_size=chunk_size or settings.migrate_chunk_size,
+            workers=workers,
+            checkpoint_path=checkpoint,
+            restart=restart,
+        )
+    except CopyError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        supabase_engine.dispose()
+        local_engine.dispose()
+
+    for table in report.tables:
+        if table.error:
+            click.echo(f"  ✗ {table.table}: {table.error}")
+        elif table.missing:
+            click.echo(f"  ⊘ {table.table}: not in source, skipped")
+        elif table.resumed and not table.copied and not table.seconds:
+            click.echo(f"  ⊘ {table.table}: done in a previous run")
+        else:
+            skipped = f", {table.skipped} skipped (unique conflict)" if table.skipped else ""
+            if table.orphaned:
+                skipped += f", {table.orphaned} skipped (parent row missing)"
+            resumed = " (resumed)" if table.resumed else ""
+            click.echo(
+                f"  ✓ {table.table}: {table.copied} rows{skipped} in {table.seconds:.1f}s "
+                f"({table.rows_per_second:,.0f} rows/s){resumed}"
             )
-            new_user.id = user.id
-            local_db.add(new_user)
-            click.echo(f"  ✓ Migrated: {user.email}")
-            migrated_users_count += 1
-        
-        for room in supabase_rooms:
-            try:
-                new_room = Room(
-                    name=room.name,
-                    description=room.description,
-                    capacity=room.capacity,
-                    location=room.location
-                )
-                new_room.id = room.id
-                local_db.add(new_room)
-                click.echo(f"  ✓ Migrated room: {room.name}")
-                migrated_rooms_count += 1
-            except Exception as e:
-                click.echo(f"  ✗ Error migrating room {room.name}: {e}")
-        
-        local_db.commit()
-        
-        local_users = local_db.query(AuthUser).all()
-        local_rooms = local_db.query(Room).all()
-        click.echo()
-        
-        click.echo(f"✅ Complete! Migrated {migrated_users_count} users, Total: {len(local_users)}")
-        click.echo(f"✅ Complete! Migrated {migrated_rooms_count} rooms, Total: {len(local_rooms)}")
-        
-    except Exception as e:
+    if report.busy_slot_rooms:
+        click.echo(f"  ✓ room_busy_slots rebuilt for {report.busy_slot_rooms} rooms")
+    if report.summary_rooms:
+        click.echo(f"  ✓ equipment summary recomputed for {report.summary_rooms} rooms")
+
+    if report.failed:
+        click.echo(f"❌ Stopped, run again to resume from {checkpoint}", err=True)
+        sys.exit(1)
+    click.echo(f"✅ Complete! {report.copied} rows in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+
+
+@cli.command()
+@click.option("--table", "tables", multiple=True, help="Sync only these tables (repeatable, default: all with updated_at)")
+@click.option("--batch-size", type=int, default=None, help="Changed rows per read/upsert/commit batch (default: SYNC_BATCH_SIZE)")
+@click.option("--reset", is_flag=True, help="Forget the high-water marks and pull every row again")
+@click.option("--watch", type=int, default=0, help="Keep running, syncing every N seconds")
+def sync(tables, batch_size, reset, watch):
+    """Pull rows changed since the last sync from Supabase (SUPABASE_DB_URL) into DATABASE_URL"""
+    import time
+
+    from app.config import settings
+    from app.services.db_sync import SYNC_TABLES, IncrementalSync, SyncError, invalidate_profiles, source_engine
+
+    SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+    LOCAL_DB_URL = os.getenv("DATABASE_URL")
+
+    if not SUPABASE_DB_URL or not LOCAL_DB_URL:
+        click.echo("❌ Error: SUPABASE_DB_URL or DATABASE_URL not set in .env", err=True)
+        sys.exit(1)
+    unknown = [name for name in tables if name not in SYNC_TABLES]
+    if unknown:
+        click.echo(f"❌ Error: unknown tables {', '.join(unknown)} (choose from {', '.join(SYNC_TABLES)})", err=True)
+        sys.exit(1)
+
+    supabase_engine = source_engine(SUPABASE_DB_URL)
+    local_engine = create_engine(LOCAL_DB_URL, pool_pre_ping=True)
+    syncer = IncrementalSync(
+        supabase_engine,
+        local_engine,
+        batch_size or settings.sync_batch_size,
+        settings.sync_overlap_seconds,
+    )
+    try:
+        Base.metadata.create_all(local_engine)
+        ensure_summary_columns(local_engine)
+        while True:
+            report = syncer.run(tables or None, reset=reset)
+            reset = False
+            if report.locked:
+                click.echo("⊘ Another sync is running, skipped")
+            for table in report.tables:
+                if table.error:
+                    click.echo(f"  ✗ {table.table}: {table.error}")
+                elif table.missing:
+                    click.echo(f"  ⊘ {table.table}: not in source, skipped")
+                else:
+                    skipped = f", {table.skipped} skipped (unique conflict)" if table.skipped else ""
+                    if table.orphaned:
+                        skipped += f", {table.orphaned} skipped (parent row missing)"
+                    high_water = table.high_water_at.isoformat() if table.high_water_at else "-"
+                    click.echo(
+                        f"  ✓ {table.table}: {table.synced} rows{skipped} in {table.seconds:.1f}s "
+                        f"({table.rows_per_second:,.0f} rows/s), up to {high_water}"
+                    )
+            if report.busy_slot_rooms:
+                click.echo(f"  ✓ room_busy_slots rebuilt for {report.busy_slot_rooms} rooms")
+            if report.summary_rooms:
+                click.echo(f"  ✓ equipment summary recomputed for {report.summary_rooms} rooms")
+            if report.profile_auth_ids:
+                # มีผลกับ app เมื่อใช้ PROFILE_CACHE_REDIS_URL ร่วมกัน (cache แบบ local เป็นของ process นี้)
+                asyncio.run(invalidate_profiles(report.profile_auth_ids))
+            if report.failed:
+                click.echo("❌ Sync failed, the next run continues from the saved high-water marks", err=True)
+                if not watch:
+                    sys.exit(1)
+            elif not report.locked:
+                click.echo(f"✅ {report.synced} rows in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+            if not watch:
+                break
+            time.sleep(watch)
+    except SyncError as e:
         click.echo(f"❌ Error: {e}", err=True)
         sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supabase_engine.dispose()
+        local_engine.dispose()
+
+
+@cli.command("import-data")
+@click.argument("kind", type=click.Choice(["rooms", "equipments", "room-equipments"]))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--format", "import_format", type=click.Choice(["csv", "json", "ndjson"]), help="Default: from the file extension")
+@click.option("--chunk-size", type=int, default=None, help="Rows per validate/upsert/commit batch (default: IMPORT_CHUNK_SIZE)")
+@click.option("--dry-run", is_flag=True, help="Validate and count only, write nothing")
+def import_data(kind, path, import_format, chunk_size, dry_run):
+    """Bulk import rooms, equipments or room-equipment assignments from CSV/JSON/NDJSON"""
+    from app.config import settings
+    from app.db import SessionLocal
+    from app.services.bulk_import import format_from_filename, import_file
+
+    import_format = import_format or format_from_filename(path.name)
+    if not import_format:
+        click.echo("❌ Error: cannot tell the format from the file name, use --format", err=True)
+        sys.exit(1)
+
+    click.echo(f"📦 Importing {kind} from {path} ({import_format}{', dry run' if dry_run else ''})")
+    db = SessionLocal()
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = import_file(
+                db, kind, stream, import_format,
+                chunk_size=chunk_size or settings.import_chunk_size,
+                dry_run=dry_run,
+                max_errors=settings.import_max_errors,
+            )
     finally:
-        supabase_db.close()
-        local_db.close()
+        db.close()
+
+    for error in report.errors:
+        click.echo(f"  ✗ Row {error.row}: {error.error}")
+    if report.errors_truncated:
+        click.echo(f"  … {report.failed - len(report.errors)} more errors")
+    if report.error:
+        click.echo(f"❌ Stopped: {report.error}", err=True)
+    click.echo(
+        f"✅ {report.total} rows: {report.created} created, {report.updated} updated, {report.failed} failed"
+    )
+    if report.error or report.failed:
+        sys.exit(1)
+
+
+@cli.command("generate-data")
+@click.option("--rooms", type=int, default=1_000, show_default=True)
+@click.option("--equipments", type=int, default=50, show_default=True)
+@click.option("--profiles", type=int, default=10_000, show_default=True)
+@click.option("--bookings", type=int, default=100_000, show_default=True, help="Spread evenly over the new rooms, never overlapping")
+@click.option("--damage-reports", type=int, default=2_000, show_default=True)
+@click.option("--seed", type=int, default=42, show_default=True, help="Same seed and anchor, same data; a seed already in the DB is refused, use another to add more")
+@click.option("--anchor-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="\"Now\" of the generated data: timestamps and past/future booking statuses [default: 2026-01-05]")
+@click.option("--start", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First booking day (default: half of the bookings end before the anchor date)")
+@click.option("--batch-size", type=int, default=5_000, show_default=True, help="Rows per bulk insert/commit")
+def generate_data(rooms, equipments, profiles, bookings, damage_reports, seed, anchor_date, start, batch_size):
+    """Fill DATABASE_URL with synthetic, referentially consistent data for load testing"""
+    from app.db import engine
+    from app.services.synthetic_data import DEFAULT_ANCHOR, generate
+
+    click.echo(f"📦 Database: {engine.url.render_as_string(hide_password=True)[:40]}...")
+    Base.metadata.create_all(engine)
+    ensure_summary_columns(engine)
+
+    def progress(table, rows, seconds):
+        rate = f" ({rows / seconds:,.0f} rows/s)" if seconds else ""
+        click.echo(f"  ✓ {table}: {rows} rows in {seconds:.1f}s{rate}")
+
+    try:
+        report = generate(
+            engine,
+            rooms=rooms,
+            equipments=equipments,
+            profiles=profiles,
+            bookings=bookings,
+            damage_reports=damage_reports,
+            seed=seed,
+            start=start.date() if start else None,
+            anchor=anchor_date.date() if anchor_date else DEFAULT_ANCHOR,
+            batch_size=batch_size,
+            progress=progress,
+        )
+    except ValueError as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+    click.echo(f"✅ {report.total} rows in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+
+
+@cli.command("reconcile-room-equipment")
+@click.option("--dry-run", is_flag=True, help="Report rooms whose counters drifted, fix nothing")
+@click.option("--show", type=int, default=20, show_default=True, help="Drifted rooms to list")
+def reconcile_room_equipment(dry_run, show):
+    """Recompute rooms.equipment_types / equipment_total from room_equipments"""
+    from sqlalchemy.orm import Session
+
+    from app.db import engine
+    from app.services.room_equipment_summary import find_drift, missing_summary_columns, refresh_summaries
+
+    click.echo(f"📦 Database: {engine.url.render_as_string(hide_password=True)[:40]}...")
+    Base.metadata.create_all(engine)
+    if dry_run:
+        missing = missing_summary_columns(engine)
+        if missing:
+            click.echo(f"⚠️  rooms is missing {', '.join(missing)} (run without --dry-run to add them)")
+            return
+    else:
+        for name in ensure_summary_columns(engine):
+            click.echo(f"  ✓ Added rooms.{name} (filled from room_equipments)")
+
+    with Session(engine) as db:
+        drift = find_drift(db, limit=show)
+        for item in drift:
+            click.echo(
+                f"  ✗ {item.name} ({item.room_id}): types {item.stored_types} → {item.actual_types}, "
+                f"total {item.stored_total} → {item.actual_total}"
+            )
+        if dry_run:
+            click.echo(f"✅ Dry run: {len(drift)}{'+' if len(drift) == show else ''} rooms drifted")
+            return
+        fixed = refresh_summaries(db)
+        db.commit()
+    click.echo(f"✅ {fixed} rooms fixed")
 
 
 if __name__ == "__main__":
@@ -78,6 +78,75 @@ class Settings(BaseSettings):
     frontend_login_success_uri: str = "http://localhost:8080/login-success"  # Default
     frontend_login_failure_uri: str = "http://localhost:8080/login-failed"  # Default
 
+    # Dashboard counters (per-process cache, see app/services/counters.py)
+    dashboard_counter_ttl_seconds: int = 30
+
+    # Streaming exports (see app/services/export.py): rows per server-side cursor batch
+    export_chunk_size: int = 1000
+
+    # Bulk imports (see app/services/bulk_import.py): rows validated/upserted/committed per chunk
+    import_chunk_size: int = 500
+    import_max_errors: int = 1000  # per-row errors kept in the report
+
+    # Supabase -> local copier (see app/services/db_copy.py): rows read/upserted/committed per chunk
+    migrate_chunk_size: int = 1000
+
+    # Incremental Supabase -> local sync by updated_at (see app/services/db_sync.py)
+    supabase_sync_interval_seconds: int = 0  # background sync while the app runs; 0 = off (CLI: app.cli sync)
+    sync_batch_size: int = 1000
+    sync_overlap_seconds: int = 60  # re-read window before the high-water mark (late commits)
+
+    # Engine mode: "auto" (serverless on Vercel, pooled elsewhere), "serverless" (NullPool, no prepared
+    # statements; use with Supabase's transaction pooler) or "pooled" (QueuePool below)
+    db_engine_mode: str = "auto"
+
+    # Connection pool per process (see app/db.py); keep workers x (size + overflow) under the DB's max_connections
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a connection before "QueuePool limit ... overflow"
+    db_pool_recycle: int = 1800  # seconds; -1 = never recycle
+    db_pool_pre_ping: bool = True  # SELECT 1 on every checkout; with False, rely on db_pool_recycle
+
+    # Verified-JWT cache per process (see app/services/identity_cache.py); 0 disables it
+    jwt_cache_size: int = 10000
+    # How long a resolved AuthUser is reused per token; 0 queries the user on every request
+    jwt_user_cache_ttl_seconds: int = 60
+
+    # Profile cache for X-Auth-User-ID lookups (see app/services/profile_cache.py); only student
+    # profiles are cached, admin/teacher are loaded from the DB on every request;
+    # set profile_cache_redis_url to share one cache across workers (needs the redis package)
+    profile_cache_ttl_seconds: int = 60
+    profile_cache_size: int = 5000
+    profile_cache_redis_url: Optional[str] = None
+
+    # Password hashing (see app/services/password_hashing.py); changing bcrypt_rounds rehashes on next login
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64  # waiting jobs before /login/email and /register answer 503; 0 = unbounded
+
+    # Outbound HTTP to Google/GitHub (one pooled client per process, see app/services/oauth_http.py);
+    # oauth_stub_provider answers OAuth locally instead (tests / offline dev, see app/services/oauth_stub.py)
+    # and is refused on Vercel or with APP_ENV=production
+    oauth_http_timeout_seconds: float = 10.0
+    oauth_http_max_connections: int = 20
+    oauth_http_keepalive_seconds: float = 60.0
+    oauth_discovery_ttl_seconds: int = 3600
+    oauth_stub_provider: bool = False
+
+    # Per-request timing (see app/request_metrics.py): Server-Timing header on every response,
+    # and a warning log when one request runs more SQL statements than the threshold (0 = never)
+    server_timing_enabled: bool = True
+    request_query_warn_threshold: int = 50
+
+    # Async DB sessions (True = AsyncEngine via asyncpg/aiosqlite, False = sync Session on the threadpool; see app/db.py)
+    db_async: bool = False
+
+    @validator("db_engine_mode")
+    def check_db_engine_mode(cls, v):
+        if v not in ("auto", "serverless", "pooled"):
+            raise ValueError("db_engine_mode must be one of: auto, serverless, pooled")
+        return v
+
     @validator("allowed_origins", pre=True, always=True)
     def assemble_allowed_origins(cls, v):
         logging.info(f"Raw value for allowed_origins: {v!r}")
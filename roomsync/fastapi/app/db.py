@@ -1,21 +1,164 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.env_detector import detect_environment
+from app.metrics import registry
+from app.request_metrics import record_loaded_row, record_statement
+from typing import Optional
+from uuid import uuid4
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+
+# ════════════════════════════════════════════════════════════════
+# CONNECTION POOL + METRICS
+# ════════════════════════════════════════════════════════════════
+# ขนาด pool ต่อ process: workers × (db_pool_size + db_max_overflow) ต้องไม่เกิน max_connections ของ DB
+# (gunicorn.config.py: workers = 2, threads = 2)
+POOL_CHECKOUTS = registry.counter("db_pool_checkouts_total", "Connections checked out of the pool")
+POOL_CONNECTS = registry.counter("db_pool_connects_total", "New DBAPI connections opened by the pool")
+POOL_INVALIDATIONS = registry.counter("db_pool_invalidations_total", "Pooled connections invalidated (disconnects, failed pre-ping)")
+POOL_TIMEOUTS = registry.counter("db_pool_timeouts_total", "Checkouts that gave up after db_pool_timeout (QueuePool limit overflow)")
+POOL_WAIT = registry.histogram("db_pool_wait_seconds", "Time to get a connection from the pool, including opening a new one")
+POOL_CONNECTIONS = registry.gauge("db_pool_connections", "Pool connections by state (checked_out, idle, overflow)")
+POOL_SIZE = registry.gauge("db_pool_size", "Configured pool_size")
+
+_instrumented_engines = {}
+
+
+class _TimedCheckoutMixin:
+    """จับเวลารอ connection (QueuePool ไม่มี event ให้ตอนรอ จึง override _do_get)"""
+    engine_label: str
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.engine_label)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, engine=self.engine_label)
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    engine_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def engine_mode() -> str:
+    """
+    serverless = NullPool: เปิด/ปิด connection ต่อ request (Vercel: แต่ละ instance อายุสั้น
+                 ถ้าถือ pool ไว้ cold start ซ้อนกันจะกิน connection ของ Supabase จนหมด)
+    pooled     = QueuePool ตาม db_pool_* (Docker / local: process อยู่ยาว)
+    """
+    if settings.db_engine_mode != "auto":
+        return settings.db_engine_mode
+    return "serverless" if detect_environment() == "vercel" else "pooled"
+
+
+def pool_options(url: str, poolclass, mode: Optional[str] = None) -> dict:
+    """kwargs ของ create_engine จาก Settings (SQLite in-memory ใช้ pool เฉพาะของมันเอง)"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {"pool_pre_ping": settings.db_pool_pre_ping}
+
+    if (mode or engine_mode()) == "serverless":
+        # connection ใหม่ทุกครั้ง → pre-ping ไม่มีประโยชน์
+        options = {"poolclass": NullPool, "pool_pre_ping": False}
+        if parsed.get_driver_name() == "asyncpg":
+            # transaction pooler (Supavisor/PgBouncer :6543) ไม่รองรับ prepared statement ข้าม transaction
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def instrument_engine(sync_engine, label: str) -> None:
+    """ผูก pool + SQL events ของ engine เข้ากับ metrics (async engine ส่ง .sync_engine มา)"""
+    _instrumented_engines[label] = sync_engine
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKOUTS.inc(engine=label)
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.inc(engine=label)
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.inc(engine=label, soft="false")
+
+    @event.listens_for(sync_engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.inc(engine=label, soft="true")
+
+    # เวลา/จำนวน statement ต่อ request (app/request_metrics.py); executemany นับเป็น 1 statement
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        rowcount = cursor.rowcount if cursor.description is None else 0  # SELECT นับจาก ORM load แทน
+        record_statement(label, time.perf_counter() - context.query_started, rowcount)
+
+
+def _pool_connection_samples():
+    for label, sync_engine in list(_instrumented_engines.items()):
+        pool = sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        yield {"engine": label, "state": "checked_out"}, pool.checkedout()
+        yield {"engine": label, "state": "idle"}, pool.checkedin()
+        yield {"engine": label, "state": "overflow"}, max(pool.overflow(), 0)
+
+
+def _pool_size_samples():
+    for label, sync_engine in list(_instrumented_engines.items()):
+        pool = sync_engine.pool
+        if isinstance(pool, QueuePool):
+            yield {"engine": label}, pool.size()
+
+
+POOL_CONNECTIONS.set_function(_pool_connection_samples)
+POOL_SIZE.set_function(_pool_size_samples)
+
+
 try:
-    # Simple engine creation for Vercel serverless
-    engine = create_engine(settings.database_url, pool_pre_ping=True)
+    # Vercel serverless → NullPool, Docker → QueuePool (ดู engine_mode())
+    engine = create_engine(settings.database_url, **pool_options(settings.database_url, InstrumentedQueuePool))
+    instrument_engine(engine, "sync")
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    logger.info("Database engine created successfully")
+    logger.info(f"Database engine created successfully ({engine.pool.__class__.__name__})")
 except Exception as e:
     logger.error(f"Error creating database engine: {e}")
     raise
 
 Base = declarative_base()
+event.listen(Base, "load", record_loaded_row, propagate=True)
 
 
 def get_db():
@@ -24,3 +167,127 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ════════════════════════════════════════════════════════════════
+# ASYNC SESSION (router ใช้ get_async_db)
+# ════════════════════════════════════════════════════════════════
+# settings.db_async = True  → AsyncEngine จริง (asyncpg / aiosqlite) ไม่กิน thread
+# settings.db_async = False → Session ปกติ ห่อด้วย ThreadpoolSession (I/O วิ่งบน threadpool)
+# router เขียนแบบ await ชุดเดียว ใช้ได้ทั้งสองโหมด → สลับโหมดเพื่อวัดผลตอน load test ได้
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# เหมือน AsyncSession: ดึงทุกแถวมาไว้ก่อน ไม่อ่าน cursor บน event loop
+_EXECUTE_OPTIONS = {"prebuffer_rows": True}
+
+
+def async_database_url(url: str) -> str:
+    """แปลง DATABASE_URL (psycopg2 / sqlite) เป็น URL ของ async driver"""
+    parsed = make_url(url)
+    backend = parsed.drivername.split("+")[0]
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    parsed = parsed.set(drivername=_ASYNC_DRIVERS[backend])
+    # asyncpg ไม่รู้จัก sslmode (ของ libpq) → ใช้ ssl แทน
+    if "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+class ThreadpoolSession:
+    """
+    ห่อ Session ปกติให้ await ได้เหมือน AsyncSession (ใช้ตอน db_async = False)
+
+    รองรับเฉพาะ method ที่ router ใช้ งานที่แตะ DB ทุกตัวส่งไปทำบน threadpool
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def info(self):
+        return self.sync_session.info
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, *, execution_options=None, **kw):
+        options = {**_EXECUTE_OPTIONS, **(execution_options or {})}
+        return await run_in_threadpool(
+            self.sync_session.execute, statement, params, execution_options=options, **kw
+        )
+
+    async def scalars(self, statement, params=None, **kw):
+        result = await self.execute(statement, params, **kw)
+        return result.scalars()
+
+    async def scalar(self, statement, params=None, **kw):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kw)
+
+    async def get(self, entity, ident, **kw):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kw)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None) -> None:
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def run_sync(self, fn, *args, **kw):
+        """เรียกฟังก์ชันที่รับ Session ปกติ (เช่น app/services/*) เหมือน AsyncSession.run_sync"""
+        return await run_in_threadpool(fn, self.sync_session, *args, **kw)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+# ไม่ expire หลัง commit ทั้งสองโหมด → serialize response ได้โดยไม่ lazy load ซ้ำ
+# (AsyncSession lazy load ไม่ได้อยู่แล้ว route ที่แก้ข้อมูลจึง refresh เองหลัง commit)
+ThreadpoolSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_async:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    try:
+        async_url = async_database_url(settings.database_url)
+        async_engine = create_async_engine(async_url, **pool_options(async_url, InstrumentedAsyncQueuePool))
+        instrument_engine(async_engine.sync_engine, "async")
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        logger.info("Async database engine created successfully")
+    except Exception as e:
+        logger.error(f"Error creating async database engine: {e}")
+        raise
+
+
+async def get_async_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = ThreadpoolSession(ThreadpoolSessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -1,18 +1,36 @@
 from fastapi import Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from typing import Optional
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.profile import Profile, UserRole
+from app.services.profile_cache import profile_cache
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# LOAD PROFILE - ดู cache ก่อน ไม่เจอค่อย query (ไม่ cache กรณีหาไม่เจอ / admin / teacher)
+# ════════════════════════════════════════════════════════════════════════════
+async def _load_profile(auth_user_id: UUID, db: AsyncSession) -> Optional[Profile]:
+    profile = await profile_cache.get(auth_user_id)
+    if profile is not None:
+        return profile
+    
+    profile = await db.scalar(select(Profile).where(
+        Profile.auth_user_id == auth_user_id
+    ))
+    if profile is not None:
+        await profile_cache.set(profile)
+    return profile
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # GET CURRENT USER - ดึง Profile จาก Header
 # ════════════════════════════════════════════════════════════════════════════
-def get_current_user(
+async def get_current_user(
     auth_user_id: UUID = Header(..., alias="X-Auth-User-ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Profile:
     """
     ดึง Profile ปัจจุบันจาก X-Auth-User-ID header
@@ -21,11 +39,11 @@ def get_current_user(
     X-Auth-User-ID: <supabase-auth-user-id>
     
     ถ้าไม่ส่ง หรือหาไม่เจอ → 401 Unauthorized
+    
+    ⚠️ Profile ที่ได้อาจมาจาก cache (ไม่ผูก session) ถ้าจะแก้ไขต้องโหลดจาก db ใหม่
     """
     
-    profile = db.query(Profile).filter(
-        Profile.auth_user_id == auth_user_id
-    ).first()
+    profile = await _load_profile(auth_user_id, db)
     
     if not profile:
         raise HTTPException(
@@ -39,9 +57,9 @@ def get_current_user(
 # ════════════════════════════════════════════════════════════════════════════
 # GET CURRENT USER (OPTIONAL) - ไม่บังคับ login
 # ════════════════════════════════════════════════════════════════════════════
-def get_current_user_optional(
+async def get_current_user_optional(
     auth_user_id: Optional[UUID] = Header(None, alias="X-Auth-User-ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Optional[Profile]:
     """
     ดึง Profile ปัจจุบัน (ไม่บังคับ login)
@@ -52,15 +70,13 @@ def get_current_user_optional(
     if not auth_user_id:
         return None
     
-    return db.query(Profile).filter(
-        Profile.auth_user_id == auth_user_id
-    ).first()
+    return await _load_profile(auth_user_id, db)
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # REQUIRE ADMIN - ต้องเป็น Admin
 # ════════════════════════════════════════════════════════════════════════════
-def require_admin(
+async def require_admin(
     current_user: Profile = Depends(get_current_user)
 ) -> Profile:
     """
@@ -81,7 +97,7 @@ def require_admin(
 # ════════════════════════════════════════════════════════════════════════════
 # REQUIRE ADMIN OR TEACHER
 # ════════════════════════════════════════════════════════════════════════════
-def require_admin_or_teacher(
+async def require_admin_or_teacher(
     current_user: Profile = Depends(get_current_user)
 ) -> Profile:
     """
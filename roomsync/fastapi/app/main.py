@@ -1,5 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from app.pagination import NEXT_CURSOR_HEADER
+from app.request_metrics import RequestTimingMiddleware
 
 # ════════════════════════════════════════════════════════════════════════════
 # Import Routers
@@ -9,7 +14,9 @@ from app.routers.rooms import router as rooms_router
 from app.routers.equipments import router as equipments_router
 from app.routers.room_equipments import router as room_equipments_router
 from app.routers.bookings import router as bookings_router
+from app.routers.booking_series import router as booking_series_router
 from app.routers.damage_reports import router as damage_reports_router
+from app.routers.imports import router as imports_router
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -34,7 +41,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # อนุญาตทุก HTTP methods
     allow_headers=["*"],  # อนุญาตทุก headers
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],  # ให้ JS อ่าน cursor หน้าถัดไป / เวลา DB ได้
 )
+# Server-Timing + latency / SQL ต่อ route ใน /metrics (ชั้นนอกสุด)
+app.add_middleware(RequestTimingMiddleware)
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -45,7 +55,9 @@ app.include_router(rooms_router, prefix="/api/v1")
 app.include_router(equipments_router, prefix="/api/v1")
 app.include_router(room_equipments_router, prefix="/api/v1")
 app.include_router(bookings_router, prefix="/api/v1")
+app.include_router(booking_series_router, prefix="/api/v1")
 app.include_router(damage_reports_router, prefix="/api/v1")
+app.include_router(imports_router, prefix="/api/v1")
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -65,4 +77,10 @@ def root():
 @app.get("/health")
 def health_check():
     """เช็คสถานะ API (สำหรับ monitoring)"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics ของ worker นี้ (DB pool, latency / SQL ต่อ route ฯลฯ)"""
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
\ No newline at end of file
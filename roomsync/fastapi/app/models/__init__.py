@@ -2,6 +2,9 @@ from app.models.room import Room
 from app.models.equipment import Equipment
 from app.models.room_equipment import RoomEquipment
 from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries, RecurrenceFreq
+from app.models.room_busy_slots import RoomBusySlots
+from app.models.sync_state import SyncState
 from app.models.damage_report import DamageReport, DamageStatus
 # Profile (User + Role)
 from app.models.profile import Profile, UserRole
@@ -11,5 +14,8 @@ __all__ = [
     "Equipment",
     "RoomEquipment",
     "Booking", "BookingStatus",
+    "BookingSeries", "RecurrenceFreq",
+    "RoomBusySlots",
+    "SyncState",
     "DamageReport", "DamageStatus"
 ]
\ No newline at end of file
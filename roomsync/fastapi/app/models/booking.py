@@ -1,7 +1,7 @@
-from sqlalchemy import Column, DateTime, Text, ForeignKey
+from sqlalchemy import Column, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 import enum
 
@@ -18,6 +18,13 @@ class BookingStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+def as_utc(dt: datetime) -> datetime:
+    """แปลงเวลาเป็น naive UTC (SQLite คืนค่า naive, Postgres คืนค่า aware)"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
 # ════════════════════════════════════════════════════════════════
 # BOOKING MODEL
 # ════════════════════════════════════════════════════════════════
@@ -26,6 +33,18 @@ class Booking(Base):
 
     __tablename__ = "bookings"
 
+    # ════════════════════════════════════════════════════════════════
+    # INDEXES
+    # ════════════════════════════════════════════════════════════════
+    # Conflict check: room_id = ? AND status IN (...) AND start_time < ? AND end_time > ?
+    __table_args__ = (
+        Index("ix_bookings_room_status_time", "room_id", "status", "start_time", "end_time"),
+        # keyset pagination ของ GET /bookings (ORDER BY start_time DESC, id DESC)
+        Index("ix_bookings_start_time_id", "start_time", "id"),
+        # incremental sync (app/services/db_sync.py): WHERE (updated_at, id) > (...) ORDER BY updated_at, id
+        Index("ix_bookings_updated_at_id", "updated_at", "id"),
+    )
+
     # ════════════════════════════════════════════════════════════════
     # PRIMARY KEY
     # ════════════════════════════════════════════════════════════════
@@ -0,0 +1,130 @@
+from sqlalchemy import Column, DateTime, Text, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Tuple
+import uuid
+import enum
+
+from app.db import Base
+from app.models.booking import BookingStatus, as_utc
+
+
+# ════════════════════════════════════════════════════════════════
+# ENUM - ความถี่ของการจองซ้ำ
+# ════════════════════════════════════════════════════════════════
+class RecurrenceFreq(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+# ════════════════════════════════════════════════════════════════
+# BOOKING SERIES MODEL
+# ════════════════════════════════════════════════════════════════
+class BookingSeries(Base):
+    """
+    Model สำหรับตาราง booking_series (การจองซ้ำ เช่น คาบเรียนทุกสัปดาห์)
+
+    เก็บแค่ occurrence แรก + กฎการซ้ำ (แบบ RRULE: FREQ/INTERVAL/COUNT/UNTIL)
+    ไม่สร้าง Booking ทีละแถว → ขยายเป็น occurrence เฉพาะช่วงเวลาที่ขอดู
+    """
+
+    __tablename__ = "booking_series"
+
+    # ════════════════════════════════════════════════════════════════
+    # PRIMARY KEY
+    # ════════════════════════════════════════════════════════════════
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # ════════════════════════════════════════════════════════════════
+    # FOREIGN KEYS
+    # ════════════════════════════════════════════════════════════════
+    user_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
+    room_id = Column(UUID(as_uuid=True), ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+
+    # ════════════════════════════════════════════════════════════════
+    # FIRST OCCURRENCE + RECURRENCE RULE
+    # ════════════════════════════════════════════════════════════════
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    freq = Column(Text, default=RecurrenceFreq.WEEKLY.value, nullable=False)
+    interval = Column(Integer, default=1, nullable=False)
+    count = Column(Integer, nullable=True)
+    until = Column(DateTime(timezone=True), nullable=True)
+    # เวลาจบของ occurrence สุดท้าย (คำนวณตอนสร้าง) ใช้กรองช่วงเวลาใน query
+    ends_at = Column(DateTime(timezone=True), nullable=False)
+
+    status = Column(Text, default=BookingStatus.PENDING.value, nullable=False)
+
+    # ════════════════════════════════════════════════════════════════
+    # TIMESTAMPS
+    # ════════════════════════════════════════════════════════════════
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # ════════════════════════════════════════════════════════════════
+    # AUDIT FIELDS
+    # ════════════════════════════════════════════════════════════════
+    created_by = Column(UUID(as_uuid=True), nullable=True)
+    updated_by = Column(UUID(as_uuid=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_booking_series_room_status_time", "room_id", "status", "start_time", "ends_at"),
+        Index("ix_booking_series_start_time_id", "start_time", "id"),
+        # incremental sync (app/services/db_sync.py): WHERE (updated_at, id) > (...) ORDER BY updated_at, id
+        Index("ix_booking_series_updated_at_id", "updated_at", "id"),
+    )
+
+    # ════════════════════════════════════════════════════════════════
+    # RELATIONSHIPS
+    # ════════════════════════════════════════════════════════════════
+    room = relationship("Room", back_populates="booking_series")
+    profile = relationship("Profile", back_populates="booking_series")
+
+    # ════════════════════════════════════════════════════════════════
+    # METHODS
+    # ════════════════════════════════════════════════════════════════
+    def __repr__(self):
+        return f"<BookingSeries {self.id} - Room: {self.room_id}, {self.freq}/{self.interval}, Status: {self.status}>"
+
+    def step(self) -> timedelta:
+        """ระยะห่างระหว่าง occurrence"""
+        days = 7 if self.freq == RecurrenceFreq.WEEKLY.value else 1
+        return timedelta(days=days * (self.interval or 1))
+
+    def last_index(self) -> int:
+        """ลำดับ (เริ่มที่ 0) ของ occurrence สุดท้าย"""
+        if self.count is not None:
+            return self.count - 1
+        span = as_utc(self.until) - as_utc(self.start_time)
+        return max(span // self.step(), 0)
+
+    def compute_ends_at(self) -> datetime:
+        return self.end_time + self.step() * self.last_index()
+
+    def occurrences(
+        self, window_start: Optional[datetime] = None, window_end: Optional[datetime] = None
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        ขยาย occurrence แบบ lazy เฉพาะที่ทับกับ [window_start, window_end)
+        (คืนเวลาเป็น naive UTC) กระโดดไปหา occurrence แรกด้วยการคำนวณ ไม่วนจากต้น
+        """
+        start, end, step = as_utc(self.start_time), as_utc(self.end_time), self.step()
+        last = self.last_index()
+
+        first = 0
+        if window_start is not None:
+            behind = as_utc(window_start) - end
+            if behind >= timedelta(0):
+                first = behind // step + 1
+        limit = as_utc(window_end) if window_end is not None else None
+
+        for k in range(first, last + 1):
+            occ_start = start + step * k
+            if limit is not None and occ_start >= limit:
+                return
+            yield occ_start, end + step * k
+
+    def is_active(self) -> bool:
+        """เช็คว่ายังกันห้องอยู่ไหม (pending/approved)"""
+        return self.status in (BookingStatus.PENDING.value, BookingStatus.APPROVED.value)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Text, ForeignKey, String
+from sqlalchemy import Column, DateTime, Text, ForeignKey, String, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -16,6 +16,12 @@ class DamageStatus(str, enum.Enum):
 
 class DamageReport(Base):
     __tablename__ = "damage_reports"
+    __table_args__ = (
+        # keyset pagination ของ GET /damage-reports (ORDER BY created_at DESC, id DESC)
+        Index("ix_damage_reports_created_at_id", "created_at", "id"),
+        # incremental sync (app/services/db_sync.py): WHERE (updated_at, id) > (...) ORDER BY updated_at, id
+        Index("ix_damage_reports_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     room_id = Column(UUID(as_uuid=True), ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Text
+from sqlalchemy import Column, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -9,6 +9,10 @@ from app.db import Base
 
 class Equipment(Base):
     __tablename__ = "equipments"
+    __table_args__ = (
+        # incremental sync (app/services/db_sync.py): WHERE (updated_at, id) > (...) ORDER BY updated_at, id
+        Index("ix_equipments_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, nullable=False)
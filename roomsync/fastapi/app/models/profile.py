@@ -7,7 +7,7 @@
 """
 
 
-from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,6 +33,12 @@ class Profile(Base):
     """Model สำหรับตาราง profiles (เชื่อมกับ Supabase Auth)"""
     
     __tablename__ = "profiles"
+    __table_args__ = (
+        # keyset pagination ของ GET /profiles (ORDER BY created_at DESC, id DESC)
+        Index("ix_profiles_created_at_id", "created_at", "id"),
+        # incremental sync (app/services/db_sync.py): WHERE (updated_at, id) > (...) ORDER BY updated_at, id
+        Index("ix_profiles_updated_at_id", "updated_at", "id"),
+    )
 
     # ════════════════════════════════════════════════════════════════
     # PRIMARY KEY
@@ -77,6 +83,8 @@ class Profile(Base):
     # ════════════════════════════════════════════════════════════════
     # One-to-Many: Profile can have many Bookings
     bookings = relationship("Booking", back_populates="profile", cascade="all, delete-orphan")
+    # One-to-Many: Profile can have many recurring BookingSeries
+    booking_series = relationship("BookingSeries", back_populates="profile", cascade="all, delete-orphan")
 
     # ════════════════════════════════════════════════════════════════
     # METHODS - String Representation
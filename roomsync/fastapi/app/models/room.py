@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, Text, String
+from sqlalchemy import Column, Integer, Boolean, DateTime, Text, String, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -10,6 +10,10 @@ from app.db import Base
 class Room(Base):
     """Model สำหรับตาราง rooms"""
     __tablename__ = "rooms"
+    __table_args__ = (
+        # incremental sync (app/services/db_sync.py): WHERE (updated_at, id) > (...) ORDER BY updated_at, id
+        Index("ix_rooms_updated_at_id", "updated_at", "id"),
+    )
 
     # PRIMARY KEY
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -20,6 +24,10 @@ class Room(Base):
     status = Column(Text, nullable=False)
     note = Column(Text, nullable=True)
     image_path = Column(String(255), nullable=True)
+
+    # EQUIPMENT SUMMARY (ปรับตาม room_equipments ตอนเขียน, ดู app/services/room_equipment_summary.py)
+    equipment_types = Column(Integer, nullable=False, default=0, server_default="0")
+    equipment_total = Column(Integer, nullable=False, default=0, server_default="0")
     
     # TIMESTAMPS ROOM
     until = Column(DateTime(timezone=True))
@@ -34,6 +42,7 @@ class Room(Base):
     
     # RELATIONSHIPS
     bookings = relationship("Booking", back_populates="room", cascade="all, delete-orphan")
+    booking_series = relationship("BookingSeries", back_populates="room", cascade="all, delete-orphan")
     room_equipments = relationship("RoomEquipment", back_populates="room", cascade="all, delete-orphan")
     damage_reports = relationship("DamageReport", back_populates="room", cascade="all, delete-orphan")
 
@@ -49,12 +58,12 @@ class Room(Base):
         return self.status == 'available'
     
     def get_equipment_count(self) -> int:
-        """นับจำนวนประเภทอุปกรณ์ในห้อง"""
-        return len(self.room_equipments)
+        """จำนวนประเภทอุปกรณ์ในห้อง (ค่าที่เก็บไว้ ไม่โหลด room_equipments)"""
+        return self.equipment_types or 0
     
     def get_total_equipment_quantity(self) -> int:
-        """นับจำนวนอุปกรณ์ทั้งหมดในห้อง"""
-        return sum(re.quantity for re in self.room_equipments)
+        """จำนวนอุปกรณ์ทั้งหมดในห้อง (ค่าที่เก็บไว้ ไม่โหลด room_equipments)"""
+        return self.equipment_total or 0
     
 
     #dummy
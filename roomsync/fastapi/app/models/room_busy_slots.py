@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Date, DateTime, LargeBinary, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.db import Base
+
+
+class RoomBusySlots(Base):
+    """
+    Model สำหรับตาราง room_busy_slots (free/busy bitmap ต่อห้องต่อวัน)
+
+    1 วัน = 96 ช่อง ช่องละ 15 นาที (UTC) เก็บเป็น bitmap 12 bytes
+    bit ที่ 1 = มีการจอง (pending/approved) ทับช่องนั้น
+    ดูแลโดย app/services/room_availability.py (ไม่ต้องเขียนเอง)
+    """
+    __tablename__ = "room_busy_slots"
+
+    room_id = Column(UUID(as_uuid=True), ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    mask = Column(LargeBinary(12), nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # ค้นหาห้องว่าง: WHERE day IN (...)
+    __table_args__ = (
+        Index("idx_room_busy_slots_day", "day"),
+    )
+
+    def __repr__(self):
+        return f"<RoomBusySlots {self.room_id} {self.day}>"
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, BigInteger, DateTime, Text
+from datetime import datetime
+
+from app.db import Base
+
+
+class SyncState(Base):
+    """
+    Model สำหรับตาราง sync_state (high-water mark ของ incremental sync Supabase → local)
+
+    1 แถวต่อตาราง: updated_at สูงสุดที่ดึงมาแล้ว → รอบถัดไปดึงเฉพาะแถวที่เปลี่ยนหลังจากนั้น
+    อยู่ใน DB ปลายทาง (local) เท่านั้น ดูแลโดย app/services/db_sync.py
+    """
+    __tablename__ = "sync_state"
+
+    table_name = Column(Text, primary_key=True)
+    high_water_at = Column(DateTime(timezone=True), nullable=True)
+    rows_synced = Column(BigInteger, default=0, nullable=False)
+    last_run_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SyncState {self.table_name} {self.high_water_at}>"
@@ -0,0 +1,99 @@
+"""
+Keyset (cursor) pagination สำหรับ list endpoint
+
+OFFSET n ต้องให้ DB เดินข้าม n แถวทุกครั้ง → ยิ่งเปิดหน้าลึก (booking ทั้งปี) ยิ่งช้า
+keyset จำค่า sort key ของแถวสุดท้ายไว้ใน cursor แล้วหน้าถัดไปเริ่มจาก WHERE (key, id) < (...) ต่อเลย
+- ลำดับเดิมของแต่ละ endpoint + id เป็นตัวตัดสินเมื่อ key ซ้ำ (ลำดับคงที่ ไม่มีแถวซ้ำ/หาย)
+- cursor เป็น base64 ทึบ ๆ (client ไม่ต้องรู้ข้างใน) ผูกกับ sort ที่ใช้ตอนออก cursor
+- หน้าถัดไปมีอีก → header X-Next-Cursor, ไม่มี header = หน้าสุดท้าย
+- skip/limit แบบเดิมยังใช้ได้ (ส่ง cursor มาด้วย → ใช้ cursor ไม่สน skip)
+
+sort column ต้องไม่เป็น NULL (created_at / updated_at มี default ทุกแถว)
+"""
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, Select, literal, tuple_
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, PG_UUID):
+        return uuid.UUID(value)
+    return value
+
+
+def _sort_name(columns: Sequence, descending: bool) -> str:
+    return ",".join(column.key for column in columns) + (":desc" if descending else ":asc")
+
+
+def encode_cursor(columns: Sequence, descending: bool, row) -> str:
+    payload = {"s": _sort_name(columns, descending), "k": [_dump(getattr(row, column.key)) for column in columns]}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence, descending: bool) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if len(payload["k"]) != len(columns):
+            raise ValueError("cursor key length mismatch")
+        values = [_load(column, value) for column, value in zip(columns, payload["k"])]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("s") != _sort_name(columns, descending):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+    return values
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    response: Response,
+    order: Tuple,
+    descending: bool = False,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> List:
+    """
+    ดึง 1 หน้า เรียงตาม order (column ที่เรียง ตามด้วย id) ทิศทางเดียวกันทั้งหมด
+    มีหน้าถัดไป → ใส่ X-Next-Cursor ใน response (ทั้งแบบ cursor และแบบ skip เดิม)
+    """
+    if limit < 1:
+        return []
+
+    if cursor:
+        values = decode_cursor(cursor, order, descending)
+        key = tuple_(*order)
+        after = tuple_(*(literal(value, type_=column.type) for column, value in zip(order, values)))
+        query = query.where(key < after if descending else key > after)
+    elif skip:
+        query = query.offset(skip)
+
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in order))
+    rows = (await db.scalars(query.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(order, descending, rows[-1])
+    return rows
@@ -0,0 +1,137 @@
+"""
+จับเวลา + นับ SQL ต่อ request (หา N+1 / endpoint ที่ยิงหลาย query)
+
+- RequestTimingMiddleware (pure ASGI) เปิด RequestStats ใน contextvar ตอนเริ่ม request
+- event ของ engine (app/db.py → record_statement) เพิ่มจำนวน statement / เวลา DB / rows เข้า stats ของ request นั้น
+  run_in_threadpool / AsyncSession ส่ง context ต่อให้ → นับได้ทั้ง sync, ThreadpoolSession และ async
+- ตอบกลับพร้อม Server-Timing: app;dur=12.3, db;dur=4.1, db-queries;desc="3", db-rows;desc="20"
+- histogram ต่อ route ใน /metrics (label route = path template เช่น /api/v1/rooms/{room_id})
+- query เกิน REQUEST_QUERY_WARN_THRESHOLD ต่อ request → log warning
+
+rows = ORM object ที่โหลดจาก SELECT (event "load" ของ Base; ไม่นับ object ที่อยู่ใน session แล้ว
+และ SELECT แบบ Core/scalar เช่น COUNT) + แถวที่ INSERT/UPDATE/DELETE แก้ (cursor.rowcount)
+ไม่ใช้ rowcount ของ SELECT: SQLite / asyncpg ไม่รายงาน (-1)
+query ที่รันหลังส่ง header ไปแล้ว (StreamingResponse) นับใน /metrics แต่ไม่อยู่ใน Server-Timing
+"""
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+REQUESTS = registry.counter("http_requests_total", "Requests handled by route, method and status")
+REQUEST_DURATION = registry.histogram("http_request_duration_seconds", "Request latency until the response finished")
+REQUEST_DB_DURATION = registry.histogram("http_request_db_seconds", "Time spent in SQL statements per request")
+REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_ROWS = registry.histogram(
+    "http_request_db_rows",
+    "ORM rows loaded + rows written per request (see app/request_metrics.py)",
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000),
+)
+STATEMENTS = registry.counter("db_statements_total", "SQL statements executed, requests and background work")
+STATEMENT_DURATION = registry.histogram("db_statement_duration_seconds", "Time per SQL statement")
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestStats:
+    started: float
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f"app;dur={total_seconds * 1000:.1f}, db;dur={self.db_seconds * 1000:.1f}, "
+            f'db-queries;desc="{self.queries}", db-rows;desc="{self.rows}"'
+        )
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def record_statement(engine_label: str, seconds: float, rowcount: int) -> None:
+    """เรียกจาก after_cursor_execute ของทุก engine ที่ instrument แล้ว (rowcount ของ DML, SELECT ส่ง 0)"""
+    STATEMENTS.inc(engine=engine_label)
+    STATEMENT_DURATION.observe(seconds, engine=engine_label)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+        if rowcount > 0:
+            stats.rows += rowcount
+
+
+def record_loaded_row(target, context) -> None:
+    """InstanceEvents.load ของทุก model (ผูกใน app/db.py)"""
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")  # FastAPI ใส่ APIRoute ที่ match ไว้ใน scope
+    path = getattr(route, "path", None)
+    # ไม่ใช้ path จริงเป็น label เมื่อไม่ match (404 สุ่ม path → label ไม่จำกัด)
+    return path or UNMATCHED_ROUTE
+
+
+class RequestTimingMiddleware:
+    """ใส่ Server-Timing + เก็บ metrics ต่อ route (pure ASGI แบบเดียวกับ JWTAndCSRFMiddleware)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(started=time.perf_counter())
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.server_timing_enabled:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", stats.server_timing(time.perf_counter() - stats.started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._observe(scope, stats, status)
+
+    @staticmethod
+    def _observe(scope: Scope, stats: RequestStats, status: int) -> None:
+        route, method = _route_label(scope), scope["method"]
+        elapsed = time.perf_counter() - stats.started
+        REQUESTS.inc(route=route, method=method, status=status)
+        REQUEST_DURATION.observe(elapsed, route=route, method=method)
+        REQUEST_DB_DURATION.observe(stats.db_seconds, route=route, method=method)
+        REQUEST_QUERIES.observe(stats.queries, route=route, method=method)
+        REQUEST_ROWS.observe(stats.rows, route=route, method=method)
+
+        threshold = settings.request_query_warn_threshold
+        if threshold and stats.queries > threshold:
+            logger.warning(
+                f"{method} {route} ran {stats.queries} SQL statements "
+                f"({stats.db_seconds * 1000:.1f} ms in DB, {elapsed * 1000:.1f} ms total); possible N+1"
+            )
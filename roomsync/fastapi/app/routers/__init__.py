@@ -3,4 +3,5 @@ from app.routers.rooms import router as rooms_router
 from app.routers.equipments import router as equipments_router
 from app.routers.room_equipments import router as room_equipments_router
 from app.routers.bookings import router as bookings_router
+from app.routers.booking_series import router as booking_series_router
 from app.routers.damage_reports import router as damage_reports_router
\ No newline at end of file
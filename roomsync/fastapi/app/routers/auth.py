@@ -7,24 +7,25 @@ from urllib import request
 from fastapi import APIRouter, Request, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse, JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import get_async_db
 from app.schemas.auth import UserResponse, Message, UserRegister, UserLogin, Token
 
 from app.models.authuser import AuthUser
+from app.services.identity_cache import identity_cache
+from app.services.oauth_http import oauth_http
+from app.services.password_hashing import PasswordHasherBusy, password_hasher, pwd_context
 from app.config import settings
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from httpx import AsyncClient
-from passlib.context import CryptContext
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Set this logger to DEBUG
 
 router = APIRouter()
 
-# Password hashing context  
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (bcrypt รันบน thread pool แยก ดู app/services/password_hashing.py)
 
 # JWT Configuration
 SECRET_KEY = settings.jwt_secret_key
@@ -32,6 +33,7 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 1 day (1440 minutes)
 
 GOOGLE_REDIRECT_URI = "http://localhost:8080/auth/google/auth"
+GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
 GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v1/userinfo"
@@ -40,6 +42,13 @@ GITHUB_TOKEN_URL = "https://github.com/login/oauth/access_token"
 GITHUB_USER_URL = "https://api.github.com/user"
 GITHUB_EMAILS_URL = "https://api.github.com/user/emails"
 
+# ใช้เมื่อดึง discovery document ของ Google ไม่ได้
+GOOGLE_DEFAULT_ENDPOINTS = {
+    "authorization_endpoint": GOOGLE_AUTH_URL,
+    "token_endpoint": GOOGLE_TOKEN_URL,
+    "userinfo_endpoint": GOOGLE_USERINFO_URL,
+}
+
 
 # Check if Google OAuth credentials are set in environment variables
 def get_google_oauth_config() -> tuple[str, str]:
@@ -61,6 +70,10 @@ def get_github_oauth_config() -> tuple[str, str]:
     
     return client_id, client_secret
 
+# Google OAuth endpoints from the (cached) discovery document
+async def get_google_endpoints() -> dict:
+    return await oauth_http.discovery(settings.google_discovery_url or GOOGLE_DISCOVERY_URL, GOOGLE_DEFAULT_ENDPOINTS)
+
 # Fetch GitHub profile information using the access token
 async def fetch_github_profile(access_token: str) -> dict:
     headers = {
@@ -68,23 +81,23 @@ async def fetch_github_profile(access_token: str) -> dict:
         "Accept": "application/vnd.github+json",
     }
 
-    async with AsyncClient() as client:
-        user_response = await client.get(GITHUB_USER_URL, headers=headers)
-        user_data = user_response.json()
-        email = user_data.get("email")
+    client = oauth_http.client
+    user_response = await client.get(GITHUB_USER_URL, headers=headers)
+    user_data = user_response.json()
+    email = user_data.get("email")
 
-        if not email:
-            emails_response = await client.get(GITHUB_EMAILS_URL, headers=headers)
-            emails = emails_response.json()
-            primary = next((e for e in emails if e.get("primary") and e.get("verified")), None)
-            email = primary.get("email") if primary else None
-
-        return {
-            "email": email,
-            "name": user_data.get("name") or user_data.get("login"),
-            "avatar_url": user_data.get("avatar_url"),
-            "login": user_data.get("login"),
-        }
+    if not email:
+        emails_response = await client.get(GITHUB_EMAILS_URL, headers=headers)
+        emails = emails_response.json()
+        primary = next((e for e in emails if e.get("primary") and e.get("verified")), None)
+        email = primary.get("email") if primary else None
+
+    return {
+        "email": email,
+        "name": user_data.get("name") or user_data.get("login"),
+        "avatar_url": user_data.get("avatar_url"),
+        "login": user_data.get("login"),
+    }
 
 # Utility function to create JWT tokens
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -97,7 +110,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm="HS256")
 
 # Dependency to get the current user from the JWT token
-async def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     logger.debug(f"Checking JWT cookie in get_current_user")
     token = request.cookies.get("jwt")
     logger.debug(f"JWT cookie: {token}")
@@ -107,7 +120,11 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Missing JWT cookie")
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # middleware verify ไว้แล้ว (POST/PUT/DELETE) → ใช้ต่อเลย, GET → verify ผ่าน cache
+        identity = getattr(request.state, "identity", None)
+        if identity is None:
+            identity = identity_cache.verify(token)
+        payload = identity.payload
         logger.debug(f"JWT payload: {payload}")
         user_id: str = payload.get("sub")
         logger.debug(f"Extracted user_id from sub: {user_id}")
@@ -117,11 +134,15 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)):
             raise HTTPException(
                 status_code=401, detail="Invalid token: subject missing")
         
-        user = db.query(AuthUser).filter(AuthUser.id == int(user_id)).first()
-
+        user = identity.user_instance()
         if user is None:
-            logger.error(f"User not found for id: {user_id}")
-            raise HTTPException(status_code=401, detail="User not found")
+            user = await db.get(AuthUser, int(user_id))
+
+            if user is None:
+                logger.error(f"User not found for id: {user_id}")
+                raise HTTPException(status_code=401, detail="User not found")
+
+            identity_cache.remember_user(identity, user)
         
         logger.debug(f"User found: {user.email}")
 
@@ -160,14 +181,22 @@ async def debug():
         "redirect_uri_template": "Will be generated at login"
     }
 
+# Run a hashing job, answering 503 when the hashing queue is full
+async def _run_password_job(job):
+    try:
+        return await job
+    except PasswordHasherBusy:
+        logger.warning("Password hashing queue is full")
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
 # Registration and Login Endpoints
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user with email and password"""
-    if db.query(AuthUser).filter(AuthUser.email == user_data.email).first():
+    if await db.scalar(select(AuthUser).where(AuthUser.email == user_data.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_pwd = pwd_context.hash(user_data.password)
+    hashed_pwd = await _run_password_job(password_hasher.hash(user_data.password))
     user = AuthUser(
         email=user_data.email,
         name=user_data.name,
@@ -175,19 +204,30 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
 # Login with email/password
 @router.post("/login/email", response_model=Token)
-async def login_email(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_email(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login with email/password"""
-    user = db.query(AuthUser).filter(AuthUser.email == form_data.username).first()
+    user = await db.scalar(select(AuthUser).where(AuthUser.email == form_data.username))
 
-    if not user or not pwd_context.verify(form_data.password, user.password_hash or ""):
+    if not user or not user.password_hash:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    valid, new_hash = await _run_password_job(
+        password_hasher.verify_and_update(form_data.password, user.password_hash)
+    )
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # bcrypt_rounds เปลี่ยน → เก็บ hash ใหม่ตอนที่มีรหัสผ่านจริงอยู่ในมือ
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     
     token = create_access_token(data={"sub": str(user.id), "email": user.email})
 
@@ -207,11 +247,12 @@ async def login(request: Request, redirect_to: str = "/dashboard"):
     """
     client_id, _ = get_google_oauth_config()
     redirect_uri = str(request.url_for("google_auth"))
+    endpoints = await get_google_endpoints()
 
     # Store redirect_to in state parameter (OAuth standard way)
     state = f"redirect_to={redirect_to}"
     auth_url = (
-        f"{GOOGLE_AUTH_URL}?response_type=code&client_id={client_id}"
+        f"{endpoints['authorization_endpoint']}?response_type=code&client_id={client_id}"
         f"&redirect_uri={redirect_uri}&scope=openid%20email%20profile"
         f"&state={state}"
     )
@@ -246,7 +287,7 @@ async def github_login(request: Request, redirect_to: str = "/dashboard"):
     
 # Google OAuth Callback Endpoint
 @router.get("/google/auth", name="google_auth", response_description="Redirects to Frontend with JWT")
-async def google_auth(request: Request, db: Session = Depends(get_db)):
+async def google_auth(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     **Google OAuth Callback**
 
@@ -272,30 +313,30 @@ async def google_auth(request: Request, db: Session = Depends(get_db)):
         if not code:
             raise ValueError("No authorization code provided")
 
-        async with AsyncClient() as client:
-            token_response = await client.post(
-                GOOGLE_TOKEN_URL,
-                data={
-                    "code": code,
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "redirect_uri": str(request.url_for("google_auth")),
-                    "grant_type": "authorization_code",
-                },
-            )
-            token_data = token_response.json()
-            if "error" in token_data:
-                raise ValueError(f"Google OAuth error: {token_data['error']}")
-            access_token = token_data.get("access_token")
-
-            user_info_response = await client.get(
-                GOOGLE_USERINFO_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            user_info = user_info_response.json()
-            logger.debug(f"Google profile: {user_info}")
+        endpoints = await get_google_endpoints()
+        token_response = await oauth_http.client.post(
+            endpoints["token_endpoint"],
+            data={
+                "code": code,
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "redirect_uri": str(request.url_for("google_auth")),
+                "grant_type": "authorization_code",
+            },
+        )
+        token_data = token_response.json()
+        if "error" in token_data:
+            raise ValueError(f"Google OAuth error: {token_data['error']}")
+        access_token = token_data.get("access_token")
+
+        user_info_response = await oauth_http.client.get(
+            endpoints["userinfo_endpoint"],
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        user_info = user_info_response.json()
+        logger.debug(f"Google profile: {user_info}")
 
-        user = db.query(AuthUser).filter(AuthUser.email == user_info["email"]).first()
+        user = await db.scalar(select(AuthUser).where(AuthUser.email == user_info["email"]))
 
         if not user:
             logger.debug("User not found, creating one")
@@ -306,14 +347,15 @@ async def google_auth(request: Request, db: Session = Depends(get_db)):
             )
 
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
 
         else:
             logger.debug("User found, updating details")
             user.name = user_info["name"]
             user.avatar_url = user_info.get("picture")
-            db.commit()
+            await db.commit()
+            identity_cache.invalidate_user(user.id)
 
         jwt_token = create_access_token(
             data={"sub": str(user.id), "name": user.name,
@@ -332,7 +374,7 @@ async def google_auth(request: Request, db: Session = Depends(get_db)):
 
 # GitHub OAuth Callback Endpoint
 @router.get("/github/auth", name="github_auth", response_description="Redirects to Frontend with JWT")
-async def github_auth(request: Request, db: Session = Depends(get_db)):
+async def github_auth(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         client_id, client_secret = get_github_oauth_config()
         code = request.query_params.get("code")
@@ -346,23 +388,22 @@ async def github_auth(request: Request, db: Session = Depends(get_db)):
         if not code:
             raise ValueError("No authorization code provided")
 
-        async with AsyncClient() as client:
-            token_response = await client.post(
-                GITHUB_TOKEN_URL,
-                data={
-                    "code": code,
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "redirect_uri": str(request.url_for("github_auth")),
-                },
-                headers={"Accept": "application/json"},
-            )
-            token_data = token_response.json()
-            if "error" in token_data:
-                raise ValueError(f"GitHub OAuth error: {token_data['error']}")
-            access_token = token_data.get("access_token")
-            if not access_token:
-                raise ValueError("No access token returned from GitHub")
+        token_response = await oauth_http.client.post(
+            GITHUB_TOKEN_URL,
+            data={
+                "code": code,
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "redirect_uri": str(request.url_for("github_auth")),
+            },
+            headers={"Accept": "application/json"},
+        )
+        token_data = token_response.json()
+        if "error" in token_data:
+            raise ValueError(f"GitHub OAuth error: {token_data['error']}")
+        access_token = token_data.get("access_token")
+        if not access_token:
+            raise ValueError("No access token returned from GitHub")
 
         profile = await fetch_github_profile(access_token)
         email = profile.get("email")
@@ -370,7 +411,7 @@ async def github_auth(request: Request, db: Session = Depends(get_db)):
             login = profile.get("login") or "user"
             email = f"{login}@users.noreply.github.com"
 
-        user = db.query(AuthUser).filter(AuthUser.email == email).first()
+        user = await db.scalar(select(AuthUser).where(AuthUser.email == email))
         if not user:
             logger.debug("User not found, creating one")
             user = AuthUser(
@@ -379,13 +420,14 @@ async def github_auth(request: Request, db: Session = Depends(get_db)):
                 avatar_url=profile.get("avatar_url"),
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
         else:
             logger.debug("User found, updating details")
             user.name = profile.get("name")
             user.avatar_url = profile.get("avatar_url")
-            db.commit()
+            await db.commit()
+            identity_cache.invalidate_user(user.id)
 
         jwt_token = create_access_token(
             data={"sub": str(user.id), "name": user.name,
@@ -0,0 +1,165 @@
+'''
+การจองแบบซ้ำ (Booking Series):
+┌──────────────┐   ขยายเฉพาะช่วงที่ขอดู   ┌────────────────────┐
+│ BookingSeries│ ───────────────────────► │ occurrence (ไม่เก็บ) │
+│ 1 แถว / เทอม  │                          │ จ. 09:00-11:00 ...  │
+└──────────────┘                          └────────────────────┘
+สถานะเหมือน Booking: pending → approved / rejected, cancelled
+'''
+
+
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+from app.db import get_async_db
+from app.models.booking import BookingStatus
+from app.models.booking_series import BookingSeries
+from app.models.room import Room
+from app.pagination import paginate
+from app.schemas.booking_series import BookingSeriesCreate, BookingSeriesResponse, BookingOccurrence
+from app.services.booking_conflicts import find_series_conflict
+
+router = APIRouter(prefix="/booking-series", tags=["Booking Series"])
+
+# จำนวน occurrence สูงสุดต่อ series (กัน until ที่ไกลเกินไป)
+MAX_OCCURRENCES = 500
+
+
+async def _get_series_or_404(db: AsyncSession, series_id: UUID) -> BookingSeries:
+    series = await db.get(BookingSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Booking series not found")
+    return series
+
+
+@router.get("/", response_model=List[BookingSeriesResponse])
+async def get_all_booking_series(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="ค่าจาก header X-Next-Cursor ของหน้าก่อน (แทน skip)"),
+    status: Optional[str] = None,
+    room_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = select(BookingSeries)
+    if status:
+        query = query.where(BookingSeries.status == status)
+    if room_id:
+        query = query.where(BookingSeries.room_id == room_id)
+    if user_id:
+        query = query.where(BookingSeries.user_id == user_id)
+    return await paginate(
+        db, query, response, (BookingSeries.start_time, BookingSeries.id),
+        descending=True, limit=limit, cursor=cursor, skip=skip
+    )
+
+
+@router.get("/{series_id}", response_model=BookingSeriesResponse)
+async def get_booking_series(series_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    return await _get_series_or_404(db, series_id)
+
+
+@router.get("/{series_id}/occurrences", response_model=List[BookingOccurrence])
+async def get_series_occurrences(
+    series_id: UUID,
+    from_time: Optional[datetime] = None,
+    to_time: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """ขยาย occurrence ของ series (เฉพาะช่วง from_time - to_time ถ้าระบุ)"""
+    series = await _get_series_or_404(db, series_id)
+    return [
+        BookingOccurrence(
+            series_id=series.id,
+            room_id=series.room_id,
+            start_time=occ_start,
+            end_time=occ_end,
+            status=series.status
+        )
+        for occ_start, occ_end in series.occurrences(from_time, to_time)
+    ]
+
+
+@router.post("/", response_model=BookingSeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_booking_series(
+    series_data: BookingSeriesCreate,
+    user_id: UUID = Query(..., description="User ID from Supabase Auth"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    room = await db.get(Room, series_data.room_id)
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if not room.status:
+        raise HTTPException(status_code=400, detail="Room is not available")
+
+    series = BookingSeries(
+        user_id=user_id,
+        room_id=series_data.room_id,
+        start_time=series_data.start_time,
+        end_time=series_data.end_time,
+        freq=series_data.freq.value,
+        interval=series_data.interval,
+        count=series_data.count,
+        until=series_data.until,
+        status=BookingStatus.PENDING.value,
+        created_by=user_id
+    )
+    if series.last_index() + 1 > MAX_OCCURRENCES:
+        raise HTTPException(status_code=400, detail=f"Booking series cannot exceed {MAX_OCCURRENCES} occurrences")
+    series.ends_at = series.compute_ends_at()
+
+    # Check conflicts (ทุก occurrence กับการจองเดิมและ series อื่น)
+    conflict = await db.run_sync(find_series_conflict, series)
+    if conflict:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Room is already booked for this time slot ({conflict.describe()})"
+        )
+
+    db.add(series)
+    await db.commit()
+    await db.refresh(series)
+    return series
+
+
+@router.patch("/{series_id}/approve", response_model=BookingSeriesResponse)
+async def approve_booking_series(series_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    series = await _get_series_or_404(db, series_id)
+    if series.status != BookingStatus.PENDING.value:
+        raise HTTPException(status_code=400, detail="Booking series is not pending")
+    series.status = BookingStatus.APPROVED.value
+    await db.commit()
+    await db.refresh(series)
+    return series
+
+
+@router.patch("/{series_id}/reject", response_model=BookingSeriesResponse)
+async def reject_booking_series(series_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    series = await _get_series_or_404(db, series_id)
+    series.status = BookingStatus.REJECTED.value
+    await db.commit()
+    await db.refresh(series)
+    return series
+
+
+@router.patch("/{series_id}/cancel", response_model=BookingSeriesResponse)
+async def cancel_booking_series(series_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    series = await _get_series_or_404(db, series_id)
+    series.status = BookingStatus.CANCELLED.value
+    await db.commit()
+    await db.refresh(series)
+    return series
+
+
+@router.delete("/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_booking_series(series_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    series = await _get_series_or_404(db, series_id)
+    await db.delete(series)
+    await db.commit()
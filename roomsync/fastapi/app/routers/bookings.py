@@ -36,69 +36,144 @@
 
 
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from uuid import UUID
+from datetime import datetime
+from uuid import UUID, uuid5
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.booking import Booking, BookingStatus
+from app.models.booking_series import BookingSeries
 from app.models.room import Room
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from app.pagination import paginate
+from app.schemas.booking import BookingCreate, BookingBatchCreate, BookingUpdate, BookingResponse
+from app.services.booking_conflicts import as_utc, find_conflict, find_batch_conflicts
+from app.services.export import export_response
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
 
+async def _get_booking_or_404(db: AsyncSession, booking_id: UUID) -> Booking:
+    booking = await db.get(Booking, booking_id)
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking
+
+
+def _filter_bookings(query, status, room_id, user_id, from_time, to_time):
+    if status:
+        query = query.where(Booking.status == status)
+    if room_id:
+        query = query.where(Booking.room_id == room_id)
+    if user_id:
+        query = query.where(Booking.user_id == user_id)
+    if from_time:
+        query = query.where(Booking.end_time > from_time)
+    if to_time:
+        query = query.where(Booking.start_time < to_time)
+    return query
+
+
 @router.get("/", response_model=List[BookingResponse])
-def get_all_bookings(
+async def get_all_bookings(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="ค่าจาก header X-Next-Cursor ของหน้าก่อน (แทน skip)"),
     status: Optional[str] = None,
     room_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None,
-    db: Session = Depends(get_db)
+    from_time: Optional[datetime] = None,
+    to_time: Optional[datetime] = None,
+    include_series: bool = Query(False, description="รวม occurrence ของ booking series (ต้องระบุ from_time และ to_time)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Booking)
+    query = _filter_bookings(select(Booking), status, room_id, user_id, from_time, to_time)
+
+    if not include_series:
+        return await paginate(
+            db, query, response, (Booking.start_time, Booking.id),
+            descending=True, limit=limit, cursor=cursor, skip=skip
+        )
+
+    if from_time is None or to_time is None:
+        raise HTTPException(status_code=400, detail="from_time and to_time are required when include_series is set")
+    if cursor:
+        raise HTTPException(status_code=400, detail="cursor is not supported with include_series")
+    query = query.order_by(Booking.start_time.desc())
+
+    # ขยาย series เฉพาะช่วงที่ขอ แล้วรวมกับ booking ปกติ (เรียง start_time ใหม่สุดก่อน)
+    series_query = select(BookingSeries).where(
+        BookingSeries.start_time < to_time,
+        BookingSeries.ends_at > from_time
+    )
     if status:
-        query = query.filter(Booking.status == status)
+        series_query = series_query.where(BookingSeries.status == status)
     if room_id:
-        query = query.filter(Booking.room_id == room_id)
+        series_query = series_query.where(BookingSeries.room_id == room_id)
     if user_id:
-        query = query.filter(Booking.user_id == user_id)
-    return query.order_by(Booking.start_time.desc()).offset(skip).limit(limit).all()
+        series_query = series_query.where(BookingSeries.user_id == user_id)
+
+    bookings = (await db.scalars(query.limit(skip + limit))).all()
+    items = [BookingResponse.model_validate(booking) for booking in bookings]
+    for series in (await db.scalars(series_query)).all():
+        for occ_start, occ_end in series.occurrences(from_time, to_time):
+            items.append(BookingResponse(
+                id=uuid5(series.id, occ_start.isoformat()),
+                series_id=series.id,
+                user_id=series.user_id,
+                room_id=series.room_id,
+                start_time=occ_start,
+                end_time=occ_end,
+                status=series.status,
+                created_at=series.created_at,
+                updated_at=series.updated_at,
+                created_by=series.created_by,
+                updated_by=series.updated_by
+            ))
+    items.sort(key=lambda item: as_utc(item.start_time), reverse=True)
+    return items[skip:skip + limit]
+
+
+# GET - export booking ทั้งหมดตาม filter แบบ stream (ไม่จำกัด 100 แถว, ไม่ต้องไล่ทีละหน้า)
+# ต้องประกาศก่อน /{booking_id} ไม่งั้น "export" ถูกตีความเป็น booking_id
+@router.get("/export", response_description="NDJSON or CSV stream of bookings")
+async def export_bookings(
+    format: str = Query("ndjson", description="ndjson หรือ csv"),
+    status: Optional[str] = None,
+    room_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+    from_time: Optional[datetime] = None,
+    to_time: Optional[datetime] = None,
+):
+    query = _filter_bookings(select(Booking.__table__), status, room_id, user_id, from_time, to_time)
+    query = query.order_by(Booking.start_time, Booking.id)
+    return export_response(query, format, "bookings")
 
 
 @router.get("/{booking_id}", response_model=BookingResponse)
-def get_booking(booking_id: UUID, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    return booking
+async def get_booking(booking_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    return await _get_booking_or_404(db, booking_id)
 
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-def create_booking(
+async def create_booking(
     booking_data: BookingCreate,
     user_id: UUID = Query(..., description="User ID from Supabase Auth"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    room = db.query(Room).filter(Room.id == booking_data.room_id).first()
+    room = await db.get(Room, booking_data.room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     if not room.status:
         raise HTTPException(status_code=400, detail="Room is not available")
     
     # Check conflicts
-    conflict = db.query(Booking).filter(
-        Booking.room_id == booking_data.room_id,
-        Booking.status.in_([BookingStatus.PENDING.value, BookingStatus.APPROVED.value]),
-        or_(
-            and_(Booking.start_time <= booking_data.start_time, Booking.end_time > booking_data.start_time),
-            and_(Booking.start_time < booking_data.end_time, Booking.end_time >= booking_data.end_time),
-            and_(Booking.start_time >= booking_data.start_time, Booking.end_time <= booking_data.end_time)
-        )
-    ).first()
+    conflict = await db.run_sync(
+        find_conflict, booking_data.room_id, booking_data.start_time, booking_data.end_time
+    )
     
     if conflict:
         raise HTTPException(status_code=400, detail="Room is already booked for this time slot")
@@ -112,50 +187,86 @@ def create_booking(
         created_by=user_id
     )
     db.add(booking)
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
     return booking
 
 
+@router.post("/batch", response_model=List[BookingResponse], status_code=status.HTTP_201_CREATED)
+async def create_bookings_batch(
+    batch_data: BookingBatchCreate,
+    user_id: UUID = Query(..., description="User ID from Supabase Auth"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """จองหลายรายการใน transaction เดียว (ถ้ามีรายการไหนชน จะไม่บันทึกเลยสักรายการ)"""
+    room_ids = {item.room_id for item in batch_data.items}
+    rooms = {room.id: room for room in (await db.scalars(select(Room).where(Room.id.in_(room_ids)))).all()}
+
+    missing = room_ids - rooms.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Room not found: {', '.join(sorted(map(str, missing)))}")
+    if not all(room.status for room in rooms.values()):
+        raise HTTPException(status_code=400, detail="Room is not available")
+
+    # Check conflicts (กับการจองเดิม และกันเองภายใน batch)
+    conflicts = await db.run_sync(
+        find_batch_conflicts, [(item.room_id, item.start_time, item.end_time) for item in batch_data.items]
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Room is already booked for this time slot", "conflicts": conflicts}
+        )
+
+    bookings = [
+        Booking(
+            user_id=user_id,
+            room_id=item.room_id,
+            start_time=item.start_time,
+            end_time=item.end_time,
+            status=BookingStatus.PENDING.value,
+            created_by=user_id
+        )
+        for item in batch_data.items
+    ]
+    db.add_all(bookings)
+    await db.flush()  # INSERT แบบ executemany ครั้งเดียว (id/timestamps สร้างฝั่ง Python)
+    response = [BookingResponse.model_validate(booking) for booking in bookings]
+    await db.commit()
+    return response
+
+
 @router.patch("/{booking_id}/approve", response_model=BookingResponse)
-def approve_booking(booking_id: UUID, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
+async def approve_booking(booking_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    booking = await _get_booking_or_404(db, booking_id)
     if booking.status != BookingStatus.PENDING.value:
         raise HTTPException(status_code=400, detail="Booking is not pending")
     booking.status = BookingStatus.APPROVED.value
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
     return booking
 
 
 @router.patch("/{booking_id}/reject", response_model=BookingResponse)
-def reject_booking(booking_id: UUID, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
+async def reject_booking(booking_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    booking = await _get_booking_or_404(db, booking_id)
     booking.status = BookingStatus.REJECTED.value
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
     return booking
 
 
 @router.patch("/{booking_id}/cancel", response_model=BookingResponse)
-def cancel_booking(booking_id: UUID, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
+async def cancel_booking(booking_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    booking = await _get_booking_or_404(db, booking_id)
     booking.status = BookingStatus.CANCELLED.value
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
     return booking
 
 
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_booking(booking_id: UUID, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
-    if not booking:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    db.delete(booking)
-    db.commit()
\ No newline at end of file
+async def delete_booking(booking_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    booking = await _get_booking_or_404(db, booking_id)
+    await db.delete(booking)
+    await db.commit()
\ No newline at end of file
@@ -20,49 +20,74 @@
 
 
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.damage_report import DamageReport, DamageStatus
 from app.models.room import Room
+from app.pagination import paginate
 from app.schemas.damage_report import DamageReportCreate, DamageReportUpdate, DamageReportResponse
+from app.services.export import export_response
 
 #  สร้าง Router
 router = APIRouter(prefix="/damage-reports", tags=["Damage Reports"])
 
+
+def _filter_damage_reports(query, status, room_id):
+    # ถ้ามี filter status
+    if status:
+        query = query.where(DamageReport.status == status) #ซ่อมรึยังหรือยังไม่ได้ซ่อม
+    # ถ้ามี filter room_id
+    if room_id:
+        query = query.where(DamageReport.room_id == room_id)
+    return query
+
+
 # GET - ดึงรายงานทั้งหมด (พร้อม Filter)
 @router.get("/", response_model=List[DamageReportResponse])
-def get_all_damage_reports(
+async def get_all_damage_reports(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="ค่าจาก header X-Next-Cursor ของหน้าก่อน (แทน skip)"),
     status: Optional[str] = None,
     room_id: Optional[UUID] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ดึงรายงานความเสียหายทั้งหมด"""
     # เริ่มจาก query ทั้งหมด
-    query = db.query(DamageReport)
-
-    # ถ้ามี filter status
-    if status:
-        query = query.filter(DamageReport.status == status) #ซ่อมรึยังหรือยังไม่ได้ซ่อม
-    # ถ้ามี filter room_id
-    if room_id:
-        query = query.filter(DamageReport.room_id == room_id)
+    query = _filter_damage_reports(select(DamageReport), status, room_id)
 
     # เรียงตามวันที่สร้าง (ใหม่สุดก่อน) แล้ว return
-    return query.order_by(DamageReport.created_at.desc()).offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, (DamageReport.created_at, DamageReport.id),
+        descending=True, limit=limit, cursor=cursor, skip=skip
+    )
+
+
+# GET - export รายงานทั้งหมดตาม filter แบบ stream (NDJSON / CSV)
+# ต้องประกาศก่อน /{report_id} ไม่งั้น "export" ถูกตีความเป็น report_id
+@router.get("/export", response_description="NDJSON or CSV stream of damage reports")
+async def export_damage_reports(
+    format: str = Query("ndjson", description="ndjson หรือ csv"),
+    status: Optional[str] = None,
+    room_id: Optional[UUID] = None,
+):
+    query = _filter_damage_reports(select(DamageReport.__table__), status, room_id)
+    query = query.order_by(DamageReport.created_at, DamageReport.id)
+    return export_response(query, format, "damage-reports")
 
 
 # GET - ดึงรายงานตาม ID
 @router.get("/{report_id}", response_model=DamageReportResponse)
-def get_damage_report(report_id: UUID, db: Session = Depends(get_db)):
+async def get_damage_report(report_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """ดึงข้อมูลรายงานตาม ID"""
     
-    report = db.query(DamageReport).filter(DamageReport.id == report_id).first()
+    report = await db.get(DamageReport, report_id)
     
     if not report:
         raise HTTPException(status_code=404, detail="Damage report not found")
@@ -72,13 +97,13 @@ def get_damage_report(report_id: UUID, db: Session = Depends(get_db)):
 
 # POST - สร้างรายงานใหม่ 
 @router.post("/", response_model=DamageReportResponse, status_code=status.HTTP_201_CREATED)
-def create_damage_report(
+async def create_damage_report(
     report_data: DamageReportCreate,
     reporter_id: UUID = Query(..., description="Reporter ID from Supabase Auth"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # STEP 1: ตรวจสอบว่าห้องมีจริง
-    if not db.query(Room).filter(Room.id == report_data.room_id).first():
+    if not await db.get(Room, report_data.room_id):
         raise HTTPException(status_code=404, detail="Room not found")
     
     # STEP 3: สร้าง report
@@ -91,36 +116,36 @@ def create_damage_report(
         created_by=reporter_id
     )
     db.add(report)
-    db.commit()
-    db.refresh(report)
+    await db.commit()
+    await db.refresh(report)
     return report
 #  PATCH - เปลี่ยนสถานะเป็น "กำลังซ่อม" 
 @router.patch("/{report_id}/in-progress", response_model=DamageReportResponse)
-def mark_in_progress(report_id: UUID, db: Session = Depends(get_db)):
-    report = db.query(DamageReport).filter(DamageReport.id == report_id).first()
+async def mark_in_progress(report_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    report = await db.get(DamageReport, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Damage report not found")
     report.status = DamageStatus.IN_PROGRESS.value
-    db.commit()
-    db.refresh(report)
+    await db.commit()
+    await db.refresh(report)
     return report
 
 #  PATCH - เปลี่ยนสถานะเป็น "ซ่อมเสร็จ"
 @router.patch("/{report_id}/resolve", response_model=DamageReportResponse)
-def resolve_damage_report(report_id: UUID, db: Session = Depends(get_db)):
-    report = db.query(DamageReport).filter(DamageReport.id == report_id).first()
+async def resolve_damage_report(report_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    report = await db.get(DamageReport, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Damage report not found")
     report.status = DamageStatus.RESOLVED.value
-    db.commit()
-    db.refresh(report)
+    await db.commit()
+    await db.refresh(report)
     return report
 
 # DELETE - ลบรายงาน
 @router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_damage_report(report_id: UUID, db: Session = Depends(get_db)):
-    report = db.query(DamageReport).filter(DamageReport.id == report_id).first()
+async def delete_damage_report(report_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    report = await db.get(DamageReport, report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Damage report not found")
-    db.delete(report)
-    db.commit()
\ No newline at end of file
+    await db.delete(report)
+    await db.commit()
\ No newline at end of file
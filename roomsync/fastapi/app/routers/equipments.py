@@ -7,13 +7,17 @@
 # Room (ห้อง)
 
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.equipment import Equipment
+from app.models.room_equipment import RoomEquipment
+from app.pagination import paginate
+from app.services.room_equipment_summary import refresh_summaries
 from app.schemas.equipment import EquipmentCreate, EquipmentUpdate, EquipmentResponse
 
 # สร้าง Router
@@ -21,14 +25,23 @@ router = APIRouter(prefix="/equipments", tags=["Equipments"])
 
 # GET - ดึงอุปกรณ์ทั้งหมด
 @router.get("/", response_model=List[EquipmentResponse])
-def get_all_equipments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Equipment).offset(skip).limit(limit).all()
+async def get_all_equipments(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="ค่าจาก header X-Next-Cursor ของหน้าก่อน (แทน skip)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await paginate(
+        db, select(Equipment), response, (Equipment.name, Equipment.id),
+        limit=limit, cursor=cursor, skip=skip
+    )
 
 # GET - ดึงอุปกรณ์ตาม ID
 @router.get("/{equipment_id}", response_model=EquipmentResponse)
-def get_equipment(equipment_id: UUID, db: Session = Depends(get_db)):
+async def get_equipment(equipment_id: UUID, db: AsyncSession = Depends(get_async_db)):
     # 1. หาอุปกรณ์จาก ID
-    equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
+    equipment = await db.get(Equipment, equipment_id)
     # 2. ไม่เจอ → Error 404
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
@@ -37,22 +50,22 @@ def get_equipment(equipment_id: UUID, db: Session = Depends(get_db)):
 
 #  POST - สร้างอุปกรณ์ใหม่
 @router.post("/", response_model=EquipmentResponse, status_code=status.HTTP_201_CREATED)
-def create_equipment(equipment_data: EquipmentCreate, db: Session = Depends(get_db)):
+async def create_equipment(equipment_data: EquipmentCreate, db: AsyncSession = Depends(get_async_db)):
     # 1. สร้าง Equipment object
     equipment = Equipment(**equipment_data.model_dump())
     # เท่ากับ: Equipment(name="โปรเจคเตอร์", description="Epson...")
 
     # 2. เพิ่มลง database
     db.add(equipment)
-    db.commit()
-    db.refresh(equipment)
+    await db.commit()
+    await db.refresh(equipment)
     return equipment
 
 # PUT - อัพเดทอุปกรณ์
 @router.put("/{equipment_id}", response_model=EquipmentResponse)
-def update_equipment(equipment_id: UUID, equipment_data: EquipmentUpdate, db: Session = Depends(get_db)):
+async def update_equipment(equipment_id: UUID, equipment_data: EquipmentUpdate, db: AsyncSession = Depends(get_async_db)):
     # 1. หาอุปกรณ์
-    equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
+    equipment = await db.get(Equipment, equipment_id)
     # 2. ไม่เจอ → 404
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
@@ -60,18 +73,21 @@ def update_equipment(equipment_id: UUID, equipment_data: EquipmentUpdate, db: Se
     for field, value in equipment_data.model_dump(exclude_unset=True).items():
         setattr(equipment, field, value)
     # 4. บันทึก
-    db.commit()
-    db.refresh(equipment)
+    await db.commit()
+    await db.refresh(equipment)
     return equipment
 
 # DELETE - ลบอุปกรณ์
 @router.delete("/{equipment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_equipment(equipment_id: UUID, db: Session = Depends(get_db)):
+async def delete_equipment(equipment_id: UUID, db: AsyncSession = Depends(get_async_db)):
     # 1. หาอุปกรณ์
-    equipment = db.query(Equipment).filter(Equipment.id == equipment_id).first()
+    equipment = await db.get(Equipment, equipment_id)
     # 2. ไม่เจอ → 404
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
-    # 3. ลบ
-    db.delete(equipment)
-    db.commit()
\ No newline at end of file
+    # 3. ลบ (room_equipments ของอุปกรณ์นี้ถูกลบตาม → คำนวณสรุปอุปกรณ์ของห้องเหล่านั้นใหม่)
+    room_ids = (await db.scalars(select(RoomEquipment.room_id).where(RoomEquipment.equipment_id == equipment_id))).all()
+    await db.delete(equipment)
+    await db.flush()
+    await db.run_sync(refresh_summaries, room_ids)
+    await db.commit()
\ No newline at end of file
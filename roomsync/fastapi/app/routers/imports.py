@@ -0,0 +1,68 @@
+'''
+Import ข้อมูลทีละมาก ๆ (onboarding ตึกใหม่ทั้งตึกด้วยไฟล์เดียวแทนยิง API ทีละห้อง)
+
+POST /imports/rooms             ไฟล์ห้อง (field เดียวกับ RoomCreate)
+POST /imports/equipments        ไฟล์อุปกรณ์ (field เดียวกับ EquipmentCreate)
+POST /imports/room-equipments   ไฟล์จับคู่ห้อง-อุปกรณ์ (room_id/room_name, equipment_id/equipment_name, quantity)
+CLI เดียวกัน: python -m app.cli import-data rooms rooms.csv
+'''
+
+
+
+import io
+import shutil
+import tempfile
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db import SessionLocal
+from app.dependencies.auth import require_admin
+from app.models.profile import Profile
+from app.schemas.imports import ImportReport
+from app.services.bulk_import import IMPORT_FORMATS, IMPORT_KINDS, format_from_filename, import_file
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+def _run_import(kind: str, upload: UploadFile, import_format: str, dry_run: bool) -> ImportReport:
+    # งาน batch ยาว ๆ → Session ปกติบน threadpool ของมันเอง (ไม่ใช้ session ของ request)
+    # SpooledTemporaryFile ของ Python 3.10 (image python:3.10-alpine) ไม่มี readable() → TextIOWrapper ใช้ตรง ๆ ไม่ได้
+    # คัดลอกลงไฟล์ชั่วคราวจริงก่อน (ทีละ block ไม่โหลดทั้งไฟล์เข้า memory)
+    with tempfile.TemporaryFile() as spooled:
+        upload.file.seek(0)
+        shutil.copyfileobj(upload.file, spooled)
+        spooled.seek(0)
+        stream = io.TextIOWrapper(spooled, encoding="utf-8-sig", newline="")
+        db = SessionLocal()
+        try:
+            return import_file(
+                db, kind, stream, import_format,
+                chunk_size=settings.import_chunk_size, dry_run=dry_run, max_errors=settings.import_max_errors,
+            )
+        finally:
+            stream.detach()
+            db.close()
+
+
+# POST - import ไฟล์ CSV / JSON / NDJSON (Admin only)
+@router.post("/{kind}", response_model=ImportReport)
+async def import_data(
+    kind: str,
+    file: UploadFile = File(..., description="CSV (แถวแรกเป็นชื่อ field), JSON array หรือ NDJSON"),
+    format: str = Query(None, description="csv, json หรือ ndjson (ไม่ระบุ → ดูจากนามสกุลไฟล์)"),
+    dry_run: bool = Query(False, description="validate และนับผลอย่างเดียว ไม่บันทึก"),
+    current_user: Profile = Depends(require_admin)
+):
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown import kind. Use one of: {', '.join(IMPORT_KINDS)}")
+
+    import_format = format or format_from_filename(file.filename)
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+
+    report = await run_in_threadpool(_run_import, kind, file, import_format, dry_run)
+    if report.error and report.total == 0:
+        raise HTTPException(status_code=400, detail=f"Could not read import file: {report.error}")
+    return report
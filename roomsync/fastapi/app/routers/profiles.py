@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.profile import Profile, UserRole
 from app.schemas.profile import (
     ProfileCreate,
@@ -14,6 +15,9 @@ from app.schemas.profile import (
     UserRoleEnum,
 )
 from app.dependencies.auth import get_current_user, require_admin
+from app.pagination import paginate
+from app.services.counters import profile_role_counter
+from app.services.profile_cache import profile_cache
 
 
 router = APIRouter(prefix="/profiles", tags=["Profiles"])
@@ -23,11 +27,13 @@ router = APIRouter(prefix="/profiles", tags=["Profiles"])
 # GET /profiles/ - ดึง Profile ทั้งหมด (Admin only)
 # ════════════════════════════════════════════════════════════════════════════
 @router.get("/", response_model=List[ProfileResponse])
-def get_all_profiles(
+async def get_all_profiles(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="ค่าจาก header X-Next-Cursor ของหน้าก่อน (แทน skip)"),
     role: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(require_admin)
 ):
     """
@@ -35,44 +41,38 @@ def get_all_profiles(
     
     - **skip**: ข้ามกี่รายการ (pagination)
     - **limit**: จำกัดจำนวน (pagination)
+    - **cursor**: ค่าจาก header X-Next-Cursor ของหน้าก่อน (keyset pagination, ใช้แทน skip)
     - **role**: filter ตาม role (admin, teacher, student)
     """
-    query = db.query(Profile)
+    query = select(Profile)
     
     if role:
-        query = query.filter(Profile.role == role)
+        query = query.where(Profile.role == role)
     
-    return query.order_by(Profile.created_at.desc()).offset(skip).limit(limit).all()
+    return await paginate(
+        db, query, response, (Profile.created_at, Profile.id),
+        descending=True, limit=limit, cursor=cursor, skip=skip
+    )
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # GET /profiles/summary - สรุปจำนวน Users (Admin only)
 # ════════════════════════════════════════════════════════════════════════════
 @router.get("/summary", response_model=ProfileSummary)
-def get_profile_summary(
-    db: Session = Depends(get_db),
+async def get_profile_summary(
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(require_admin)
 ):
     """ดึงสรุปจำนวน Users ตาม Role (Admin only)"""
     
-    from sqlalchemy import func
-    
-    total = db.query(func.count(Profile.id)).scalar()
-    admin_count = db.query(func.count(Profile.id)).filter(
-        Profile.role == UserRole.ADMIN.value
-    ).scalar()
-    teacher_count = db.query(func.count(Profile.id)).filter(
-        Profile.role == UserRole.TEACHER.value
-    ).scalar()
-    student_count = db.query(func.count(Profile.id)).filter(
-        Profile.role == UserRole.STUDENT.value
-    ).scalar()
+    # GROUP BY role ครั้งเดียว แล้ว cache ไว้ (create/role change/delete ปรับตัวเลขให้เอง)
+    counts = await db.run_sync(profile_role_counter.get)
     
     return ProfileSummary(
-        total=total,
-        admin=admin_count,
-        teacher=teacher_count,
-        student=student_count
+        total=sum(counts.values()),
+        admin=counts.get(UserRole.ADMIN.value, 0),
+        teacher=counts.get(UserRole.TEACHER.value, 0),
+        student=counts.get(UserRole.STUDENT.value, 0)
     )
 
 
@@ -80,7 +80,7 @@ def get_profile_summary(
 # GET /profiles/me - ดึงข้อมูลตัวเอง
 # ════════════════════════════════════════════════════════════════════════════
 @router.get("/me", response_model=ProfileResponse)
-def get_my_profile(current_user: Profile = Depends(get_current_user)):
+async def get_my_profile(current_user: Profile = Depends(get_current_user)):
     """ดึงข้อมูล Profile ของตัวเอง"""
     return current_user
 
@@ -89,16 +89,16 @@ def get_my_profile(current_user: Profile = Depends(get_current_user)):
 # GET /profiles/check/{auth_user_id} - เช็คว่ามี Profile หรือยัง
 # ════════════════════════════════════════════════════════════════════════════
 @router.get("/check/{auth_user_id}", response_model=ProfileResponse)
-def check_profile_exists(
+async def check_profile_exists(
     auth_user_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     เช็คว่า auth_user_id นี้มี Profile หรือยัง
     
     ใช้หลังจาก Supabase Auth signup เพื่อเช็คว่าต้องสร้าง Profile ไหม
     """
-    profile = db.query(Profile).filter(Profile.auth_user_id == auth_user_id).first()
+    profile = await db.scalar(select(Profile).where(Profile.auth_user_id == auth_user_id))
     
     if not profile:
         raise HTTPException(
@@ -113,14 +113,14 @@ def check_profile_exists(
 # GET /profiles/{profile_id} - ดึง Profile ตาม ID (Admin only)
 # ════════════════════════════════════════════════════════════════════════════
 @router.get("/{profile_id}", response_model=ProfileResponse)
-def get_profile(
+async def get_profile(
     profile_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(require_admin)
 ):
     """ดึงข้อมูล Profile ตาม ID (Admin only)"""
     
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
+    profile = await db.get(Profile, profile_id)
     
     if not profile:
         raise HTTPException(
@@ -135,9 +135,9 @@ def get_profile(
 # POST /profiles/ - สร้าง Profile ใหม่
 # ════════════════════════════════════════════════════════════════════════════
 @router.post("/", response_model=ProfileResponse, status_code=status.HTTP_201_CREATED)
-def create_profile(
+async def create_profile(
     profile_data: ProfileCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     สร้าง Profile ใหม่ (เรียกหลังจาก Supabase Auth signup)
@@ -149,9 +149,9 @@ def create_profile(
     """
     
     # เช็คว่า auth_user_id ซ้ำไหม
-    existing = db.query(Profile).filter(
+    existing = await db.scalar(select(Profile).where(
         Profile.auth_user_id == profile_data.auth_user_id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -167,8 +167,9 @@ def create_profile(
     )
     
     db.add(profile)
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
+    profile_role_counter.adjust(profile.role, 1)
     return profile
 
 
@@ -176,9 +177,9 @@ def create_profile(
 # PUT /profiles/me - อัพเดท Profile ของตัวเอง
 # ════════════════════════════════════════════════════════════════════════════
 @router.put("/me", response_model=ProfileResponse)
-def update_my_profile(
+async def update_my_profile(
     profile_data: ProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(get_current_user)
 ):
     """
@@ -193,22 +194,32 @@ def update_my_profile(
     if 'role' in update_data:
         del update_data['role']
     
+    # current_user อาจมาจาก profile cache (ไม่ผูก session) → โหลดตัวจริงก่อนแก้
+    profile = await db.get(Profile, current_user.id)
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(profile, field, value)
     
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    await db.commit()
+    await db.refresh(profile)
+    await profile_cache.invalidate(profile.auth_user_id)
+    return profile
 
 
 # ════════════════════════════════════════════════════════════════════════════
 # PUT /profiles/{profile_id} - อัพเดท Profile (Admin only)
 # ════════════════════════════════════════════════════════════════════════════
 @router.put("/{profile_id}", response_model=ProfileResponse)
-def update_profile(
+async def update_profile(
     profile_id: UUID,
     profile_data: ProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(require_admin)
 ):
     """
@@ -217,7 +228,7 @@ def update_profile(
     Admin สามารถเปลี่ยน role ได้
     """
     
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
+    profile = await db.get(Profile, profile_id)
     
     if not profile:
         raise HTTPException(
@@ -231,13 +242,16 @@ def update_profile(
     if 'role' in update_data and update_data['role']:
         update_data['role'] = update_data['role'].value
     
+    old_role = profile.role
     for field, value in update_data.items():
         setattr(profile, field, value)
     
     profile.updated_by = current_user.auth_user_id
     
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
+    profile_role_counter.move(old_role, profile.role)
+    await profile_cache.invalidate(profile.auth_user_id)
     return profile
 
 
@@ -245,10 +259,10 @@ def update_profile(
 # PATCH /profiles/{profile_id}/role - เปลี่ยน Role (Admin only)
 # ════════════════════════════════════════════════════════════════════════════
 @router.patch("/{profile_id}/role", response_model=ProfileResponse)
-def change_user_role(
+async def change_user_role(
     profile_id: UUID,
     role: UserRoleEnum,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(require_admin)
 ):
     """
@@ -259,7 +273,7 @@ def change_user_role(
     - เปลี่ยน teacher → admin
     """
     
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
+    profile = await db.get(Profile, profile_id)
     
     if not profile:
         raise HTTPException(
@@ -274,11 +288,14 @@ def change_user_role(
             detail="Cannot change your own role"
         )
     
+    old_role = profile.role
     profile.role = role.value
     profile.updated_by = current_user.auth_user_id
     
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
+    profile_role_counter.move(old_role, profile.role)
+    await profile_cache.invalidate(profile.auth_user_id)
     return profile
 
 
@@ -286,9 +303,9 @@ def change_user_role(
 # DELETE /profiles/{profile_id} - ลบ Profile (Admin only)
 # ════════════════════════════════════════════════════════════════════════════
 @router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_profile(
+async def delete_profile(
     profile_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Profile = Depends(require_admin)
 ):
     """
@@ -298,7 +315,7 @@ def delete_profile(
     ⚠️ ควรลบ Supabase Auth user ด้วย (ทำที่ Frontend หรือ Supabase trigger)
     """
     
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
+    profile = await db.get(Profile, profile_id)
     
     if not profile:
         raise HTTPException(
@@ -313,5 +330,7 @@ def delete_profile(
             detail="Cannot delete yourself"
         )
     
-    db.delete(profile)
-    db.commit()
+    await db.delete(profile)
+    await db.commit()
+    profile_role_counter.adjust(profile.role, -1)
+    await profile_cache.invalidate(profile.auth_user_id)
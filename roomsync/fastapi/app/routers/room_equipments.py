@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.room_equipment import RoomEquipment
 from app.models.room import Room
 from app.models.equipment import Equipment
-from app.schemas.room_equipment import RoomEquipmentCreate, RoomEquipmentUpdate, RoomEquipmentResponse
+from app.services.room_equipment_summary import summary_delta
+from app.schemas.room_equipment import RoomEquipmentCreate, RoomEquipmentUpdate, RoomEquipmentResponse, RoomEquipmentDetail
 
 router = APIRouter(prefix="/room-equipments", tags=["Room Equipments"])
 
@@ -15,45 +17,60 @@ router = APIRouter(prefix="/room-equipments", tags=["Room Equipments"])
 # ──────────────────────────────────────────────────────────────────
 # GET - ดึงอุปกรณ์ทั้งหมดในห้อง
 # ──────────────────────────────────────────────────────────────────
-@router.get("/room/{room_id}", response_model=List[RoomEquipmentResponse])
-def get_equipments_in_room(room_id: UUID, db: Session = Depends(get_db)):
-    """ดึงรายการอุปกรณ์ทั้งหมดในห้อง"""
-    return db.query(RoomEquipment).filter(RoomEquipment.room_id == room_id).all()
+@router.get("/room/{room_id}", response_model=List[RoomEquipmentDetail])
+async def get_equipments_in_room(room_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    """ดึงรายการอุปกรณ์ทั้งหมดในห้อง พร้อมชื่อห้อง/อุปกรณ์ (JOIN ใน query เดียว ไม่ lazy load ทีละแถว)"""
+    rows = (await db.execute(
+        select(RoomEquipment, Room.name, Equipment.name)
+        .join(Room, RoomEquipment.room_id == Room.id)
+        .join(Equipment, RoomEquipment.equipment_id == Equipment.id)
+        .where(RoomEquipment.room_id == room_id)
+    )).all()
+    return [
+        RoomEquipmentDetail(
+            **RoomEquipmentResponse.model_validate(item).model_dump(),
+            room_name=room_name,
+            equipment_name=equipment_name,
+        )
+        for item, room_name, equipment_name in rows
+    ]
 
 
 # ──────────────────────────────────────────────────────────────────
 # POST - เพิ่มอุปกรณ์ในห้อง (ถ้ามีอยู่แล้วจะเพิ่มจำนวน)
 # ──────────────────────────────────────────────────────────────────
 @router.post("/", response_model=RoomEquipmentResponse, status_code=status.HTTP_201_CREATED)
-def add_equipment_to_room(data: RoomEquipmentCreate, db: Session = Depends(get_db)):
+async def add_equipment_to_room(data: RoomEquipmentCreate, db: AsyncSession = Depends(get_async_db)):
     """เพิ่มอุปกรณ์ในห้อง (ถ้ามีอยู่แล้วจะเพิ่มจำนวน)"""
     
     # ตรวจสอบว่าห้องมีจริง
-    if not db.query(Room).filter(Room.id == data.room_id).first():
+    if not await db.get(Room, data.room_id):
         raise HTTPException(status_code=404, detail="Room not found")
     
     # ตรวจสอบว่าอุปกรณ์มีจริง
-    if not db.query(Equipment).filter(Equipment.id == data.equipment_id).first():
+    if not await db.get(Equipment, data.equipment_id):
         raise HTTPException(status_code=404, detail="Equipment not found")
     
     # ตรวจสอบว่ามีอยู่แล้วหรือยัง
-    existing = db.query(RoomEquipment).filter(
+    existing = await db.scalar(select(RoomEquipment).where(
         RoomEquipment.room_id == data.room_id,
         RoomEquipment.equipment_id == data.equipment_id
-    ).first()
+    ).with_for_update())
     
     # ถ้ามีอยู่แล้ว → เพิ่มจำนวน
     if existing:
         existing.quantity += data.quantity
-        db.commit()
-        db.refresh(existing)
+        await db.execute(summary_delta(data.room_id, total=data.quantity))
+        await db.commit()
+        await db.refresh(existing)
         return existing
     
     # ถ้ายังไม่มี → สร้างใหม่
     room_equipment = RoomEquipment(**data.model_dump())
     db.add(room_equipment)
-    db.commit()
-    db.refresh(room_equipment)
+    await db.execute(summary_delta(data.room_id, types=1, total=data.quantity))
+    await db.commit()
+    await db.refresh(room_equipment)
     return room_equipment
 
 
@@ -61,17 +78,19 @@ def add_equipment_to_room(data: RoomEquipmentCreate, db: Session = Depends(get_d
 # PUT - Set จำนวนอุปกรณ์ใหม่ (แทนที่ค่าเดิม)
 # ──────────────────────────────────────────────────────────────────
 @router.put("/{id}", response_model=RoomEquipmentResponse)
-def update_room_equipment(id: UUID, data: RoomEquipmentUpdate, db: Session = Depends(get_db)):
+async def update_room_equipment(id: UUID, data: RoomEquipmentUpdate, db: AsyncSession = Depends(get_async_db)):
     """Set จำนวนอุปกรณ์ใหม่ (แทนที่ค่าเดิม)"""
     
-    room_equipment = db.query(RoomEquipment).filter(RoomEquipment.id == id).first()
+    # FOR UPDATE: request อื่นที่แก้แถวเดียวกันรอจน commit → delta คิดจาก quantity ล่าสุดเสมอ
+    room_equipment = await db.get(RoomEquipment, id, with_for_update=True)
     
     if not room_equipment:
         raise HTTPException(status_code=404, detail="Room equipment not found")
     
+    await db.execute(summary_delta(room_equipment.room_id, total=data.quantity - room_equipment.quantity))
     room_equipment.quantity = data.quantity
-    db.commit()
-    db.refresh(room_equipment)
+    await db.commit()
+    await db.refresh(room_equipment)
     return room_equipment
 
 
@@ -79,10 +98,10 @@ def update_room_equipment(id: UUID, data: RoomEquipmentUpdate, db: Session = Dep
 # PATCH - ปรับจำนวนอุปกรณ์ (+เพิ่ม หรือ -ลด)  ⭐ NEW
 # ──────────────────────────────────────────────────────────────────
 @router.patch("/{id}/adjust", response_model=RoomEquipmentResponse)
-def adjust_equipment_quantity(
+async def adjust_equipment_quantity(
     id: UUID,
     amount: int = Query(..., description="จำนวนที่จะปรับ (+ เพิ่ม, - ลด)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ปรับจำนวนอุปกรณ์ในห้อง
@@ -91,7 +110,7 @@ def adjust_equipment_quantity(
     - ถ้าเหลือ 0 จะลบ record ออกอัตโนมัติ
     """
     
-    room_equipment = db.query(RoomEquipment).filter(RoomEquipment.id == id).first()
+    room_equipment = await db.get(RoomEquipment, id, with_for_update=True)
     
     if not room_equipment:
         raise HTTPException(status_code=404, detail="Room equipment not found")
@@ -108,8 +127,9 @@ def adjust_equipment_quantity(
     
     # ถ้าเหลือ 0 → ลบ record ทิ้ง
     if new_quantity == 0:
-        db.delete(room_equipment)
-        db.commit()
+        await db.delete(room_equipment)
+        await db.execute(summary_delta(room_equipment.room_id, types=-1, total=amount))
+        await db.commit()
         # Return response ก่อนลบ พร้อมบอกว่าถูกลบแล้ว
         raise HTTPException(
             status_code=200,
@@ -118,8 +138,9 @@ def adjust_equipment_quantity(
     
     # อัพเดทจำนวน
     room_equipment.quantity = new_quantity
-    db.commit()
-    db.refresh(room_equipment)
+    await db.execute(summary_delta(room_equipment.room_id, total=amount))
+    await db.commit()
+    await db.refresh(room_equipment)
     return room_equipment
 
 
@@ -127,13 +148,14 @@ def adjust_equipment_quantity(
 # DELETE - ลบอุปกรณ์ออกจากห้องทั้งหมด
 # ──────────────────────────────────────────────────────────────────
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_equipment_from_room(id: UUID, db: Session = Depends(get_db)):
+async def remove_equipment_from_room(id: UUID, db: AsyncSession = Depends(get_async_db)):
     """ลบอุปกรณ์ออกจากห้องทั้งหมด"""
     
-    room_equipment = db.query(RoomEquipment).filter(RoomEquipment.id == id).first()
+    room_equipment = await db.get(RoomEquipment, id, with_for_update=True)
     
     if not room_equipment:
         raise HTTPException(status_code=404, detail="Room equipment not found")
     
-    db.delete(room_equipment)
-    db.commit()
\ No newline at end of file
+    await db.delete(room_equipment)
+    await db.execute(summary_delta(room_equipment.room_id, types=-1, total=-room_equipment.quantity))
+    await db.commit()
\ No newline at end of file
@@ -1,35 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import asc, desc
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Optional, Set
+from datetime import datetime
 from uuid import UUID
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models.room import Room
 from app.models.room_equipment import RoomEquipment
-from app.models.equipment import Equipment
-from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomWithEquipments, EquipmentInRoom
+from app.models.damage_report import DamageReport, DamageStatus
+from app.pagination import paginate
+from app.schemas.damage_report import DamageReportResponse
+from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomWithEquipments, RoomExpanded, EquipmentInRoom
+from app.services.room_availability import MAX_WINDOW_DAYS, days_covered, find_available_rooms
+from app.services.counters import room_status_counter
 
 # สร้าง Router
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 # เมื่อ main.py ใช้: app.include_router(rooms.router, prefix="/api/v1")
 # URL จริงจะเป็น: /api/v1/rooms/...
 
+# ?include= ที่ GET /rooms รองรับ: โหลดของทุกห้องในหน้าพร้อมกันทีละชุด (ไม่ lazy load ทีละห้อง)
+# 100 ห้อง + equipments = 2 query (rooms, room_equipments JOIN equipments WHERE room_id IN (...))
+ROOM_INCLUDES = ("equipments", "open_damage_reports")
+
+
+def _parse_include(include: Optional[str]) -> Set[str]:
+    names = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+    unknown = names.difference(ROOM_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(sorted(unknown))} (choose from {', '.join(ROOM_INCLUDES)})"
+        )
+    return names
+
+
+def _include_options(names: Set[str]) -> list:
+    options = []
+    if "equipments" in names:
+        options.append(selectinload(Room.room_equipments).joinedload(RoomEquipment.equipment))
+    if "open_damage_reports" in names:
+        # โหลดเฉพาะรายงานที่ยังไม่ resolved เข้า Room.damage_reports (session ของ request นี้เท่านั้น)
+        options.append(selectinload(Room.damage_reports.and_(DamageReport.status != DamageStatus.RESOLVED.value)))
+    return options
+
+
+def _equipments_of(room: Room) -> List[EquipmentInRoom]:
+    """room.room_equipments + .equipment ต้องโหลดมาแล้ว (selectinload / joinedload)"""
+    return [
+        EquipmentInRoom(id=item.equipment.id, name=item.equipment.name, quantity=item.quantity)
+        for item in room.room_equipments
+    ]
+
+
+def _expand(room: Room, names: Set[str]) -> RoomExpanded:
+    data = RoomResponse.model_validate(room).model_dump()
+    if "equipments" in names:
+        data["equipments"] = _equipments_of(room)
+    if "open_damage_reports" in names:
+        data["open_damage_reports"] = [
+            DamageReportResponse.model_validate(report)
+            for report in sorted(room.damage_reports, key=lambda report: report.created_at, reverse=True)
+        ]
+    return RoomExpanded(**data)
+
+
 # GET - ดึงห้องทั้งหมด
-@router.get("/", response_model=List[RoomResponse])
-def get_all_rooms(
+@router.get("/", response_model=List[RoomExpanded], response_model_exclude_unset=True)
+async def get_all_rooms(
+    response: Response,
     skip: int = 0,       # ข้ามกี่ record (pagination)
     limit: int = 100,    # เอากี่ record
+    cursor: Optional[str] = Query(None, description="ค่าจาก header X-Next-Cursor ของหน้าก่อน (แทน skip)"),
     status: str = None,  # filter ตาม status (available, booked, inuse, broken)
     sort_by: str = "name",
     sort_order: str = "asc",
-    db: Session = Depends(get_db) # inject database session ยืมมาใช้ก่อนน้า
+    include: Optional[str] = Query(None, description="คั่นด้วย , : equipments, open_damage_reports"),
+    db: AsyncSession = Depends(get_async_db) # inject database session ยืมมาใช้ก่อนน้า
 ):
-    query = db.query(Room) # SELECT * FROM rooms
+    names = _parse_include(include)
+    query = select(Room).options(*_include_options(names)) # SELECT * FROM rooms
 
     # ถ้ามี filter status
     if status is not None:
-        query = query.filter(Room.status == status) # WHERE status = ?
+        query = query.where(Room.status == status) # WHERE status = ?
     sortable_fields = {
         "name": Room.name,
         "level": Room.level,
@@ -38,93 +94,107 @@ def get_all_rooms(
         "updated_at": Room.updated_at,
     }
     sort_column = sortable_fields.get(sort_by, Room.name)
-    sort_fn = asc if sort_order == "asc" else desc
-    query = query.order_by(sort_fn(sort_column))
-    return query.offset(skip).limit(limit).all()    # OFFSET ? LIMIT ?
+    # ORDER BY <sort_column>, id → หน้าถัดไปใช้ WHERE (<sort_column>, id) > cursor แทน OFFSET
+    rooms = await paginate(
+        db, query, response, (sort_column, Room.id),
+        descending=sort_order != "asc", limit=limit, cursor=cursor, skip=skip
+    )
+    if not names:
+        return rooms
+    return [_expand(room, names) for room in rooms]
 
 @router.get("/status", response_model=dict)
-def get_rooms_status_overview(db: Session = Depends(get_db)):
-    
-    availableRooms = db.query(Room).filter(Room.status == 'available').count()
-    bookedRooms = db.query(Room).filter(Room.status == 'booked').count()
-    brokenRooms = db.query(Room).filter(Room.status == 'broken').count()
-    inUseRooms = db.query(Room).filter(Room.status == 'inuse').count()
+async def get_rooms_status_overview(db: AsyncSession = Depends(get_async_db)):
+    # GROUP BY status ครั้งเดียว แล้ว cache ไว้ (create/update/delete ปรับตัวเลขให้เอง)
+    counts = await db.run_sync(room_status_counter.get)
 
     return {
-        "available": availableRooms,
-        "booked": bookedRooms,
-        "broken": brokenRooms,
-        "inuse": inUseRooms
+        "available": counts.get('available', 0),
+        "booked": counts.get('booked', 0),
+        "broken": counts.get('broken', 0),
+        "inuse": counts.get('inuse', 0)
     }
 
+#  GET - ค้นหาห้องที่ว่างตลอดช่วงเวลา (ใช้ free/busy bitmap ไม่ต้องโหลด bookings ทั้งหมด)
+# ต้องประกาศก่อน /{room_id} ไม่งั้น "available-between" จะถูกมองเป็น room_id
+@router.get("/available-between", response_model=List[RoomResponse])
+async def get_rooms_available_between(
+    start: datetime = Query(..., description="เริ่ม (ISO 8601)"),
+    end: datetime = Query(..., description="สิ้นสุด (ISO 8601)"),
+    min_pax: Optional[int] = Query(None, ge=1),
+    level: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if len(days_covered(start, end)) > MAX_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window cannot exceed {MAX_WINDOW_DAYS} days")
+    return await db.run_sync(find_available_rooms, start, end, min_pax=min_pax, level=level)
+
 #  GET - ดึงห้องตาม ID
 @router.get("/{room_id}", response_model=RoomWithEquipments)
-def get_room(room_id: UUID, db: Session = Depends(get_db)):
-    # 1. หาห้องจาก ID
-    room = db.query(Room).filter(Room.id == room_id).first()
+async def get_room(room_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    # 1. หาห้อง + equipments ใน query เดียว (rooms LEFT JOIN room_equipments LEFT JOIN equipments)
+    room = (await db.execute(
+        select(Room).where(Room.id == room_id)
+        .options(joinedload(Room.room_equipments).joinedload(RoomEquipment.equipment))
+    )).unique().scalar_one_or_none()
 
      # 2. ถ้าไม่เจอ → Error 404
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
-    
-     # 3. ดึง equipments ในห้องนี้ (JOIN query)
-    room_equipments = db.query(
-        Equipment.id, Equipment.name, RoomEquipment.quantity
-    ).join(RoomEquipment).filter(RoomEquipment.room_id == room_id).all()
-    
-    # 4. แปลงเป็น list ของ EquipmentInRoom
-    equipments = [
-        EquipmentInRoom(id=eq.id, name=eq.name, quantity=eq.quantity)
-        for eq in room_equipments
-    ]
-    
-    # 5. รวม room + equipments แล้ว return
+
+    # 3. รวม room + equipments แล้ว return
     return RoomWithEquipments(
         **RoomResponse.model_validate(room).model_dump(),
-        equipments=equipments
+        equipments=_equipments_of(room)
     )
 
 # POST - สร้างห้องใหม่
 @router.post("/", response_model=RoomResponse, status_code=status.HTTP_201_CREATED)
-def create_room(room_data: RoomCreate, db: Session = Depends(get_db)):
+async def create_room(room_data: RoomCreate, db: AsyncSession = Depends(get_async_db)):
     # 1. สร้าง Room object จากข้อมูลที่ส่งมา
     room = Room(**room_data.model_dump()) # เท่ากับ: Room(name="ห้อง A", capacity=10, status=True)
     db.add(room)         # 2. เพิ่มลง database
-    db.commit()          # 3. บันทึก
-    db.refresh(room)     # 4. refresh เพื่อดึง id ที่ database generate มา
+    await db.commit()          # 3. บันทึก
+    await db.refresh(room)     # 4. refresh เพื่อดึง id ที่ database generate มา
+    room_status_counter.adjust(room.status, 1)
     return room          # 5. return ห้องที่สร้าง
 
 #  PUT - อัพเดทห้อง
 @router.put("/{room_id}", response_model=RoomResponse)
-def update_room(room_id: UUID, room_data: RoomUpdate, db: Session = Depends(get_db)):
+async def update_room(room_id: UUID, room_data: RoomUpdate, db: AsyncSession = Depends(get_async_db)):
     # 1. หาห้องที่จะอัพเดท
-    room = db.query(Room).filter(Room.id == room_id).first()
+    room = await db.get(Room, room_id)
 
      # 2. ไม่เจอ → Error 404
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
+    old_status = room.status
     # 3. อัพเดทเฉพาะ field ที่ส่งมา
     for field, value in room_data.model_dump(exclude_unset=True).items():
         setattr(room, field, value)
     # exclude_unset=True → ไม่รวม field ที่ไม่ได้ส่งมา
     
-    db.commit()
-    db.refresh(room)
+    await db.commit()
+    await db.refresh(room)
+    room_status_counter.move(old_status, room.status)
     return room
 
 # DELETE - ลบห้อง
 @router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_room(room_id: UUID, db: Session = Depends(get_db)):
+async def delete_room(room_id: UUID, db: AsyncSession = Depends(get_async_db)):
     # 1. หาห้อง
-    room = db.query(Room).filter(Room.id == room_id).first()
+    room = await db.get(Room, room_id)
     # 2. ไม่เจอ → Error 404
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
-    db.delete(room) # 3. ลบ
-    db.commit()
+    await db.delete(room) # 3. ลบ
+    await db.commit()
+    room_status_counter.adjust(room.status, -1)
     # 4. ไม่ return อะไร (204 No Content  สำเร็จ แต่ไม่มี response body)
 
 #  GET - ดึงเฉพาะห้องว่าง
 @router.get("/available/", response_model=List[RoomResponse])
-def get_available_rooms(db: Session = Depends(get_db)):
-    return db.query(Room).filter(Room.status == True).all()
\ No newline at end of file
+async def get_available_rooms(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(Room).where(Room.status == True))).all()
\ No newline at end of file
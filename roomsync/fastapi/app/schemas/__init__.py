@@ -2,6 +2,7 @@ from app.schemas.room import RoomCreate, RoomUpdate, RoomResponse, RoomWithEquip
 from app.schemas.equipment import EquipmentCreate, EquipmentUpdate, EquipmentResponse
 from app.schemas.room_equipment import RoomEquipmentCreate, RoomEquipmentResponse
 from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from app.schemas.booking_series import BookingSeriesCreate, BookingSeriesResponse, BookingOccurrence
 from app.schemas.damage_report import DamageReportCreate, DamageReportUpdate, DamageReportResponse
 # Profile
 from app.schemas.profile import (
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 from enum import Enum
@@ -44,6 +44,10 @@ class BookingBase(BaseModel):
 class BookingCreate(BookingBase):
     pass
 
+# BATCH CREATE SCHEMA - ใช้ตอนจองหลายรายการพร้อมกัน (เช่น จองรายสัปดาห์ทั้งเทอม)
+class BookingBatchCreate(BaseModel):
+    items: List[BookingCreate] = Field(..., min_length=1, max_length=500)
+
 # STATUS UPDATE SCHEMA - ใช้ตอนเปลี่ยนสถานะ
 class BookingUpdate(BaseModel):
     start_time: Optional[datetime] = None
@@ -54,6 +58,7 @@ class BookingUpdate(BaseModel):
 class BookingResponse(BookingBase):
     id: UUID
     user_id: UUID
+    series_id: Optional[UUID] = None  # มีค่าเมื่อเป็น occurrence ของ booking series
     status: str
     created_at: datetime
     updated_at: datetime
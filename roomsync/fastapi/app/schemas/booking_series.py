@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+from enum import Enum
+
+from app.models.booking import as_utc
+from app.schemas.booking import BookingBase
+
+# ENUM - ความถี่ของการจองซ้ำ
+class RecurrenceFreqEnum(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+# CREATE SCHEMA - ใช้ตอนจองแบบซ้ำ (start_time/end_time = occurrence แรก)
+class BookingSeriesCreate(BookingBase):
+    freq: RecurrenceFreqEnum = RecurrenceFreqEnum.WEEKLY
+    interval: int = Field(default=1, ge=1, le=52)
+    count: Optional[int] = Field(None, ge=1, le=500)
+    until: Optional[datetime] = None
+
+    @model_validator(mode='after')
+    def validate_recurrence_end(self):
+        """ต้องระบุ count หรือ until อย่างใดอย่างหนึ่ง (ห้ามซ้ำไม่มีที่สิ้นสุด)"""
+        if (self.count is None) == (self.until is None):
+            raise ValueError('Exactly one of count or until is required')
+        # until ไม่มี timezone + start_time มี (หรือกลับกัน) เทียบตรง ๆ ไม่ได้ (TypeError → 500)
+        if self.until is not None and as_utc(self.until) < as_utc(self.start_time):
+            raise ValueError('until must be after start_time')
+        return self
+
+# RESPONSE SCHEMA - ใช้ตอบกลับ
+class BookingSeriesResponse(BookingSeriesCreate):
+    id: UUID
+    user_id: UUID
+    status: str
+    ends_at: datetime
+    created_at: datetime
+    updated_at: datetime
+    created_by: Optional[UUID] = None
+    updated_by: Optional[UUID] = None
+
+    class Config:
+        from_attributes = True
+
+# OCCURRENCE - หนึ่งครั้งของ series (ขยายตอนขอดู ไม่ได้เก็บใน DB)
+class BookingOccurrence(BaseModel):
+    series_id: UUID
+    room_id: UUID
+    start_time: datetime
+    end_time: datetime
+    status: str
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+# แถวที่ import ไม่ผ่าน (row = บรรทัดในไฟล์ CSV/NDJSON หรือลำดับใน JSON array)
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+# RESPONSE SCHEMA - สรุปผลการ import
+class ImportReport(BaseModel):
+    kind: str
+    dry_run: bool = False
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+    # ไฟล์อ่านต่อไม่ได้ (JSON/CSV เสีย) → หยุดตรงนั้น chunk ก่อนหน้าบันทึกไปแล้ว
+    error: Optional[str] = None
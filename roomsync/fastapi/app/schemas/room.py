@@ -3,6 +3,8 @@ from typing import Optional, List
 from uuid import UUID
 from datetime import datetime, time
 
+from app.schemas.damage_report import DamageReportResponse
+
 # BASE SCHEMA - ใช้เป็นฐานสำหรับ Schema อื่น
 class RoomBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -36,6 +38,8 @@ class RoomUpdate(BaseModel):
 # RESPONSE SCHEMA - ใช้ตอบกลับ
 class RoomResponse(RoomBase):
     id: UUID
+    equipment_types: int = 0   # จำนวนประเภทอุปกรณ์ในห้อง
+    equipment_total: int = 0   # จำนวนอุปกรณ์รวมทุกประเภท
     until: Optional[datetime] = None
     activeTime: Optional[time] = None
     created_at: datetime
@@ -57,4 +61,10 @@ class EquipmentInRoom(BaseModel):
 
 # EXTENDED RESPONSE - Room พร้อม Equipments
 class RoomWithEquipments(RoomResponse):
-    equipments: List[EquipmentInRoom] = []
\ No newline at end of file
+    equipments: List[EquipmentInRoom] = []
+
+# EXPANDED RESPONSE - GET /rooms?include=equipments,open_damage_reports
+# field ที่ไม่ได้ขอใน include ไม่อยู่ใน response (response_model_exclude_unset)
+class RoomExpanded(RoomResponse):
+    equipments: Optional[List[EquipmentInRoom]] = None
+    open_damage_reports: Optional[List[DamageReportResponse]] = None
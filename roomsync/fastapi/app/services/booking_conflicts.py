@@ -0,0 +1,163 @@
+"""
+ตรวจสอบการจองซ้อนทับ (Booking conflict check)
+
+DB เป็นแหล่งเดียว (ไม่มี cache ต่อ process → ทุก worker / bulk import / sync เห็นค่าเดียวกัน)
+1. Query แบบ predicate เดียว  start_time < new_end AND end_time > new_start
+   ใช้ composite index ix_bookings_room_status_time (room_id, status, start_time, end_time)
+2. BookingSeries ที่ช่วง [start_time, ends_at) ทับ → ขยาย occurrence เฉพาะช่วงที่ตรวจ
+3. ตรวจหลายรายการ (batch / ทุก occurrence ของ series) → โหลดการจองในช่วงเวลานั้นด้วย query เดียว
+   แล้วเทียบใน memory เฉพาะ request นั้น
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking, BookingStatus, as_utc  # noqa: F401 (as_utc ใช้ต่อจากที่นี่)
+from app.models.booking_series import BookingSeries
+
+# สถานะที่ถือว่า "จองห้องอยู่" (ห้ามจองทับ)
+ACTIVE_STATUSES = (BookingStatus.PENDING.value, BookingStatus.APPROVED.value)
+
+
+# ════════════════════════════════════════════════════════════════
+# INTERVAL
+# ════════════════════════════════════════════════════════════════
+@dataclass(frozen=True)
+class BookingInterval:
+    start: datetime
+    end: datetime
+    booking_id: Optional[UUID] = None
+    series_id: Optional[UUID] = None
+
+    @classmethod
+    def of(
+        cls, start: datetime, end: datetime, booking_id: Optional[UUID] = None, series_id: Optional[UUID] = None
+    ) -> "BookingInterval":
+        return cls(as_utc(start), as_utc(end), booking_id, series_id)
+
+    def describe(self) -> str:
+        if self.series_id is not None:
+            return f"series {self.series_id} ({self.start.isoformat()})"
+        return f"booking {self.booking_id}"
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return self.start < as_utc(end) and self.end > as_utc(start)
+
+
+def first_overlap(intervals: Iterable[BookingInterval], start: datetime, end: datetime) -> Optional[BookingInterval]:
+    return next((interval for interval in intervals if interval.overlaps(start, end)), None)
+
+
+# ════════════════════════════════════════════════════════════════
+# PUBLIC API
+# ════════════════════════════════════════════════════════════════
+def find_conflict(
+    db: Session,
+    room_id: UUID,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_id: Optional[UUID] = None,
+) -> Optional[BookingInterval]:
+    """คืนการจองที่ทับกับช่วง [start_time, end_time) ของห้องนี้ (ถ้าไม่มีคืน None) ถาม DB ทุกครั้ง"""
+    query = db.query(Booking.id, Booking.start_time, Booking.end_time).filter(
+        Booking.room_id == room_id,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < end_time,
+        Booking.end_time > start_time,
+    )
+    if exclude_id is not None:
+        query = query.filter(Booking.id != exclude_id)
+    row = query.first()
+    if row:
+        return BookingInterval.of(row.start_time, row.end_time, row.id)
+
+    for series in active_series(db, [room_id], start_time, end_time):
+        if series.id == exclude_id:
+            continue
+        for occ_start, occ_end in series.occurrences(start_time, end_time):
+            return BookingInterval.of(occ_start, occ_end, series_id=series.id)
+    return None
+
+
+def active_series(db: Session, room_ids, window_start: datetime, window_end: datetime) -> List[BookingSeries]:
+    return db.query(BookingSeries).filter(
+        BookingSeries.room_id.in_(room_ids),
+        BookingSeries.status.in_(ACTIVE_STATUSES),
+        BookingSeries.start_time < window_end,
+        BookingSeries.ends_at > window_start,
+    ).all()
+
+
+def _existing_intervals(
+    db: Session, room_ids, window_start: datetime, window_end: datetime, exclude_series_id: Optional[UUID] = None
+) -> Dict[UUID, List[BookingInterval]]:
+    """โหลดการจอง + occurrence ของ series ทุกห้องในช่วงเวลาเดียว (query เดียว) เป็น list ต่อห้อง"""
+    rows = db.query(Booking.id, Booking.room_id, Booking.start_time, Booking.end_time).filter(
+        Booking.room_id.in_(room_ids),
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < window_end,
+        Booking.end_time > window_start,
+    ).all()
+
+    existing: Dict[UUID, List[BookingInterval]] = {}
+    for row in rows:
+        existing.setdefault(row.room_id, []).append(BookingInterval.of(row.start_time, row.end_time, row.id))
+    for series in active_series(db, room_ids, window_start, window_end):
+        if series.id == exclude_series_id:
+            continue
+        room_intervals = existing.setdefault(series.room_id, [])
+        for occ_start, occ_end in series.occurrences(window_start, window_end):
+            room_intervals.append(BookingInterval.of(occ_start, occ_end, series_id=series.id))
+    return existing
+
+
+def find_batch_conflicts(
+    db: Session,
+    items: Sequence[Tuple[UUID, datetime, datetime]],
+) -> List[dict]:
+    """
+    ตรวจ (room_id, start_time, end_time) หลายรายการในครั้งเดียว
+    - เทียบกับการจองที่มีอยู่: query เดียวสำหรับทุกห้องในช่วงเวลาของ batch
+    - เทียบกันเองภายใน batch
+    คืน list ของ {"index", "conflicts_with"} (ว่าง = ไม่มีชน)
+    """
+    if not items:
+        return []
+
+    window_start = min(as_utc(start) for _, start, _ in items).replace(tzinfo=timezone.utc)
+    window_end = max(as_utc(end) for _, _, end in items).replace(tzinfo=timezone.utc)
+    existing = _existing_intervals(db, {room_id for room_id, _, _ in items}, window_start, window_end)
+
+    accepted: Dict[UUID, List[Tuple[int, BookingInterval]]] = {}
+    conflicts = []
+    for index, (room_id, start, end) in enumerate(items):
+        hit = first_overlap(existing.get(room_id, ()), start, end)
+        if hit is not None:
+            conflicts.append({"index": index, "conflicts_with": hit.describe()})
+            continue
+
+        batch = accepted.setdefault(room_id, [])
+        earlier = next((position for position, interval in batch if interval.overlaps(start, end)), None)
+        if earlier is not None:
+            conflicts.append({"index": index, "conflicts_with": f"item {earlier}"})
+            continue
+        batch.append((index, BookingInterval.of(start, end)))
+    return conflicts
+
+
+def find_series_conflict(db: Session, series: BookingSeries) -> Optional[BookingInterval]:
+    """ตรวจทุก occurrence ของ series กับการจองและ series อื่นของห้องเดียวกัน"""
+    window_start = as_utc(series.start_time).replace(tzinfo=timezone.utc)
+    window_end = as_utc(series.ends_at).replace(tzinfo=timezone.utc)
+    existing = _existing_intervals(db, [series.room_id], window_start, window_end, exclude_series_id=series.id)
+    room_intervals = existing.get(series.room_id)
+    if not room_intervals:
+        return None
+    for occ_start, occ_end in series.occurrences():
+        hit = first_overlap(room_intervals, occ_start, occ_end)
+        if hit is not None:
+            return hit
+    return None
@@ -0,0 +1,321 @@
+"""
+นำเข้าข้อมูลทีละมาก ๆ จากไฟล์ CSV / JSON (rooms, equipments, room-equipments)
+
+ใช้ทั้ง POST /imports/{kind} และ `python -m app.cli import-data`
+- อ่านไฟล์แบบ stream ทีละแถว (CSV, NDJSON หรือ JSON array) ไม่โหลดทั้งไฟล์เข้า memory
+- validate ด้วย schema เดิม (RoomCreate / EquipmentCreate / RoomEquipmentCreate) ทีละ chunk
+- upsert ด้วย bulk INSERT / UPDATE ต่อ chunk แล้ว commit (แถวที่ผิดไม่ทำให้ทั้งไฟล์ล้ม)
+- คืนรายงาน: สร้างใหม่กี่แถว แก้กี่แถว แถวไหนผิดเพราะอะไร
+
+key ที่ใช้ upsert:
+- rooms, equipments     → name (ชื่อซ้ำกับที่มีอยู่ = แก้แถวเดิม เฉพาะ column ที่มีในไฟล์)
+- room-equipments       → (room, equipment) ตั้ง quantity ตามไฟล์ (import ซ้ำได้ผลเท่าเดิม)
+                          อ้างห้อง/อุปกรณ์ด้วย room_id / equipment_id หรือ room_name / equipment_name
+"""
+import csv
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.equipment import Equipment
+from app.models.room import Room
+from app.models.room_equipment import RoomEquipment
+from app.schemas.equipment import EquipmentCreate
+from app.schemas.imports import ImportReport, ImportRowError
+from app.schemas.room import RoomCreate
+from app.schemas.room_equipment import RoomEquipmentCreate
+from app.services.counters import room_status_counter
+from app.services.room_equipment_summary import refresh_summaries
+
+IMPORT_FORMATS = ("csv", "json", "ndjson")
+
+# (row number, raw record)
+Record = Tuple[int, dict]
+
+
+class ImportFormatError(ValueError):
+    """ไฟล์อ่านไม่ได้ทั้งไฟล์ (ไม่ใช่ error ของแถวใดแถวหนึ่ง)"""
+
+
+# ════════════════════════════════════════════════════════════════
+# READERS
+# ════════════════════════════════════════════════════════════════
+def format_from_filename(filename: Optional[str]) -> Optional[str]:
+    suffix = (filename or "").rsplit(".", 1)[-1].lower()
+    if suffix in ("ndjson", "jsonl"):
+        return "ndjson"
+    return suffix if suffix in IMPORT_FORMATS else None
+
+
+def _read_csv(stream: TextIO) -> Iterator[Record]:
+    # ช่องว่างใน CSV = ไม่ได้ระบุ (ใช้ค่า default ของ schema / ไม่แก้ column นั้น)
+    for number, row in enumerate(csv.DictReader(stream), start=2):
+        yield number, {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+
+
+def _read_ndjson(stream: TextIO) -> Iterator[Record]:
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ImportFormatError(f"line {number}: invalid JSON ({e.msg})")
+
+
+def _read_json_array(stream: TextIO, buffer_size: int = 65536) -> Iterator[Record]:
+    """อ่าน [ {...}, {...} ] ทีละ object (raw_decode บน buffer) แทน json.load ทั้งไฟล์"""
+    decoder = json.JSONDecoder()
+    buffer = stream.read(buffer_size).lstrip()
+    if not buffer.startswith("["):
+        raise ImportFormatError("JSON import must be an array of objects (or use NDJSON)")
+    buffer = buffer[1:]
+    number = 0
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            chunk = stream.read(buffer_size)
+            if not chunk:
+                raise ImportFormatError(f"item {number + 1}: invalid JSON ({e.msg})")
+            buffer += chunk
+            continue
+        number += 1
+        buffer = buffer[end:]
+        yield number, record
+
+
+def read_records(stream: TextIO, import_format: str) -> Iterator[Record]:
+    if import_format == "csv":
+        return _read_csv(stream)
+    if import_format == "ndjson":
+        return _read_ndjson(stream)
+    if import_format == "json":
+        return _read_json_array(stream)
+    raise ImportFormatError(f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    chunk: List[Record] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ════════════════════════════════════════════════════════════════
+# IMPORTERS
+# ════════════════════════════════════════════════════════════════
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+
+class _Importer(ABC):
+    def __init__(self, db: Session, report: ImportReport, max_errors: int):
+        self.db = db
+        self.report = report
+        self.max_errors = max_errors
+        self.failed_rows: set = set()  # แถวที่ผิดใน chunk ปัจจุบัน
+
+    def fail(self, row: int, message: str) -> None:
+        self.failed_rows.add(row)
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(ImportRowError(row=row, error=message))
+        else:
+            self.report.errors_truncated = True
+
+    def validate(self, chunk: List[Record], schema) -> List[Tuple[int, BaseModel]]:
+        valid = []
+        for row, record in chunk:
+            if not isinstance(record, dict):
+                self.fail(row, "row must be an object")
+                continue
+            try:
+                valid.append((row, schema.model_validate(record)))
+            except ValidationError as e:
+                self.fail(row, _validation_message(e))
+        return valid
+
+    @abstractmethod
+    def import_chunk(self, chunk: List[Record]) -> None:
+        """validate + upsert แถวที่ถูกของ chunk (ผู้เรียก commit / rollback)"""
+
+    def reset(self) -> None:
+        """chunk ล้ม (rollback) → ทิ้งสิ่งที่จำไว้จาก chunk นั้น"""
+
+
+class _ByNameImporter(_Importer):
+    """rooms / equipments: upsert ตาม name"""
+
+    def __init__(self, model, schema, *args):
+        super().__init__(*args)
+        self.model = model
+        self.schema = schema
+        self.ids_by_name: Dict[str, uuid.UUID] = {}
+
+    def reset(self) -> None:
+        self.ids_by_name.clear()
+
+    def import_chunk(self, chunk: List[Record]) -> None:
+        valid = self.validate(chunk, self.schema)
+        missing = {item.name for _, item in valid} - self.ids_by_name.keys()
+        if missing:
+            for id_, name in self.db.execute(select(self.model.id, self.model.name).where(self.model.name.in_(missing))):
+                self.ids_by_name.setdefault(name, id_)
+
+        inserts, updates = [], []
+        for _, item in valid:
+            if item.name in self.ids_by_name:
+                updates.append({"id": self.ids_by_name[item.name], **item.model_dump(exclude_unset=True)})
+            else:
+                new_id = uuid.uuid4()
+                self.ids_by_name[item.name] = new_id
+                inserts.append({"id": new_id, **item.model_dump(exclude_none=True)})
+
+        if inserts:
+            self.db.execute(insert(self.model), inserts)
+        if updates:
+            self.db.execute(update(self.model), updates)
+        self.report.created += len(inserts)
+        self.report.updated += len(updates)
+
+
+class _RoomEquipmentImporter(_Importer):
+    """room-equipments: upsert ตาม (room_id, equipment_id) ตั้ง quantity ตามไฟล์"""
+
+    def _resolve_names(self, model, chunk: List[Record], name_key: str, id_key: str) -> List[Record]:
+        """แปลง room_name / equipment_name เป็น id (ชื่อที่ไม่มีในระบบ → แถวนั้นผิด)"""
+        by_name = [record for _, record in chunk if isinstance(record, dict) and name_key in record and id_key not in record]
+        if not by_name:
+            return chunk
+        names = {str(record[name_key]) for record in by_name}
+        ids = {name: id_ for id_, name in self.db.execute(select(model.id, model.name).where(model.name.in_(names)))}
+        kept = []
+        for row, record in chunk:
+            if isinstance(record, dict) and name_key in record and id_key not in record:
+                if str(record[name_key]) not in ids:
+                    self.fail(row, f"{name_key}: {model.__name__} not found")
+                    continue
+                record[id_key] = ids[str(record[name_key])]
+            kept.append((row, record))
+        return kept
+
+    def _existing_ids(self, model, ids) -> set:
+        return set(self.db.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+
+    def import_chunk(self, chunk: List[Record]) -> None:
+        chunk = self._resolve_names(Room, chunk, "room_name", "room_id")
+        chunk = self._resolve_names(Equipment, chunk, "equipment_name", "equipment_id")
+        valid = self.validate(chunk, RoomEquipmentCreate)
+
+        rooms = self._existing_ids(Room, {item.room_id for _, item in valid})
+        equipments = self._existing_ids(Equipment, {item.equipment_id for _, item in valid})
+        wanted: Dict[Tuple[uuid.UUID, uuid.UUID], int] = {}
+        for row, item in valid:
+            if item.room_id not in rooms:
+                self.fail(row, "room_id: Room not found")
+            elif item.equipment_id not in equipments:
+                self.fail(row, "equipment_id: Equipment not found")
+            else:
+                wanted[(item.room_id, item.equipment_id)] = item.quantity
+        if not wanted:
+            return
+
+        existing = {
+            (room_id, equipment_id): id_
+            for id_, room_id, equipment_id in self.db.execute(
+                select(RoomEquipment.id, RoomEquipment.room_id, RoomEquipment.equipment_id).where(
+                    RoomEquipment.room_id.in_({room_id for room_id, _ in wanted}),
+                    RoomEquipment.equipment_id.in_({equipment_id for _, equipment_id in wanted}),
+                )
+            )
+        }
+        inserts, updates = [], []
+        for (room_id, equipment_id), quantity in wanted.items():
+            if (room_id, equipment_id) in existing:
+                updates.append({"id": existing[(room_id, equipment_id)], "quantity": quantity})
+            else:
+                inserts.append({"id": uuid.uuid4(), "room_id": room_id, "equipment_id": equipment_id, "quantity": quantity})
+
+        if inserts:
+            self.db.execute(insert(RoomEquipment), inserts)
+        if updates:
+            self.db.execute(update(RoomEquipment), updates)
+        refresh_summaries(self.db, {room_id for room_id, _ in wanted})
+        self.report.created += len(inserts)
+        self.report.updated += len(updates)
+
+
+IMPORT_KINDS: Dict[str, Callable[..., _Importer]] = {
+    "rooms": lambda *args: _ByNameImporter(Room, RoomCreate, *args),
+    "equipments": lambda *args: _ByNameImporter(Equipment, EquipmentCreate, *args),
+    "room-equipments": _RoomEquipmentImporter,
+}
+
+
+def import_records(
+    db: Session,
+    kind: str,
+    records: Iterable[Record],
+    chunk_size: int = 500,
+    dry_run: bool = False,
+    max_errors: int = 1000,
+) -> ImportReport:
+    """
+    import ทีละ chunk แล้ว commit (dry_run → rollback ทุก chunk แต่ยัง validate / นับให้)
+    ไฟล์อ่านต่อไม่ได้กลางทาง → หยุดแล้วบอกใน report.error (chunk ที่ commit ไปแล้วยังอยู่)
+    """
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f"kind must be one of: {', '.join(IMPORT_KINDS)}")
+
+    report = ImportReport(kind=kind, dry_run=dry_run)
+    importer = IMPORT_KINDS[kind](db, report, max_errors)
+    try:
+        _import_chunks(db, importer, report, records, chunk_size, dry_run)
+    except (ImportFormatError, csv.Error, UnicodeDecodeError) as e:
+        db.rollback()
+        report.error = str(e)
+    finally:
+        # bulk statement ไม่ผ่าน router → ตัวนับสถานะห้องต้องโหลดใหม่
+        if kind == "rooms" and not dry_run:
+            room_status_counter.invalidate()
+    report.errors.sort(key=lambda error: error.row)
+    return report
+
+
+def _import_chunks(db: Session, importer: _Importer, report: ImportReport, records, chunk_size: int, dry_run: bool) -> None:
+    for chunk in _chunks(records, chunk_size):
+        report.total += len(chunk)
+        created, updated = report.created, report.updated
+        importer.failed_rows = set()
+        try:
+            importer.import_chunk(chunk)
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+        except SQLAlchemyError as e:
+            # ทั้ง chunk ถูก rollback → แถวที่ยังไม่ผิดใน chunk นี้ก็ไม่ได้บันทึกเช่นกัน
+            db.rollback()
+            importer.reset()
+            report.created, report.updated = created, updated
+            message = f"database error: {e.__class__.__name__}: {getattr(e, 'orig', None) or e}"
+            for row, _ in chunk:
+                if row not in importer.failed_rows:
+                    importer.fail(row, message)
+
+
+def import_file(db: Session, kind: str, stream: TextIO, import_format: str, **options) -> ImportReport:
+    return import_records(db, kind, read_records(stream, import_format), **options)
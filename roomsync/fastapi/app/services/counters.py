@@ -0,0 +1,63 @@
+"""
+ตัวนับสำหรับ Dashboard (cache ใน process)
+
+โหลดด้วย GROUP BY query เดียว แล้วให้ router ที่เขียนข้อมูลปรับตัวเลขต่อเอง
+(adjust / move) → dashboard ที่ poll ถี่ ๆ ไม่ต้องถาม DB เลยระหว่าง TTL
+TTL ยังจำเป็นเพราะแต่ละ gunicorn worker มี cache ของตัวเอง
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.profile import Profile
+from app.models.room import Room
+
+
+class GroupedCounter:
+    """นับจำนวนแถวแยกตามค่าของ column (SELECT column, COUNT(*) ... GROUP BY column)"""
+
+    def __init__(self, column, ttl_seconds: int):
+        self.column = column
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._counts: Optional[Dict[str, int]] = None
+        self._loaded_at = 0.0
+
+    def get(self, db: Session) -> Dict[str, int]:
+        with self._lock:
+            if self._counts is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return dict(self._counts)
+
+        rows = db.query(self.column, func.count()).group_by(self.column).all()
+        counts = {key: count for key, count in rows}
+
+        with self._lock:
+            self._counts = counts
+            self._loaded_at = time.monotonic()
+        return dict(counts)
+
+    def adjust(self, key: Optional[str], delta: int) -> None:
+        """ปรับตัวเลขหลัง commit (ถ้ายังไม่เคยโหลด ไม่ต้องทำอะไร)"""
+        with self._lock:
+            if self._counts is None:
+                return
+            self._counts[key] = self._counts.get(key, 0) + delta
+
+    def move(self, old_key: Optional[str], new_key: Optional[str]) -> None:
+        """แถวหนึ่งเปลี่ยนค่าจาก old_key เป็น new_key"""
+        if old_key != new_key:
+            self.adjust(old_key, -1)
+            self.adjust(new_key, 1)
+
+    def invalidate(self) -> None:
+        """ทิ้ง cache (ใช้หลังเขียนข้อมูลแบบ bulk)"""
+        with self._lock:
+            self._counts = None
+
+
+room_status_counter = GroupedCounter(Room.status, settings.dashboard_counter_ttl_seconds)
+profile_role_counter = GroupedCounter(Profile.role, settings.dashboard_counter_ttl_seconds)
@@ -0,0 +1,420 @@
+"""
+คัดลอกข้อมูลทั้ง DB จาก Supabase → DB local (`python -m app.cli migrate` / migrate_supabase.py)
+
+เดิมโหลด auth_users / rooms ทั้งหมดด้วย .all() query ซ้ำทีละห้อง แล้ว commit ครั้งเดียวตอนจบ
+(ล้มกลางทาง = เริ่มใหม่หมด และคัดลอกแค่ 2 ตาราง)
+- อ่านทีละ chunk แบบ keyset ตาม primary key (WHERE pk > :last ORDER BY pk LIMIT n) memory คงที่
+- เขียนทีละ chunk ด้วย INSERT ... ON CONFLICT (pk) DO UPDATE statement เดียวแล้ว commit
+  → รันซ้ำได้ แถวที่มีอยู่แล้วถูกอัปเดตให้ตรงกับต้นทาง
+- checkpoint (JSON) จำ pk สุดท้ายที่ commit แล้วของแต่ละตาราง → รันใหม่ทำต่อจากจุดที่ล้ม
+  (สำเร็จครบทุกตาราง → ลบ checkpoint ทิ้ง)
+- ตารางที่ไม่มี FK ถึงกันคัดลอกขนานกันได้ (workers) ตารางลูกรอตารางแม่เสร็จก่อน
+- แถวที่ชน unique column อื่นที่ไม่ใช่ pk (เช่น email ที่มีใน local แล้วด้วย id อื่น) → ข้าม นับเป็น skipped
+- แถวลูกที่อ้างแถวแม่ซึ่งไม่มีในปลายทาง (แม่ถูกข้ามข้างบน) → FK ที่ NOT NULL ข้ามทั้งแถว นับเป็น orphaned,
+  FK ที่ nullable (ON DELETE SET NULL) ตั้งเป็น NULL แทน → chunk ไม่ล้มเพราะ FK และรันต่อ / resume ได้
+- room_busy_slots ไม่คัดลอก (คำนวณจาก bookings) → สร้างใหม่ทุกห้องหลังคัดลอก bookings / booking_series
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Integer, inspect, literal, select, text, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401 (ลงทะเบียนทุกตารางใน Base.metadata)
+from app.db import Base
+from app.models.authuser import AuthUser  # noqa: F401
+from app.models.room import Room
+from app.services.room_equipment_summary import refresh_summaries
+
+logger = logging.getLogger(__name__)
+
+# ตารางที่คัดลอก (ลำดับตาม FK จะคำนวณจาก metadata อีกที)
+COPY_TABLES = [
+    "auth_users",
+    "profiles",
+    "rooms",
+    "equipments",
+    "room_equipments",
+    "booking_series",
+    "bookings",
+    "damage_reports",
+]
+# ตารางที่ต้องคำนวณ room_busy_slots ใหม่เมื่อถูกคัดลอก
+BUSY_SLOT_SOURCES = {"bookings", "booking_series"}
+# ตารางที่ทำให้ rooms.equipment_types / equipment_total ต้องคำนวณใหม่
+SUMMARY_SOURCES = {"rooms", "room_equipments"}
+
+DEFAULT_CHECKPOINT = "migrate_checkpoint.json"
+
+
+class CopyError(Exception):
+    pass
+
+
+@dataclass
+class TableReport:
+    table: str
+    copied: int = 0
+    skipped: int = 0
+    orphaned: int = 0  # แถวลูกที่ข้ามเพราะแถวแม่ไม่มีในปลายทาง
+    resumed: bool = False
+    missing: bool = False  # ไม่มีตารางนี้ในต้นทาง (schema เก่า) → ข้ามทั้งตาราง
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.copied / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class CopyReport:
+    tables: List[TableReport] = field(default_factory=list)
+    busy_slot_rooms: int = 0
+    summary_rooms: int = 0  # ห้องที่ equipment_types / equipment_total ถูกคำนวณใหม่
+    seconds: float = 0.0
+
+    @property
+    def copied(self) -> int:
+        return sum(report.copied for report in self.tables)
+
+    @property
+    def failed(self) -> bool:
+        return any(report.error for report in self.tables)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.copied / self.seconds if self.seconds else 0.0
+
+
+# ════════════════════════════════════════════════════════════════
+# CHECKPOINT
+# ════════════════════════════════════════════════════════════════
+def _dump_key(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def _load_key(column, value):
+    python_type = column.type.python_type
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def _fingerprint(url: str) -> str:
+    return make_url(url).render_as_string(hide_password=True)
+
+
+class Checkpoint:
+    """pk สุดท้ายที่ commit แล้วต่อตาราง (เขียนไฟล์ใหม่ทั้งไฟล์แบบ atomic ทุก chunk)"""
+
+    def __init__(self, path: Optional[str], source_url: str, destination_url: str, restart: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        identity = {"source": _fingerprint(source_url), "destination": _fingerprint(destination_url)}
+        self.data = {**identity, "tables": {}, "busy_slots_pending": False}
+
+        if not path or restart or not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if {key: saved.get(key) for key in identity} != identity:
+            raise CopyError(f"Checkpoint {path} belongs to a different source/destination; use --restart")
+        self.data = saved
+
+    def table(self, name: str) -> dict:
+        return self.data["tables"].get(name, {})
+
+    def update_table(self, name: str, **values) -> None:
+        with self._lock:
+            self.data["tables"].setdefault(name, {}).update(values)
+            self._save()
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self.data[key] = value
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ════════════════════════════════════════════════════════════════
+# PLAN
+# ════════════════════════════════════════════════════════════════
+def copy_levels(tables: Sequence[str]) -> List[List[str]]:
+    """แบ่งตารางเป็นชั้นตาม FK: ชั้นเดียวกันคัดลอกพร้อมกันได้ ชั้นถัดไปรอชั้นก่อนหน้าเสร็จ"""
+    selected = set(tables)
+    level: Dict[str, int] = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in selected:
+            continue
+        parents = {
+            fk.column.table.name
+            for fk in table.foreign_keys
+            if fk.column.table.name in selected and fk.column.table is not table
+        }
+        level[table.name] = max((level[parent] + 1 for parent in parents), default=0)
+
+    levels: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for name in tables:
+        levels[level[name]].append(name)
+    return levels
+
+
+def upsert_statement(dialect_name: str, table, columns: Sequence[str]):
+    """INSERT ... ON CONFLICT (pk) DO UPDATE ของ column ที่ระบุ (ใช้กับ connection.execute(stmt, rows))"""
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(table)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(table)
+    else:
+        raise CopyError(f"Unsupported destination database: {dialect_name}")
+    pk = [column.name for column in table.primary_key.columns]
+    values = {name: stmt.excluded[name] for name in columns if name not in pk}
+    if not values:
+        return stmt.on_conflict_do_nothing(index_elements=pk)
+    return stmt.on_conflict_do_update(index_elements=pk, set_=values)
+
+
+def _unique_columns(table) -> list:
+    pk = {column.name for column in table.primary_key.columns}
+    return [column for column in table.columns if column.unique and column.name not in pk]
+
+
+def without_unique_conflicts(connection, table, rows: List[dict]) -> List[dict]:
+    """ตัดแถวที่ค่า unique column มีอยู่แล้วในปลายทางภายใต้ pk อื่น (1 query ต่อ column ต่อ chunk)"""
+    pk = list(table.primary_key.columns)
+
+    def key_of(row) -> tuple:
+        return tuple(row[column.name] for column in pk)
+
+    for column in _unique_columns(table):
+        values = {row[column.name] for row in rows if row.get(column.name) is not None}
+        if not values:
+            continue
+        owners = {
+            existing[column.name]: tuple(existing[c.name] for c in pk)
+            for existing in connection.execute(select(*pk, column).where(column.in_(values))).mappings()
+        }
+        clashing = [row for row in rows if owners.get(row.get(column.name), key_of(row)) != key_of(row)]
+        if clashing:
+            logger.warning(
+                f"{table.name}: skipped {len(clashing)} row(s) whose {column.name} belongs to another row "
+                f"(e.g. pk {', '.join('/'.join(map(str, key_of(row))) for row in clashing[:5])})"
+            )
+            rows = [row for row in rows if owners.get(row.get(column.name), key_of(row)) == key_of(row)]
+    return rows
+
+
+def without_missing_parents(connection, table, rows: List[dict]) -> List[dict]:
+    """
+    จัดการแถวที่ FK อ้าง pk ซึ่งไม่มีในปลายทาง (1 query ต่อ FK ต่อ chunk)
+    FK ที่ nullable → ตั้งเป็น NULL (เหมือน ON DELETE SET NULL), NOT NULL → ตัดแถวทิ้ง
+    """
+    for fk in table.foreign_keys:
+        name, parent = fk.parent.name, fk.column
+        values = {row[name] for row in rows if row.get(name) is not None}
+        if not values:
+            continue
+        missing = values - set(connection.scalars(select(parent).where(parent.in_(values))))
+        if not missing:
+            continue
+        logger.warning(
+            f"{table.name}: {len(missing)} {name} value(s) not in {parent.table.name} "
+            f"(e.g. {', '.join(sorted(map(str, missing))[:5])}); "
+            + ("set to NULL" if fk.parent.nullable else "rows skipped")
+        )
+        if fk.parent.nullable:
+            rows = [dict(row, **{name: None}) if row.get(name) in missing else row for row in rows]
+        else:
+            rows = [row for row in rows if row.get(name) not in missing]
+    return rows
+
+
+# ════════════════════════════════════════════════════════════════
+# COPY
+# ════════════════════════════════════════════════════════════════
+class TableCopier:
+    def __init__(self, source: Engine, destination: Engine, checkpoint: Checkpoint, chunk_size: int):
+        self.source = source
+        self.destination = destination
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+
+    def copy(self, name: str) -> TableReport:
+        report = TableReport(table=name)
+        state = self.checkpoint.table(name)
+        if state.get("done"):
+            report.resumed = True
+            return report
+
+        table = Base.metadata.tables[name]
+        inspector = inspect(self.source)
+        if not inspector.has_table(name):
+            report.missing = True
+            return report
+        # ต้นทางอาจยังไม่มี column ที่เพิ่มทีหลัง → คัดลอกเฉพาะที่มีทั้งสองฝั่ง ที่เหลือใช้ default ของ model
+        source_columns = {column["name"] for column in inspector.get_columns(name)}
+        columns = [column for column in table.columns if column.name in source_columns]
+        pk = list(table.primary_key.columns)
+        upsert = upsert_statement(self.destination.dialect.name, table, [column.name for column in columns])
+
+        last_key = state.get("last_key")
+        report.resumed = last_key is not None
+        copied = state.get("copied", 0)
+        skipped = state.get("skipped", 0)
+        orphaned = state.get("orphaned", 0)
+        started = time.perf_counter()
+        try:
+            with self.source.connect() as source:
+                while True:
+                    query = select(*columns).order_by(*pk).limit(self.chunk_size)
+                    if last_key is not None:
+                        after = tuple_(*(literal(_load_key(c, v), type_=c.type) for c, v in zip(pk, last_key)))
+                        query = query.where(tuple_(*pk) > after)
+                    rows = [dict(row) for row in source.execute(query).mappings()]
+                    if not rows:
+                        break
+
+                    with self.destination.begin() as destination:
+                        unique = without_unique_conflicts(destination, table, rows)
+                        keep = without_missing_parents(destination, table, unique)
+                        if keep:
+                            destination.execute(upsert, keep)
+
+                    last_key = [_dump_key(rows[-1][column.name]) for column in pk]
+                    report.copied += len(keep)
+                    report.skipped += len(rows) - len(unique)
+                    report.orphaned += len(unique) - len(keep)
+                    self.checkpoint.update_table(
+                        name,
+                        last_key=last_key,
+                        copied=copied + report.copied,
+                        skipped=skipped + report.skipped,
+                        orphaned=orphaned + report.orphaned,
+                    )
+                    if name in BUSY_SLOT_SOURCES and keep:
+                        self.checkpoint.set("busy_slots_pending", True)
+                    logger.info(f"{name}: {copied + report.copied} rows copied")
+                    if len(rows) < self.chunk_size:
+                        break
+
+            self._sync_sequence(table)
+            self.checkpoint.update_table(name, done=True)
+        except Exception as e:
+            logger.exception(f"Copying {name} failed")
+            report.error = str(e)
+        finally:
+            report.seconds = time.perf_counter() - started
+        return report
+
+    def _sync_sequence(self, table) -> None:
+        """PostgreSQL: เลื่อน sequence ของ pk แบบ serial ให้เลยค่าที่คัดลอกมา (ไม่งั้น insert ถัดไปชน id)"""
+        if self.destination.dialect.name != "postgresql":
+            return
+        pk = list(table.primary_key.columns)
+        if len(pk) != 1 or not isinstance(pk[0].type, Integer):
+            return
+        with self.destination.begin() as destination:
+            destination.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence(:table, :column), "
+                    f"COALESCE((SELECT MAX({pk[0].name}) FROM {table.name}), 0) + 1, false)"
+                ),
+                {"table": table.name, "column": pk[0].name},
+            )
+
+
+def rebuild_busy_slots(destination: Engine, chunk_size: int) -> int:
+    """คำนวณ room_busy_slots ใหม่ทุกห้องในปลายทาง (commit ทีละ chunk ของห้อง)"""
+    from app.services.room_availability import rebuild_room
+
+    rebuilt = 0
+    last_id = None
+    with Session(destination) as db:
+        while True:
+            query = select(Room.id).order_by(Room.id).limit(chunk_size)
+            if last_id is not None:
+                query = query.where(Room.id > last_id)
+            room_ids = db.scalars(query).all()
+            if not room_ids:
+                break
+            for room_id in room_ids:
+                rebuild_room(db, room_id)
+            db.commit()
+            rebuilt += len(room_ids)
+            last_id = room_ids[-1]
+    return rebuilt
+
+
+def copy_database(
+    source: Engine,
+    destination: Engine,
+    tables: Optional[Sequence[str]] = None,
+    chunk_size: int = 1000,
+    workers: int = 1,
+    checkpoint_path: Optional[str] = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+) -> CopyReport:
+    """
+    คัดลอกตารางที่เลือก (default: COPY_TABLES) จาก source → destination
+    ตารางไหนล้ม → ตารางอื่นในชั้นเดียวกันทำต่อจนจบ แต่ไม่เริ่มชั้นถัดไป (checkpoint เก็บไว้ให้รันต่อ)
+    """
+    tables = list(tables or COPY_TABLES)
+    unknown = [name for name in tables if name not in COPY_TABLES]
+    if unknown:
+        raise CopyError(f"Unknown tables: {', '.join(unknown)}")
+
+    checkpoint = Checkpoint(
+        checkpoint_path,
+        source.url.render_as_string(hide_password=False),
+        destination.url.render_as_string(hide_password=False),
+        restart=restart,
+    )
+    copier = TableCopier(source, destination, checkpoint, chunk_size)
+    report = CopyReport()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for level in copy_levels(tables):
+            report.tables.extend(pool.map(copier.copy, level))
+            if report.failed:
+                break
+
+    if not report.failed and checkpoint.data.get("busy_slots_pending"):
+        report.busy_slot_rooms = rebuild_busy_slots(destination, chunk_size)
+        checkpoint.set("busy_slots_pending", False)
+
+    # ต้นทางอาจยังไม่มี column สรุปอุปกรณ์ (ได้ค่า default 0) → คำนวณจาก room_equipments ที่คัดลอกมา
+    if not report.failed and SUMMARY_SOURCES.intersection(tables):
+        with Session(destination) as db:
+            report.summary_rooms = refresh_summaries(db)
+            db.commit()
+
+    report.seconds = time.perf_counter() - started
+    if not report.failed:
+        checkpoint.remove()
+    return report
@@ -0,0 +1,349 @@
+"""
+Incremental sync Supabase → DB local ตาม updated_at (`python -m app.cli sync` / background task)
+
+`migrate` (app/services/db_copy.py) คัดลอกทั้งตารางทุกครั้ง → sync ดึงเฉพาะแถวที่เปลี่ยนตั้งแต่รอบก่อน
+- high-water mark ต่อตาราง = updated_at สูงสุดที่ดึงมาแล้ว เก็บใน sync_state (DB local)
+- อ่านทีละ batch แบบ keyset (updated_at, id) > (...) ใช้ index ix_<table>_updated_at_id ของต้นทาง
+- upsert กับอัปเดต sync_state อยู่ใน transaction เดียวกัน → ล้มกลางทาง รอบหน้าทำต่อโดยไม่ข้ามแถว
+- แต่ละรอบเริ่มย้อนหลัง high-water mark ไป SYNC_OVERLAP_SECONDS: trigger ใช้ NOW() (เวลาเริ่ม
+  transaction) แถวที่ commit ช้าอาจมี updated_at เก่ากว่าแถวที่ดึงไปแล้ว (upsert ซ้ำไม่เป็นไร)
+- ยังไม่มี sync_state ของตาราง → รอบแรกดึงทุกแถว
+- หลายตัว (gunicorn workers / instance) รันพร้อมกัน → PostgreSQL advisory lock ให้ sync ได้ทีละตัว
+
+ข้อจำกัด:
+- แถวที่ถูกลบในต้นทางไม่ถูกลบตาม (ไม่มี tombstone) → รัน `migrate` เป็นครั้งคราว
+- auth_users / room_equipments ไม่มี updated_at → ไม่อยู่ใน sync ใช้ `migrate --table ...`
+- แถวที่ updated_at เป็น NULL ไม่ถูกดึง
+- แถวที่ชน unique / แถวลูกที่แถวแม่ไม่มีใน DB local → ข้าม (เหมือน migrate) high-water mark เลื่อนผ่านไป
+  แถวนั้นจะไม่ถูกดึงอีกจนกว่าจะถูกแก้ในต้นทาง หรือรัน `sync --reset` / `migrate`
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Set
+from uuid import UUID
+
+from sqlalchemy import create_engine, delete, inspect, literal, select, text, tuple_
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.db import Base
+from app.models.sync_state import SyncState
+from app.services.db_copy import (
+    BUSY_SLOT_SOURCES,
+    copy_levels,
+    upsert_statement,
+    without_missing_parents,
+    without_unique_conflicts,
+)
+from app.services.room_equipment_summary import refresh_summaries
+
+logger = logging.getLogger(__name__)
+
+# ตารางที่มี updated_at (ลำดับตาม FK คำนวณจาก metadata)
+SYNC_TABLES = ["profiles", "rooms", "equipments", "booking_series", "bookings", "damage_reports"]
+
+# pg_try_advisory_lock key ของ sync (ค่าคงที่ใด ๆ ที่ไม่ชนกับ lock อื่นในระบบ)
+SYNC_LOCK_KEY = 7_301_020
+
+# profile ที่ sync มามากกว่านี้ → ล้าง profile cache ทั้งหมดแทนทีละ key
+PROFILE_INVALIDATE_ALL_ABOVE = 500
+
+
+class SyncError(Exception):
+    pass
+
+
+@dataclass
+class SyncTableReport:
+    table: str
+    synced: int = 0
+    skipped: int = 0
+    orphaned: int = 0  # แถวลูกที่ข้ามเพราะแถวแม่ไม่มีในปลายทาง
+    high_water_at: Optional[datetime] = None
+    missing: bool = False  # ไม่มีตารางนี้ในต้นทาง
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.synced / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class SyncReport:
+    tables: List[SyncTableReport] = field(default_factory=list)
+    busy_slot_rooms: int = 0
+    summary_rooms: int = 0  # ห้องที่ equipment_types / equipment_total ถูกคำนวณใหม่
+    profile_auth_ids: Set[UUID] = field(default_factory=set)  # auth_user_id ของ profile ที่ sync มา (ล้าง profile cache)
+    locked: bool = False  # อีก process กำลัง sync อยู่ → รอบนี้ไม่ได้ทำ
+    seconds: float = 0.0
+
+    @property
+    def synced(self) -> int:
+        return sum(report.synced for report in self.tables)
+
+    @property
+    def failed(self) -> bool:
+        return any(report.error for report in self.tables)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.synced / self.seconds if self.seconds else 0.0
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite คืนค่า naive (UTC), Postgres คืนค่า aware → aware UTC ทั้งหมดก่อนเทียบ/เก็บ"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def source_engine(url: str) -> Engine:
+    return create_engine(url, pool_pre_ping=True, pool_size=1, max_overflow=1)
+
+
+def same_database(first_url: str, second_url: str) -> bool:
+    return make_url(first_url).render_as_string(hide_password=True) == make_url(second_url).render_as_string(
+        hide_password=True
+    )
+
+
+# ════════════════════════════════════════════════════════════════
+# SYNC
+# ════════════════════════════════════════════════════════════════
+class IncrementalSync:
+    def __init__(self, source: Engine, destination: Engine, batch_size: int, overlap_seconds: int):
+        self.source = source
+        self.destination = destination
+        self.batch_size = batch_size
+        self.overlap = timedelta(seconds=overlap_seconds)
+
+    @contextmanager
+    def _exclusive(self):
+        if self.destination.dialect.name != "postgresql":
+            yield True
+            return
+        with self.destination.connect() as conn:
+            acquired = conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": SYNC_LOCK_KEY})
+            conn.commit()
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SYNC_LOCK_KEY})
+                    conn.commit()
+
+    def run(self, tables: Optional[Sequence[str]] = None, reset: bool = False) -> SyncReport:
+        """sync ตารางที่เลือก (default: SYNC_TABLES) ตารางไหนล้ม → ไม่ทำชั้น FK ถัดไป"""
+        tables = list(tables or SYNC_TABLES)
+        unknown = [name for name in tables if name not in SYNC_TABLES]
+        if unknown:
+            raise SyncError(f"Unknown tables: {', '.join(unknown)}")
+
+        report = SyncReport()
+        started = time.perf_counter()
+        with self._exclusive() as acquired:
+            if not acquired:
+                report.locked = True
+                return report
+
+            if reset:
+                with Session(self.destination) as db:
+                    db.execute(delete(SyncState).where(SyncState.table_name.in_(tables)))
+                    db.commit()
+
+            touched_rooms: Set[UUID] = set()
+            for level in copy_levels(tables):
+                report.tables.extend(self.sync_table(name, touched_rooms, report.profile_auth_ids) for name in level)
+                if report.failed:
+                    break
+            report.busy_slot_rooms = self._refresh_rooms(touched_rooms)
+            if any(table.synced for table in report.tables if table.table == "rooms"):
+                from app.services.counters import room_status_counter
+
+                room_status_counter.invalidate()
+                # ค่าจากต้นทางอาจไม่ตรงกับ room_equipments ใน DB นี้ (room_equipments ไม่อยู่ใน sync)
+                with Session(self.destination) as db:
+                    report.summary_rooms = refresh_summaries(db)
+                    db.commit()
+            if report.profile_auth_ids:
+                from app.services.counters import profile_role_counter
+
+                # role ที่เปลี่ยนในต้นทาง → /profiles/summary ต้องนับใหม่ (profile cache ล้างใน invalidate_profiles)
+                profile_role_counter.invalidate()
+
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def sync_table(self, name: str, touched_rooms: Set[UUID], touched_profiles: Set[UUID]) -> SyncTableReport:
+        report = SyncTableReport(table=name)
+        table = Base.metadata.tables[name]
+        inspector = inspect(self.source)
+        if not inspector.has_table(name):
+            report.missing = True
+            return report
+        source_columns = {column["name"] for column in inspector.get_columns(name)}
+        columns = [column for column in table.columns if column.name in source_columns]
+        upsert = upsert_statement(self.destination.dialect.name, table, [column.name for column in columns])
+        save_state = upsert_statement(
+            self.destination.dialect.name,
+            SyncState.__table__,
+            ["table_name", "high_water_at", "rows_synced", "last_run_at"],
+        )
+
+        with Session(self.destination) as db:
+            state = db.get(SyncState, name)
+        high_water = _utc(state.high_water_at) if state else None
+        total = state.rows_synced if state else 0
+        report.high_water_at = high_water
+
+        updated_at, pk = table.c.updated_at, table.c.id
+        base = select(*columns).where(updated_at.is_not(None)).order_by(updated_at, pk).limit(self.batch_size)
+        if high_water is not None:
+            base = base.where(updated_at >= literal(high_water - self.overlap, type_=updated_at.type))
+
+        after = None
+        started = time.perf_counter()
+        try:
+            with self.source.connect() as source:
+                while True:
+                    query = base
+                    if after is not None:
+                        query = query.where(
+                            tuple_(updated_at, pk)
+                            > tuple_(literal(after[0], type_=updated_at.type), literal(after[1], type_=pk.type))
+                        )
+                    rows = [dict(row) for row in source.execute(query).mappings()]
+                    if not rows:
+                        break
+
+                    last = rows[-1]
+                    after = (last["updated_at"], last["id"])
+                    high_water = max(filter(None, (high_water, _utc(last["updated_at"]))))
+                    with self.destination.begin() as destination:
+                        unique = without_unique_conflicts(destination, table, rows)
+                        keep = without_missing_parents(destination, table, unique)
+                        if keep:
+                            destination.execute(upsert, keep)
+                        total += len(keep)
+                        destination.execute(save_state, [{
+                            "table_name": name,
+                            "high_water_at": high_water,
+                            "rows_synced": total,
+                            "last_run_at": datetime.now(timezone.utc),
+                        }])
+
+                    report.synced += len(keep)
+                    report.skipped += len(rows) - len(unique)
+                    report.orphaned += len(unique) - len(keep)
+                    report.high_water_at = high_water
+                    if name in BUSY_SLOT_SOURCES:
+                        touched_rooms.update(row["room_id"] for row in keep)
+                    if name == "profiles":
+                        touched_profiles.update(row["auth_user_id"] for row in keep)
+                    if len(rows) < self.batch_size:
+                        break
+        except Exception as e:
+            logger.exception(f"Syncing {name} failed")
+            report.error = str(e)
+        finally:
+            report.seconds = time.perf_counter() - started
+        return report
+
+    def _refresh_rooms(self, room_ids: Set[UUID]) -> int:
+        """booking ที่ sync มา → คำนวณ room_busy_slots ใหม่ของห้องนั้น (conflict check ถาม DB ตรง ๆ ไม่มีอะไรต้องล้าง)"""
+        if not room_ids:
+            return 0
+        from app.services.room_availability import rebuild_room
+
+        with Session(self.destination) as db:
+            for room_id in room_ids:
+                rebuild_room(db, room_id)
+            db.commit()
+        return len(room_ids)
+
+
+async def invalidate_profiles(auth_user_ids: Set[UUID]) -> None:
+    """ล้าง profile cache ของ profile ที่ sync มา (async เพราะ backend เป็น async; sync เองรันใน thread)"""
+    if not auth_user_ids:
+        return
+    from app.services.profile_cache import profile_cache
+
+    # sync รอบแรก / --reset ได้ทุก profile → ล้างทั้ง cache ครั้งเดียวแทนลบทีละ key
+    if len(auth_user_ids) > PROFILE_INVALIDATE_ALL_ABOVE:
+        await profile_cache.clear()
+        return
+    for auth_user_id in auth_user_ids:
+        await profile_cache.invalidate(auth_user_id)
+
+
+# ════════════════════════════════════════════════════════════════
+# BACKGROUND TASK
+# ════════════════════════════════════════════════════════════════
+class SyncWorker:
+    """sync ทุก SUPABASE_SYNC_INTERVAL_SECONDS ระหว่างที่ app รันอยู่ (0 = ปิด) เริ่มรอบแรกตอน startup"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._source: Optional[Engine] = None
+
+    async def start(self) -> None:
+        interval = settings.supabase_sync_interval_seconds
+        if interval <= 0:
+            return
+        if not settings.supabase_db_url:
+            logger.warning("SUPABASE_SYNC_INTERVAL_SECONDS is set but SUPABASE_DB_URL is missing; sync disabled")
+            return
+        if same_database(settings.supabase_db_url, settings.database_url):
+            logger.info("Skipping Supabase sync (the app already uses SUPABASE_DB_URL)")
+            return
+        self._task = asyncio.create_task(self._loop(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._source is not None:
+            self._source.dispose()
+            self._source = None
+
+    async def _loop(self, interval: int) -> None:
+        while True:
+            try:
+                report = await run_in_threadpool(self.run_once)
+                await invalidate_profiles(report.profile_auth_ids)
+                if report.locked:
+                    logger.info("Supabase sync skipped: another process holds the sync lock")
+                elif report.synced or report.failed:
+                    logger.info(
+                        f"Supabase sync: {report.synced} rows in {report.seconds:.1f}s "
+                        f"({report.rows_per_second:,.0f} rows/s)"
+                        + (" with errors" if report.failed else "")
+                    )
+            except Exception as e:
+                logger.error(f"Supabase sync failed: {e}")
+            await asyncio.sleep(interval)
+
+    def run_once(self) -> SyncReport:
+        from app.db import engine
+
+        if self._source is None:
+            self._source = source_engine(settings.supabase_db_url)
+        return IncrementalSync(
+            self._source, engine, settings.sync_batch_size, settings.sync_overlap_seconds
+        ).run()
+
+
+sync_worker = SyncWorker()
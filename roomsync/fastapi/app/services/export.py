@@ -0,0 +1,102 @@
+"""
+Export ข้อมูลทั้งก้อนแบบ stream (NDJSON / CSV) ใช้กับ GET /bookings/export, /damage-reports/export
+
+list endpoint ปกติต้องโหลดทุกแถวเป็น ORM object + Pydantic model ไว้ใน memory ก่อนตอบ
+export อ่านจาก server-side cursor ทีละ EXPORT_CHUNK_SIZE แถว (yield_per) เขียนออกไปเลย
+- ดึงเป็น row ของ Core (ไม่สร้าง ORM object) → memory คงที่ไม่ว่าจะกี่แสนแถว
+- เปิด session ของตัวเอง: dependency ของ FastAPI ปิด session ก่อน StreamingResponse เริ่มส่ง body
+- ถือ connection ไว้ 1 เส้นจนส่งครบ (หรือ client ตัดการเชื่อมต่อ)
+"""
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, List, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from starlette.concurrency import run_in_threadpool
+
+from app import db as database
+from app.config import settings
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+async def stream_rows(query: Select, chunk_size: int) -> AsyncIterator[List[Dict]]:
+    """yield แถวเป็น dict ทีละ chunk (AsyncSession.stream หรือ Session บน threadpool ตาม DB_ASYNC)"""
+    query = query.execution_options(yield_per=chunk_size)
+
+    if database.AsyncSessionLocal is not None:
+        async with database.AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for chunk in result.mappings().partitions():
+                yield chunk
+        return
+
+    session = database.ThreadpoolSessionLocal()
+    try:
+        result = await run_in_threadpool(session.execute, query)
+        partitions = result.mappings().partitions()
+        while True:
+            chunk = await run_in_threadpool(next, partitions, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await run_in_threadpool(session.close)
+
+
+async def _ndjson(query: Select, chunk_size: int) -> AsyncIterator[str]:
+    async for chunk in stream_rows(query, chunk_size):
+        yield "".join(
+            json.dumps({key: _plain(value) for key, value in row.items()}, ensure_ascii=False) + "\n"
+            for row in chunk
+        )
+
+
+async def _csv(query: Select, columns: Sequence[str], chunk_size: int) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    async for chunk in stream_rows(query, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in chunk:
+            writer.writerow(["" if row[key] is None else _plain(row[key]) for key in columns])
+        yield buffer.getvalue()
+
+
+def export_response(query: Select, export_format: str, filename: str) -> StreamingResponse:
+    """query ต้องเป็น select(Model.__table__) (หรือ column ของ table) เพื่อให้ได้ row ไม่ใช่ ORM object"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    chunk_size = settings.export_chunk_size
+    if export_format == "csv":
+        body = _csv(query, [column.name for column in query.selected_columns], chunk_size)
+    else:
+        body = _ndjson(query, chunk_size)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -0,0 +1,111 @@
+"""
+Cache ของ JWT ที่ verify แล้ว (ต่อ process)
+
+sha256(token) → payload ที่ verify แล้ว เก็บไว้จนถึง exp ของ token
+ข้อมูล AuthUser ที่ resolve แล้วเก็บแค่ JWT_USER_CACHE_TTL_SECONDS (ค่าเริ่มต้น 60 วินาที เท่า profile cache)
+เพราะ cache เป็นของแต่ละ worker: user ที่ถูกลบ / แก้ใน worker อื่นจะเห็นผลไม่เกิน TTL นี้ ไม่ใช่จน token หมดอายุ
+- JWTAndCSRFMiddleware verify ครั้งเดียว แล้วฝาก identity ไว้ที่ request.state.identity
+- routers/auth.py::get_current_user ใช้ identity เดิม ไม่ decode ซ้ำ ไม่ query AuthUser ซ้ำ
+token ที่ถูกแก้แม้แต่ตัวเดียวจะได้ hash ใหม่ → miss → decode/verify ตามปกติ
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from jose import jwt
+
+from app.config import settings
+from app.metrics import registry
+from app.models.authuser import AuthUser
+
+ALGORITHM = "HS256"
+
+CACHE_LOOKUPS = registry.counter("jwt_cache_lookups_total", "JWT verifications by cache result (hit, miss)")
+
+# column ที่เก็บใน cache (ไม่เก็บ password_hash)
+_USER_FIELDS = ("id", "email", "name", "avatar_url")
+
+
+@dataclass
+class CachedIdentity:
+    payload: dict
+    expires_at: float
+    user: Optional[Dict[str, object]] = field(default=None)
+    user_expires_at: float = 0.0  # time.monotonic()
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.payload.get("sub")
+
+    def user_instance(self) -> Optional[AuthUser]:
+        """AuthUser แบบ transient (ไม่ผูก session, ไม่มี password_hash) สำหรับอ่านอย่างเดียว"""
+        if self.user is None or time.monotonic() >= self.user_expires_at:
+            return None
+        user = AuthUser(email=self.user["email"], name=self.user["name"], avatar_url=self.user["avatar_url"])
+        user.id = self.user["id"]
+        return user
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class IdentityCache:
+    """LRU ขนาดจำกัด (maxsize = 0 → ปิด cache, verify ทุกครั้ง)"""
+
+    def __init__(self, maxsize: int, user_ttl_seconds: int):
+        self.maxsize = maxsize
+        self.user_ttl_seconds = user_ttl_seconds
+        self._entries: "OrderedDict[str, CachedIdentity]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> CachedIdentity:
+        """คืน identity ของ token (raise JWTError / ExpiredSignatureError เหมือน jwt.decode)"""
+        key = _token_key(token)
+        with self._lock:
+            identity = self._entries.get(key)
+            if identity is not None:
+                if time.time() < identity.expires_at:
+                    self._entries.move_to_end(key)
+                    CACHE_LOOKUPS.inc(result="hit")
+                    return identity
+                del self._entries[key]
+
+        CACHE_LOOKUPS.inc(result="miss")
+        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[ALGORITHM])
+        identity = CachedIdentity(payload=payload, expires_at=float(payload.get("exp") or 0))
+        if self.maxsize > 0 and identity.expires_at > time.time():
+            with self._lock:
+                self._entries[key] = identity
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return identity
+
+    def remember_user(self, identity: CachedIdentity, user: AuthUser) -> None:
+        """เก็บ AuthUser ไว้ไม่เกิน user_ttl_seconds (0 → ไม่เก็บ query ทุกครั้ง)"""
+        if self.user_ttl_seconds <= 0:
+            return
+        identity.user = {name: getattr(user, name) for name in _USER_FIELDS}
+        identity.user_expires_at = time.monotonic() + self.user_ttl_seconds
+
+    def invalidate_user(self, user_id) -> None:
+        """ข้อมูล user เปลี่ยน (เช่น login OAuth อัพเดทชื่อ/รูป) → ให้ resolve จาก DB ใหม่ (เฉพาะ process นี้)"""
+        user_id = str(user_id)
+        with self._lock:
+            for identity in self._entries.values():
+                if identity.user_id == user_id:
+                    identity.user = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+identity_cache = IdentityCache(settings.jwt_cache_size, settings.jwt_user_cache_ttl_seconds)
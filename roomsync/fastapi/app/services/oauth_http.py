@@ -0,0 +1,98 @@
+"""
+HTTP client กลางสำหรับเรียก OAuth provider (Google / GitHub)
+
+เดิมทุก login เปิด AsyncClient() ใหม่ → TCP + TLS handshake ไป Google/GitHub ทุกครั้ง
+- client เดียวต่อ process: keep-alive, จำกัดจำนวน connection, timeout ชัดเจน, HTTP/2 ถ้าติดตั้ง h2
+- เปิดตอน startup ปิดตอน shutdown (app/__init__.py) ถ้ายังไม่เปิดจะสร้างให้ตอนใช้ครั้งแรก
+- discovery document (openid-configuration) cache ไว้ตาม OAUTH_DISCOVERY_TTL_SECONDS
+  ดึงไม่ได้ → ใช้ endpoint ค่าคงที่ที่ส่งมาเป็น fallback (cache สั้น ๆ แล้วลองใหม่)
+- OAUTH_STUB_PROVIDER=true → ตอบจาก app/services/oauth_stub.py ไม่ออก network (test / dev offline)
+  stub รับ code อะไรก็ได้เป็น login ที่ถูกต้อง → ไม่ยอมเปิดบน Vercel หรือ APP_ENV=production (start ไม่ขึ้น)
+"""
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.env_detector import detect_environment
+
+logger = logging.getLogger(__name__)
+
+# ดึง discovery ไม่สำเร็จ → ใช้ fallback ไปก่อนช่วงนี้ แล้วค่อยลองใหม่
+DISCOVERY_RETRY_SECONDS = 60
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class OAuthHttpClient:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._discovery: Dict[str, Tuple[float, dict]] = {}
+
+    def _build(self) -> httpx.AsyncClient:
+        transport = None
+        if settings.oauth_stub_provider:
+            if detect_environment() == "vercel" or os.getenv("APP_ENV") == "production":
+                raise RuntimeError("OAUTH_STUB_PROVIDER must not be enabled in production (it accepts any OAuth code)")
+            from app.services.oauth_stub import stub_transport
+
+            logger.warning("OAUTH_STUB_PROVIDER is enabled: OAuth logins are answered by the local stub")
+            transport = stub_transport()
+        return httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.oauth_http_max_connections,
+                max_keepalive_connections=settings.oauth_http_max_connections,
+                keepalive_expiry=settings.oauth_http_keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(settings.oauth_http_timeout_seconds),
+            transport=transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build()
+        return self._client
+
+    async def start(self) -> None:
+        self.client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def discovery(self, url: str, fallback: dict) -> dict:
+        """openid-configuration ของ provider (field ที่ไม่มีใน document ใช้ค่าจาก fallback)"""
+        cached = self._discovery.get(url)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+
+        try:
+            response = await self.client.get(url)
+            response.raise_for_status()
+            document = {**fallback, **response.json()}
+            ttl = settings.oauth_discovery_ttl_seconds
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"OAuth discovery fetch failed ({url}): {e}; using built-in endpoints")
+            document = dict(fallback)
+            ttl = DISCOVERY_RETRY_SECONDS
+
+        self._discovery[url] = (time.monotonic() + ttl, document)
+        return document
+
+    def clear_discovery(self) -> None:
+        self._discovery.clear()
+
+
+oauth_http = OAuthHttpClient()
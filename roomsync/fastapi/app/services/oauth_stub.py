@@ -0,0 +1,86 @@
+"""
+OAuth provider จำลอง (Google + GitHub) สำหรับ test / dev แบบ offline (OAUTH_STUB_PROVIDER=true)
+
+เสียบเป็น httpx.MockTransport ของ client กลาง (app/services/oauth_http.py) ไม่มี network จริง
+- code ที่ส่งไป token endpoint กลายเป็น access_token → userinfo คืน user ตาม code
+  /google/auth?code=alice → alice@stub.roomsync.local ชื่อ "Alice"
+- GitHub /user ไม่คืน email → ต้องไปถาม /user/emails เหมือน account ที่ซ่อน email จริง
+- code="error" → token endpoint ตอบ {"error": "invalid_grant"} (ทดสอบเส้นทาง login ไม่สำเร็จ)
+"""
+from urllib.parse import parse_qs
+
+import httpx
+
+STUB_EMAIL_DOMAIN = "stub.roomsync.local"
+
+GOOGLE_DISCOVERY = {
+    "issuer": "https://accounts.google.com",
+    "authorization_endpoint": "https://accounts.google.com/o/oauth2/v2/auth",
+    "token_endpoint": "https://oauth2.googleapis.com/token",
+    "userinfo_endpoint": "https://openidconnect.googleapis.com/v1/userinfo",
+}
+
+
+def _form(request: httpx.Request) -> dict:
+    return {key: values[0] for key, values in parse_qs(request.content.decode()).items()}
+
+
+def _token(request: httpx.Request) -> httpx.Response:
+    code = _form(request).get("code", "")
+    if not code or code == "error":
+        return httpx.Response(200, json={"error": "invalid_grant"})
+    return httpx.Response(200, json={"access_token": code, "token_type": "Bearer", "expires_in": 3599})
+
+
+def _bearer(request: httpx.Request) -> str:
+    return request.headers.get("authorization", "").removeprefix("Bearer ")
+
+
+def _google_userinfo(request: httpx.Request) -> httpx.Response:
+    code = _bearer(request)
+    return httpx.Response(200, json={
+        "sub": f"stub-{code}",
+        "email": f"{code}@{STUB_EMAIL_DOMAIN}",
+        "email_verified": True,
+        "name": code.title(),
+        "picture": f"https://{STUB_EMAIL_DOMAIN}/avatars/{code}.png",
+    })
+
+
+def _github_user(request: httpx.Request) -> httpx.Response:
+    code = _bearer(request)
+    return httpx.Response(200, json={
+        "login": code,
+        "name": code.title(),
+        "email": None,
+        "avatar_url": f"https://{STUB_EMAIL_DOMAIN}/avatars/{code}.png",
+    })
+
+
+def _github_emails(request: httpx.Request) -> httpx.Response:
+    code = _bearer(request)
+    return httpx.Response(200, json=[
+        {"email": f"{code}+old@{STUB_EMAIL_DOMAIN}", "primary": False, "verified": True},
+        {"email": f"{code}@{STUB_EMAIL_DOMAIN}", "primary": True, "verified": True},
+    ])
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    host, path = request.url.host, request.url.path
+    if path.endswith("/.well-known/openid-configuration"):
+        return httpx.Response(200, json=GOOGLE_DISCOVERY)
+    if host == "oauth2.googleapis.com" and path == "/token":
+        return _token(request)
+    if (host, path) in (("openidconnect.googleapis.com", "/v1/userinfo"), ("www.googleapis.com", "/oauth2/v1/userinfo")):
+        return _google_userinfo(request)
+    if host == "github.com" and path == "/login/oauth/access_token":
+        return _token(request)
+    if host == "api.github.com" and path == "/user":
+        return _github_user(request)
+    if host == "api.github.com" and path == "/user/emails":
+        return _github_emails(request)
+    return httpx.Response(404, json={"error": "not_found", "path": path})
+
+
+def stub_transport() -> httpx.MockTransport:
+    return httpx.MockTransport(handler)
@@ -0,0 +1,94 @@
+"""
+Hash / verify รหัสผ่าน (bcrypt) บน thread pool แยก ไม่ให้บล็อก event loop
+
+bcrypt ใช้ CPU ~250ms ต่อครั้ง ถ้าเรียกตรง ๆ ใน async route → ทุก request ใน worker นั้นหยุดรอ
+- bcrypt ปล่อย GIL ระหว่างคำนวณ → thread pool พอ ไม่ต้องใช้ process pool
+- จำกัดจำนวน thread (PASSWORD_HASH_WORKERS) และคิวรอ (PASSWORD_HASH_MAX_QUEUE)
+  คิวเต็ม → PasswordHasherBusy (router ตอบ 503) ดีกว่าให้ login ค้างไปเรื่อย ๆ
+- เปลี่ยน BCRYPT_ROUNDS แล้ว hash เดิมจะถูก hash ใหม่ตอน login สำเร็จ (verify_and_update)
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.metrics import registry
+
+# Password hashing context (hash ที่ rounds ไม่ตรงกับ bcrypt_rounds จะถือว่าต้อง rehash)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+HASH_QUEUE_DEPTH = registry.gauge("password_hash_queue_depth", "Password hash/verify jobs waiting for a worker thread")
+HASH_IN_FLIGHT = registry.gauge("password_hash_in_flight", "Password hash/verify jobs running")
+HASH_SECONDS = registry.histogram(
+    "password_hash_seconds", "Password hash/verify time on the worker, by operation",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HASH_REJECTED = registry.counter("password_hash_rejected_total", "Jobs rejected because the queue was full")
+
+
+class PasswordHasherBusy(Exception):
+    """คิว hash เต็ม (มีงานรอเกิน PASSWORD_HASH_MAX_QUEUE)"""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0  # งานที่ส่งเข้า pool แล้วยังไม่เสร็จ (รอ + กำลังทำ)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, operation: str, fn, *args):
+        with self._lock:
+            waiting = max(self._pending - self.workers, 0)
+            if self.max_queue and waiting >= self.max_queue:
+                HASH_REJECTED.inc(operation=operation)
+                raise PasswordHasherBusy()
+            self._pending += 1
+            HASH_QUEUE_DEPTH.inc()
+
+        def job():
+            HASH_QUEUE_DEPTH.dec()
+            HASH_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                HASH_SECONDS.observe(time.perf_counter() - started, operation=operation)
+                HASH_IN_FLIGHT.dec()
+
+        def release(future) -> None:
+            # นับตาม executor ไม่ใช่ coroutine ที่รอ: client ตัดการเชื่อมต่อ / request ถูก cancel
+            # งานยังอยู่ใน pool จนเสร็จ → คืนที่ในคิวตอนงานเสร็จจริง (หรือถูกยกเลิกก่อนได้เริ่ม)
+            if future.cancelled():
+                HASH_QUEUE_DEPTH.dec()
+            with self._lock:
+                self._pending -= 1
+
+        future = self._get_executor().submit(job)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """(ถูกต้องไหม, hash ใหม่ถ้าต้อง rehash เพราะ rounds เปลี่ยน ไม่งั้น None)"""
+        return await self._run("verify", pwd_context.verify_and_update, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue)
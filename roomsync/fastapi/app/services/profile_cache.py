@@ -0,0 +1,180 @@
+"""
+Cache ของ Profile ตาม auth_user_id (ใช้ใน app/dependencies/auth.py)
+
+ทุก request ที่ส่ง X-Auth-User-ID ต้อง resolve Profile → cache ไว้ ไม่ต้อง query ทุกครั้ง
+- cache เฉพาะ role ที่ไม่มีสิทธิ์พิเศษ (CACHEABLE_ROLES = student) admin / teacher โหลดจาก DB ทุก request
+  → ถอดสิทธิ์ / ลบ admin แล้วมีผลทันทีทุก worker (require_admin, check_owner_or_admin เห็น role ล่าสุด)
+- backend ปกติ: LRU + TTL ใน process (แต่ละ gunicorn worker มีของตัวเอง → TTL สั้น ๆ)
+  invalidate ล้างได้แค่ worker ที่รับ request นั้น → worker อื่นยังเห็น profile ของ student เดิม
+  ได้นานสุด PROFILE_CACHE_TTL_SECONDS (ไม่ใช่สิทธิ์ที่สูงกว่าที่มีจริง: student ที่ถูกเลื่อนขั้นจะได้สิทธิ์ช้าไปเท่านั้น)
+- ตั้ง PROFILE_CACHE_REDIS_URL → ใช้ Redis ร่วมกันทุก worker (invalidate แล้วเห็นพร้อมกัน)
+router ที่แก้ Profile ต้องเรียก invalidate หลัง commit (ดู routers/profiles.py)
+cache ล่ม (Redis) ไม่ทำให้ request ล้ม: get → miss, set / invalidate → log error
+(invalidate ไม่สำเร็จ → ค่าเดิมหมดอายุเองตาม TTL)
+
+ค่าที่ได้จาก cache เป็น Profile แบบ transient (ไม่ผูก session) ใช้อ่าน/เช็คสิทธิ์เท่านั้น
+ถ้าจะแก้แล้ว commit ต้องโหลดตัวจริงจาก session ก่อน
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+
+from app.config import settings
+from app.metrics import registry
+from app.models.profile import Profile, UserRole
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = registry.counter("profile_cache_lookups_total", "Profile lookups by cache result (hit, miss)")
+
+_COLUMNS = [column.key for column in Profile.__table__.columns]
+
+# role ที่ cache ได้ (role อื่นมีสิทธิ์พิเศษ → ต้องเห็นค่าล่าสุดจาก DB เสมอ)
+CACHEABLE_ROLES = (UserRole.STUDENT.value,)
+
+
+# ════════════════════════════════════════════════════════════════
+# BACKENDS
+# ════════════════════════════════════════════════════════════════
+class LocalBackend:
+    """LRU + TTL ใน process"""
+
+    def __init__(self, ttl_seconds: int, maxsize: int):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, object]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Dict[str, object]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    async def set(self, key: str, data: Dict[str, object]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Redis (redis.asyncio) ใช้ร่วมกันทุก worker"""
+
+    PREFIX = "roomsync:profile:"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis.asyncio as redis_asyncio
+
+        self.ttl_seconds = ttl_seconds
+        self._client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[Dict[str, object]]:
+        raw = await self._client.get(self.PREFIX + key)
+        return _decode(json.loads(raw)) if raw else None
+
+    async def set(self, key: str, data: Dict[str, object]) -> None:
+        await self._client.set(self.PREFIX + key, json.dumps(_encode(data)), ex=self.ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self.PREFIX + key)
+
+    async def clear(self) -> None:
+        async for key in self._client.scan_iter(match=self.PREFIX + "*"):
+            await self._client.delete(key)
+
+
+def _encode(data: Dict[str, object]) -> Dict[str, object]:
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, uuid.UUID) else value
+        for key, value in data.items()
+    }
+
+
+def _decode(data: Dict[str, object]) -> Dict[str, object]:
+    decoded = dict(data)
+    for column in Profile.__table__.columns:
+        value = decoded.get(column.key)
+        if value is None:
+            continue
+        if isinstance(column.type, PG_UUID):
+            decoded[column.key] = uuid.UUID(value)
+        elif isinstance(column.type, DateTime):
+            decoded[column.key] = datetime.fromisoformat(value)
+    return decoded
+
+
+# ════════════════════════════════════════════════════════════════
+# PROFILE CACHE
+# ════════════════════════════════════════════════════════════════
+class ProfileCache:
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get(self, auth_user_id) -> Optional[Profile]:
+        try:
+            data = await self.backend.get(str(auth_user_id))
+        except Exception as e:
+            # cache ล่ม (เช่น Redis) → ถือว่า miss แล้วไปถาม DB แทน
+            logger.error(f"Profile cache get failed: {e}")
+            data = None
+        if data is not None and data.get("role") not in CACHEABLE_ROLES:
+            data = None  # ค่าที่เขียนไว้ก่อนมีกฎนี้ (Redis) → ถือว่า miss
+        CACHE_LOOKUPS.inc(result="miss" if data is None else "hit")
+        return Profile(**data) if data is not None else None
+
+    async def set(self, profile: Profile) -> None:
+        if profile.role not in CACHEABLE_ROLES:
+            return
+        try:
+            await self.backend.set(str(profile.auth_user_id), {key: getattr(profile, key) for key in _COLUMNS})
+        except Exception as e:
+            logger.error(f"Profile cache set failed: {e}")
+
+    async def invalidate(self, auth_user_id) -> None:
+        # เรียกหลัง commit แล้ว → cache ล่มต้องไม่ทำให้การแก้ที่สำเร็จแล้วตอบ 500
+        try:
+            await self.backend.delete(str(auth_user_id))
+        except Exception as e:
+            logger.error(f"Profile cache invalidate failed: {e}")
+
+    async def clear(self) -> None:
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            logger.error(f"Profile cache clear failed: {e}")
+
+
+def _build_backend():
+    if settings.profile_cache_redis_url:
+        try:
+            return RedisBackend(settings.profile_cache_redis_url, settings.profile_cache_ttl_seconds)
+        except ImportError:
+            logger.warning("PROFILE_CACHE_REDIS_URL is set but the redis package is not installed; using local cache")
+    return LocalBackend(settings.profile_cache_ttl_seconds, settings.profile_cache_size)
+
+
+profile_cache = ProfileCache(_build_backend())
@@ -0,0 +1,256 @@
+"""
+Free/busy bitmap ของห้อง (ต่อห้องต่อวัน ช่องละ 15 นาที)
+
+- คำนวณใหม่เฉพาะวันที่ได้รับผลกระทบ ทุกครั้งที่ Booking / BookingSeries ถูกเขียน
+  (สร้าง, approve, reject, cancel, ลบ) ผ่าน session events ก่อน commit
+  ล็อกแถวห้องก่อนคำนวณ แล้วเขียน mask ด้วย INSERT ... ON CONFLICT (จองห้องเดียวกันพร้อมกันไม่ทำ bit หาย)
+- ค้นหาห้องว่างในช่วงเวลา = rooms 1 query + bitmap ของวันที่เกี่ยวข้อง 1 query
+
+ช่องที่ถูกจองแค่บางส่วนถือว่าไม่ว่างทั้งช่อง (ผลลัพธ์ระมัดระวังเกินได้ไม่เกิน 15 นาที)
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+from app.models.booking_series import BookingSeries
+from app.models.room import Room
+from app.models.room_busy_slots import RoomBusySlots
+from app.services.booking_conflicts import ACTIVE_STATUSES, active_series, as_utc
+
+SLOT_MINUTES = 15
+SLOT = timedelta(minutes=SLOT_MINUTES)
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MASK_BYTES = SLOTS_PER_DAY // 8
+DAY = timedelta(days=1)
+
+# ค้นหาได้ไม่เกินกี่วันต่อครั้ง
+MAX_WINDOW_DAYS = 31
+
+# แถวต่อ INSERT ... VALUES (4 parameter ต่อแถว ไม่เกินขีดจำกัดของ SQLite)
+_UPSERT_CHUNK = 200
+
+
+# ════════════════════════════════════════════════════════════════
+# BITMAP HELPERS
+# ════════════════════════════════════════════════════════════════
+def encode_mask(mask: int) -> bytes:
+    return mask.to_bytes(MASK_BYTES, "big")
+
+
+def decode_mask(raw: Optional[bytes]) -> int:
+    return int.from_bytes(raw, "big") if raw else 0
+
+
+def days_covered(start: datetime, end: datetime) -> List[date]:
+    """วัน (UTC) ทั้งหมดที่ช่วง [start, end) แตะ"""
+    start, end = as_utc(start), as_utc(end)
+    if end <= start:
+        return []
+    last = (end - timedelta(microseconds=1)).date()
+    days, day = [], start.date()
+    while day <= last:
+        days.append(day)
+        day += DAY
+    return days
+
+
+def slot_mask(day: date, start: datetime, end: datetime) -> int:
+    """bitmap ของช่องในวัน day ที่ช่วง [start, end) แตะ"""
+    day_start = datetime.combine(day, time.min)
+    start = max(as_utc(start), day_start)
+    end = min(as_utc(end), day_start + DAY)
+    if end <= start:
+        return 0
+    first = (start - day_start) // SLOT
+    last = -(-(end - day_start) // SLOT) - 1  # ceil แล้วลบ 1
+    return ((1 << (last - first + 1)) - 1) << first
+
+
+# ════════════════════════════════════════════════════════════════
+# MAINTENANCE
+# ════════════════════════════════════════════════════════════════
+def rebuild_days(db: Session, room_id: UUID, days: Iterable[date]) -> None:
+    """คำนวณ bitmap ของห้องนี้ใหม่เฉพาะวันที่ระบุ (ไม่ commit)"""
+    days = sorted(set(days))
+    if not days:
+        return
+    window_start = datetime.combine(days[0], time.min, timezone.utc)
+    window_end = datetime.combine(days[-1] + DAY, time.min, timezone.utc)
+
+    masks: Dict[date, int] = {day: 0 for day in days}
+
+    def mark(start: datetime, end: datetime) -> None:
+        for day in days_covered(start, end):
+            if day in masks:
+                masks[day] |= slot_mask(day, start, end)
+
+    bookings = db.query(Booking.start_time, Booking.end_time).filter(
+        Booking.room_id == room_id,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < window_end,
+        Booking.end_time > window_start,
+    ).all()
+    for booking in bookings:
+        mark(booking.start_time, booking.end_time)
+    for series in active_series(db, [room_id], window_start, window_end):
+        for occ_start, occ_end in series.occurrences(window_start, window_end):
+            mark(occ_start, occ_end)
+
+    # เขียนทับด้วยค่าที่คำนวณจาก bookings (ไม่อ่าน mask เดิมมา merge) → INSERT ... ON CONFLICT ไม่ชน PK
+    now = datetime.utcnow()
+    busy = [{"room_id": room_id, "day": day, "mask": encode_mask(mask), "updated_at": now}
+            for day, mask in masks.items() if mask]
+    for start in range(0, len(busy), _UPSERT_CHUNK):
+        db.execute(_upsert_masks(db, busy[start:start + _UPSERT_CHUNK]))
+    free = [day for day, mask in masks.items() if not mask]
+    if free:
+        db.query(RoomBusySlots).filter(
+            RoomBusySlots.room_id == room_id, RoomBusySlots.day.in_(free)
+        ).delete(synchronize_session=False)
+
+
+def _upsert_masks(db: Session, rows: List[dict]):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(RoomBusySlots).values(rows)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(RoomBusySlots).values(rows)
+    else:
+        raise RuntimeError(f"room_busy_slots upsert not supported on {dialect}")
+    return stmt.on_conflict_do_update(
+        index_elements=["room_id", "day"],
+        set_={"mask": stmt.excluded.mask, "updated_at": stmt.excluded.updated_at},
+    )
+
+
+def lock_rooms(db: Session, room_ids: Iterable[UUID]) -> None:
+    """
+    ล็อกแถว rooms (FOR NO KEY UPDATE ไม่ชนกับ FK check ของ INSERT booking) เรียงตาม id กัน deadlock
+
+    transaction อื่นที่จะคำนวณ bitmap ของห้องเดียวกันต้องรอจน commit
+    แล้วค่อยอ่าน bookings (READ COMMITTED → เห็นการจองของ transaction ก่อนหน้า) ไม่มี bit หาย
+    SQLite ไม่มี row lock (เขียนได้ทีละ transaction อยู่แล้ว) → ไม่ render FOR UPDATE
+    """
+    room_ids = list(set(room_ids))
+    if room_ids:
+        db.query(Room.id).filter(Room.id.in_(room_ids)).order_by(Room.id).with_for_update(key_share=True).all()
+
+
+def rebuild_room(db: Session, room_id: UUID) -> None:
+    """คำนวณ bitmap ของห้องใหม่ทั้งหมด (ใช้หลัง import ข้อมูลตรงเข้า DB)"""
+    db.query(RoomBusySlots).filter(RoomBusySlots.room_id == room_id).delete()
+    days: Set[date] = set()
+    for booking in db.query(Booking.start_time, Booking.end_time).filter(
+        Booking.room_id == room_id, Booking.status.in_(ACTIVE_STATUSES)
+    ):
+        days.update(days_covered(booking.start_time, booking.end_time))
+    for series in db.query(BookingSeries).filter(
+        BookingSeries.room_id == room_id, BookingSeries.status.in_(ACTIVE_STATUSES)
+    ):
+        days.update(_series_days(series))
+    rebuild_days(db, room_id, days)
+
+
+def _series_days(series: BookingSeries) -> Iterator[date]:
+    for occ_start, occ_end in series.occurrences():
+        yield from days_covered(occ_start, occ_end)
+
+
+# ════════════════════════════════════════════════════════════════
+# SEARCH
+# ════════════════════════════════════════════════════════════════
+def find_available_rooms(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    min_pax: Optional[int] = None,
+    level: Optional[int] = None,
+) -> List[Room]:
+    """ห้องที่ว่างตลอดช่วง [start, end) (ไม่รวมห้องที่ status = broken)"""
+    query = db.query(Room).filter(Room.status != "broken")
+    if min_pax is not None:
+        query = query.filter(Room.pax >= min_pax)
+    if level is not None:
+        query = query.filter(Room.level == level)
+    rooms = query.order_by(Room.name).all()
+
+    window = {day: slot_mask(day, start, end) for day in days_covered(start, end)}
+    busy = {
+        row.room_id
+        for row in db.query(RoomBusySlots.room_id, RoomBusySlots.day, RoomBusySlots.mask).filter(
+            RoomBusySlots.day.in_(list(window))
+        )
+        if decode_mask(row.mask) & window[row.day]
+    }
+    return [room for room in rooms if room.id not in busy]
+
+
+# ════════════════════════════════════════════════════════════════
+# SESSION EVENTS - เก็บวันที่ได้รับผลกระทบ แล้วคำนวณใหม่ก่อน commit
+# ════════════════════════════════════════════════════════════════
+_TOUCHED_KEY = "room_availability_touched"
+_DROPPED_KEY = "room_availability_dropped_rooms"
+
+
+def _booking_days(obj: Booking) -> Iterator[date]:
+    state = inspect(obj)
+    starts = [obj.start_time] + list(state.attrs.start_time.history.deleted or [])
+    ends = [obj.end_time] + list(state.attrs.end_time.history.deleted or [])
+    for start in starts:
+        for end in ends:
+            if start is not None and end is not None:
+                yield from days_covered(start, end)
+
+
+def _touched_rooms(obj) -> Set[UUID]:
+    """ห้องปัจจุบัน + ห้องเดิม (ย้าย booking ไปห้องอื่น → ห้องเดิมต้องคำนวณใหม่ด้วย)"""
+    previous = inspect(obj).attrs.room_id.history.deleted or []
+    return {room_id for room_id in [obj.room_id, *previous] if room_id is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_touched_days(session: Session, flush_context) -> None:
+    touched = session.info.setdefault(_TOUCHED_KEY, defaultdict(set))
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Booking):
+            days = set(_booking_days(obj))
+        elif isinstance(obj, BookingSeries):
+            days = set(_series_days(obj))
+        else:
+            continue
+        for room_id in _touched_rooms(obj):
+            touched[room_id].update(days)
+    for obj in session.deleted:
+        if isinstance(obj, Room):
+            session.info.setdefault(_DROPPED_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "before_commit")
+def _rebuild_touched_days(session: Session) -> None:
+    if session.new or session.dirty or session.deleted:
+        session.flush()  # before_commit มาก่อน flush สุดท้าย → flush เองให้ after_flush เก็บวันก่อน
+    touched = session.info.pop(_TOUCHED_KEY, None) or {}
+    dropped = session.info.pop(_DROPPED_KEY, None) or set()
+    if not touched and not dropped:
+        return
+
+    lock_rooms(session, [room_id for room_id in touched if room_id not in dropped])
+    for room_id in dropped:
+        session.query(RoomBusySlots).filter(RoomBusySlots.room_id == room_id).delete()
+    for room_id, days in touched.items():
+        if room_id not in dropped:
+            rebuild_days(session, room_id, days)
+    session.flush()
+    session.info.pop(_TOUCHED_KEY, None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_touched_days(session: Session) -> None:
+    session.info.pop(_TOUCHED_KEY, None)
+    session.info.pop(_DROPPED_KEY, None)
@@ -0,0 +1,122 @@
+"""
+สรุปอุปกรณ์ต่อห้องเก็บไว้ใน rooms.equipment_types / rooms.equipment_total
+
+การ์ดห้องแสดงจำนวนอุปกรณ์ได้จากแถว rooms อย่างเดียว ไม่ต้องโหลด room_equipments ทุกแถว
+- router ของ room_equipments ล็อกแถว room_equipments (FOR UPDATE) ก่อนคิด delta จาก quantity
+  แล้วปรับตัวเลขด้วย UPDATE ... SET x = x + delta ใน transaction เดียวกับการแก้
+  (atomic ใน DB + delta คิดจากค่าล่าสุด → request พร้อมกันไม่ทับตัวเลขกัน)
+- งานแบบ bulk (import, ลบอุปกรณ์, migrate / sync) คำนวณใหม่จาก room_equipments ของห้องที่โดนแตะ
+- `python -m app.cli reconcile-room-equipment` หาห้องที่ตัวเลขไม่ตรงแล้วแก้ (และเพิ่ม column ให้ DB เก่า)
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, inspect, or_, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.room import Room
+from app.models.room_equipment import RoomEquipment
+
+SUMMARY_COLUMNS = ("equipment_types", "equipment_total")
+
+# IN (...) ทีละไม่เกินเท่านี้ (SQLite จำกัดจำนวน parameter ต่อ statement)
+_IN_CHUNK = 500
+
+
+@dataclass
+class SummaryDrift:
+    room_id: UUID
+    name: str
+    stored_types: int
+    stored_total: int
+    actual_types: int
+    actual_total: int
+
+
+def summary_delta(room_id: UUID, types: int = 0, total: int = 0):
+    """UPDATE rooms SET equipment_types = equipment_types + :types, equipment_total = ... (ใช้กับ await db.execute)"""
+    return (
+        update(Room)
+        .where(Room.id == room_id)
+        .values(equipment_types=Room.equipment_types + types, equipment_total=Room.equipment_total + total)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _actual_types():
+    return (
+        select(func.count(RoomEquipment.id))
+        .where(RoomEquipment.room_id == Room.id)
+        .correlate(Room)
+        .scalar_subquery()
+    )
+
+
+def _actual_total():
+    return (
+        select(func.coalesce(func.sum(RoomEquipment.quantity), 0))
+        .where(RoomEquipment.room_id == Room.id)
+        .correlate(Room)
+        .scalar_subquery()
+    )
+
+
+def refresh_summaries(db: Session, room_ids: Optional[Iterable[UUID]] = None) -> int:
+    """
+    คำนวณใหม่จาก room_equipments (room_ids=None → ทุกห้อง) แก้เฉพาะห้องที่ไม่ตรง
+    ไม่ commit (อยู่ใน transaction ของผู้เรียก) คืนจำนวนห้องที่แก้
+    """
+    types, total = _actual_types(), _actual_total()
+    statement = (
+        update(Room)
+        .where(or_(Room.equipment_types != types, Room.equipment_total != total))
+        .values(equipment_types=types, equipment_total=total)
+        .execution_options(synchronize_session=False)
+    )
+    if room_ids is None:
+        return db.execute(statement).rowcount
+
+    room_ids = list(dict.fromkeys(room_ids))
+    fixed = 0
+    for start in range(0, len(room_ids), _IN_CHUNK):
+        fixed += db.execute(statement.where(Room.id.in_(room_ids[start:start + _IN_CHUNK]))).rowcount
+    return fixed
+
+
+def find_drift(db: Session, limit: Optional[int] = None) -> List[SummaryDrift]:
+    """ห้องที่ตัวเลขใน rooms ไม่ตรงกับ room_equipments จริง"""
+    types, total = _actual_types(), _actual_total()
+    query = (
+        select(Room.id, Room.name, Room.equipment_types, Room.equipment_total, types, total)
+        .where(or_(Room.equipment_types != types, Room.equipment_total != total))
+        .order_by(Room.name, Room.id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return [SummaryDrift(*row) for row in db.execute(query)]
+
+
+def missing_summary_columns(engine: Engine) -> List[str]:
+    inspector = inspect(engine)
+    if not inspector.has_table(Room.__tablename__):
+        return []
+    existing = {column["name"] for column in inspector.get_columns(Room.__tablename__)}
+    return [name for name in SUMMARY_COLUMNS if name not in existing]
+
+
+def ensure_summary_columns(engine: Engine) -> List[str]:
+    """
+    เพิ่ม column ที่ยังไม่มีใน rooms แล้วคำนวณค่าให้ทุกห้อง
+    (DB ที่สร้างก่อนมี column นี้; create_all ไม่แก้ตารางที่มีอยู่แล้ว) คืนชื่อ column ที่เพิ่ม
+    """
+    added = missing_summary_columns(engine)
+    if added:
+        with engine.begin() as conn:
+            for name in added:
+                conn.execute(text(f"ALTER TABLE rooms ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"))
+        with Session(engine) as db:
+            refresh_summaries(db)
+            db.commit()
+    return added
@@ -0,0 +1,336 @@
+"""
+สร้างข้อมูลสังเคราะห์จำนวนมากสำหรับทดสอบ scale (`python -m app.cli generate-data`)
+
+ข้อมูลตัวอย่างมีแค่ dummy ใน comment ของ model → สร้างชุดข้อมูลที่อ้างอิงกันถูกต้องตามขนาดที่ต้องการ
+- equipments, rooms (+ equipment_types / equipment_total), room_equipments, profiles, bookings,
+  damage_reports (+ room_busy_slots)
+- bulk insert ผ่าน Core (executemany ทีละ batch) ไม่สร้าง ORM object / ไม่ผ่าน session events
+- เวลาทั้งหมดอิง anchor (วันที่คงที่ default DEFAULT_ANCHOR ไม่ใช่เวลาปัจจุบัน)
+  → seed + anchor เดียวกันลง DB เปล่า ได้ข้อมูลชุดเดิมทุกครั้ง (id, ชื่อ, เวลา, สถานะ)
+  อยากได้ booking คร่อมวันนี้ → ส่ง anchor = วันนี้ (`--anchor-date YYYY-MM-DD`)
+- รันซ้ำเพื่อเพิ่มข้อมูลต้องใช้ seed อื่น: booking ลงเฉพาะห้องที่สร้างในรอบนี้ → ไม่ทับของเดิม
+  seed ที่เคยลง DB นี้แล้ว (id ชนกัน) → ValueError ก่อนเขียนอะไร (ไม่ใช่ idempotent)
+- booking ของแต่ละห้องเรียงต่อกันไม่ทับกันเลย (รวม pending) จันทร์-ศุกร์ 08:00-18:00 (UTC+7) ครั้งละ 30 นาที - 2 ชั่วโมง
+  จบก่อน anchor: approved เป็นส่วนใหญ่ + rejected/cancelled, หลังจากนี้: approved/pending
+- room_busy_slots คำนวณไปพร้อมกัน (ค้นหาห้องว่างได้เลย ไม่ต้อง rebuild)
+"""
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as time_of_day
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.models.booking import Booking, BookingStatus
+from app.models.damage_report import DamageReport, DamageStatus
+from app.models.equipment import Equipment
+from app.models.profile import Profile, UserRole
+from app.models.room import Room
+from app.models.room_busy_slots import RoomBusySlots
+from app.models.room_equipment import RoomEquipment
+from app.services.booking_conflicts import ACTIVE_STATUSES
+from app.services.room_availability import days_covered, encode_mask, slot_mask
+
+ROOM_STATUSES = (("available", 72), ("inuse", 12), ("booked", 12), ("broken", 4))
+ROOM_PAX = (10, 20, 30, 40, 60, 120, 200)
+ROLES = ((UserRole.STUDENT.value, 85), (UserRole.TEACHER.value, 13), (UserRole.ADMIN.value, 2))
+PAST_BOOKING_STATUSES = (
+    (BookingStatus.APPROVED.value, 75),
+    (BookingStatus.CANCELLED.value, 15),
+    (BookingStatus.REJECTED.value, 10),
+)
+FUTURE_BOOKING_STATUSES = (
+    (BookingStatus.APPROVED.value, 55),
+    (BookingStatus.PENDING.value, 35),
+    (BookingStatus.CANCELLED.value, 10),
+)
+DAMAGE_STATUSES = (
+    (DamageStatus.RESOLVED.value, 55),
+    (DamageStatus.REPORTED.value, 25),
+    (DamageStatus.IN_PROGRESS.value, 20),
+)
+
+FIRST_NAMES = (
+    "Somchai", "Somsak", "Suda", "Malee", "Anan", "Kanya", "Narong", "Pim", "Wichai", "Arthit",
+    "Nattaya", "Ploy", "Krit", "Siriporn", "Thana", "Chanida", "Pakorn", "Warunee", "Ekkachai", "Jiraporn",
+)
+LAST_NAMES = (
+    "Srisuk", "Saetang", "Wongsa", "Chaiyaporn", "Boonmee", "Suksawat", "Rattanakul", "Thongdee",
+    "Kaewmanee", "Phrommin", "Jaidee", "Sombat", "Yodying", "Intarasuk", "Pongpan",
+)
+EQUIPMENT_CATALOG = (
+    "Projector", "Whiteboard", "Speaker", "Microphone", "Document camera", "Smart TV",
+    "Air conditioner", "Video conference kit", "Lab bench", "Desktop computer", "Laser pointer", "Wi-Fi access point",
+)
+DAMAGE_DESCRIPTIONS = (
+    "Projector bulb is broken", "Whiteboard markers are missing", "Speaker crackles at high volume",
+    "Air conditioner leaks water", "HDMI cable is damaged", "Chair leg is broken", "Ceiling light flickers",
+    "Microphone battery does not charge", "Door lock is stuck", "Power outlet has no power",
+)
+
+# เวลาทำการ 08:00-18:00 (UTC+7) = 01:00-11:00 UTC, ช่องละ 30 นาที
+OPEN_HOUR_UTC = 1
+CLOSE_HOUR_UTC = 11
+STEP = timedelta(minutes=30)
+
+# "ตอนนี้" ของข้อมูลที่สร้าง (created_at / updated_at, booking ก่อน-หลัง = ผ่านไปแล้ว / ยังไม่ถึง)
+DEFAULT_ANCHOR = date(2026, 1, 5)
+BOOKINGS_PER_DAY = 5
+
+
+@dataclass
+class GenerateReport:
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+class _BulkWriter:
+    """สะสมแถวต่อตารางแล้ว insert ทีละ batch_size (1 transaction ต่อ batch)"""
+
+    def __init__(self, engine: Engine, batch_size: int):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.rows: Dict[str, int] = defaultdict(int)
+        self._pending: Dict[object, List[dict]] = defaultdict(list)
+
+    def add(self, table, row: dict) -> None:
+        pending = self._pending[table]
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None) -> None:
+        for target in [table] if table is not None else list(self._pending):
+            pending = self._pending.pop(target, None)
+            if pending:
+                with self.engine.begin() as conn:
+                    conn.execute(insert(target), pending)
+                self.rows[target.name] += len(pending)
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _open_at(day: date) -> datetime:
+    """เวลาเปิดของวันทำการแรกตั้งแต่ day (ข้ามเสาร์-อาทิตย์)"""
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime(day.year, day.month, day.day, OPEN_HOUR_UTC, tzinfo=timezone.utc)
+
+
+def _next_slot(cursor: datetime, duration: timedelta) -> datetime:
+    """เวลาเริ่มแรกที่ >= cursor และจบภายในเวลาทำการของวันนั้น"""
+    close = cursor.replace(hour=CLOSE_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if cursor.weekday() >= 5 or cursor + duration > close:
+        return _open_at(cursor.date() + timedelta(days=1))
+    if cursor.hour < OPEN_HOUR_UTC:
+        return _open_at(cursor.date())
+    return cursor
+
+
+def _seed_already_used(engine: Engine, seed: int) -> bool:
+    """id แรกที่ seed นี้สุ่ม (equipment / room / profile / ... ตัวแรกที่สร้าง) มีใน DB แล้วหรือยัง"""
+    first_id = _uuid(random.Random(seed))
+    with engine.connect() as conn:
+        return any(
+            conn.scalar(select(model.id).where(model.id == first_id)) is not None
+            for model in (Equipment, Room, Profile, Booking, DamageReport)
+        )
+
+
+def generate(
+    engine: Engine,
+    rooms: int = 1_000,
+    equipments: int = 50,
+    profiles: int = 10_000,
+    bookings: int = 100_000,
+    damage_reports: int = 2_000,
+    seed: int = 42,
+    start: Optional[date] = None,
+    anchor: date = DEFAULT_ANCHOR,
+    batch_size: int = 5_000,
+    progress: Optional[Callable[[str, int, float], None]] = None,
+) -> GenerateReport:
+    """
+    สร้างข้อมูลตามจำนวนที่ระบุลง DB ของ engine (ตารางต้องมีอยู่แล้ว)
+    anchor = "ตอนนี้" ของข้อมูล (00:00 UTC ของวันนั้น) เวลาทั้งหมดคำนวณจากวันนี้ → seed เดียวกันได้ข้อมูลเดิม
+    start = วันแรกของ booking (default: ให้ช่วงของ booking คร่อม anchor ประมาณครึ่งต่อครึ่ง)
+    seed ที่เคยสร้างลง DB นี้แล้ว → ValueError (ใช้ seed อื่นเพื่อเพิ่มข้อมูล)
+    progress(table, rows, seconds) ถูกเรียกเมื่อแต่ละตารางเสร็จ
+    """
+    if bookings and not (rooms and profiles):
+        raise ValueError("bookings need at least one room and one profile")
+    if damage_reports and not (rooms and profiles):
+        raise ValueError("damage reports need at least one room and one profile")
+
+    if _seed_already_used(engine, seed):
+        raise ValueError(f"data for seed {seed} is already in this database; use another --seed to add more")
+
+    rng = random.Random(seed)
+    writer = _BulkWriter(engine, batch_size)
+    report = GenerateReport()
+    now = datetime.combine(anchor, time_of_day.min, timezone.utc)
+    per_room, extra = divmod(bookings, rooms) if rooms else (0, 0)
+    if start is None:
+        # เฉลี่ย ~5 booking ต่อห้องต่อวันทำการ (ยาว ~72 นาที + ช่องว่าง ~42 นาที ใน 10 ชั่วโมง)
+        start = (now - timedelta(days=per_room / BOOKINGS_PER_DAY * 7 / 5 / 2)).date()
+    started = time.perf_counter()
+
+    def done(step_started: float, *tables) -> None:
+        writer.flush()
+        for table in tables:
+            report.rows[table.name] = writer.rows.get(table.name, 0)
+            if progress:
+                progress(table.name, report.rows[table.name], time.perf_counter() - step_started)
+
+    with engine.connect() as conn:
+        first_room = conn.scalar(select(func.count()).select_from(Room)) or 0
+        first_equipment = conn.scalar(select(func.count()).select_from(Equipment)) or 0
+
+    # ─── equipments
+    step = time.perf_counter()
+    equipment_ids = []
+    for n in range(first_equipment, first_equipment + equipments):
+        equipment_id = _uuid(rng)
+        equipment_ids.append(equipment_id)
+        model = n // len(EQUIPMENT_CATALOG)
+        name = EQUIPMENT_CATALOG[n % len(EQUIPMENT_CATALOG)] + (f" Mk{model + 1}" if model else "")
+        writer.add(Equipment.__table__, {
+            "id": equipment_id, "name": name, "created_at": now, "updated_at": now,
+        })
+    done(step, Equipment.__table__)
+
+    # ─── rooms: อาคารละ 200 ห้อง ชั้นละ 20 ห้อง ชื่อ B<อาคาร>-<ชั้น><เลขห้อง> ต่อจากห้องที่มีอยู่
+    # อุปกรณ์ของห้อง (0-4 ชนิดไม่ซ้ำกัน) สุ่มก่อน → ใส่ equipment_types / equipment_total ได้เลย
+    step = time.perf_counter()
+    room_ids = []
+    room_equipment: Dict[uuid.UUID, List[Tuple[uuid.UUID, int]]] = {}
+    for n in range(first_room, first_room + rooms):
+        room_id = _uuid(rng)
+        room_ids.append(room_id)
+        chosen = rng.sample(equipment_ids, min(rng.randint(0, 4), len(equipment_ids)))
+        items = room_equipment[room_id] = [(equipment_id, rng.choice((1, 1, 1, 2, 2, 4))) for equipment_id in chosen]
+        created = now - timedelta(days=rng.randint(30, 720))
+        writer.add(Room.__table__, {
+            "id": room_id,
+            "name": f"B{n // 200 + 1}-{n % 200 // 20 + 1}{n % 20 + 1:02d}",
+            "level": n % 200 // 20 + 1,
+            "pax": rng.choice(ROOM_PAX),
+            "status": _weighted(rng, ROOM_STATUSES),
+            "note": "Near the elevator" if rng.random() < 0.05 else None,
+            "equipment_types": len(items),
+            "equipment_total": sum(quantity for _, quantity in items),
+            "created_at": created,
+            "updated_at": created,
+        })
+    done(step, Room.__table__)
+
+    # ─── room_equipments
+    step = time.perf_counter()
+    for room_id, items in room_equipment.items():
+        for equipment_id, quantity in items:
+            writer.add(RoomEquipment.__table__, {
+                "id": _uuid(rng),
+                "room_id": room_id,
+                "equipment_id": equipment_id,
+                "quantity": quantity,
+                "created_at": now,
+            })
+    done(step, RoomEquipment.__table__)
+
+    # ─── profiles
+    step = time.perf_counter()
+    profile_ids = []
+    for _ in range(profiles):
+        profile_id = _uuid(rng)
+        profile_ids.append(profile_id)
+        created = now - timedelta(days=rng.randint(0, 720), seconds=rng.randint(0, 86_399))
+        writer.add(Profile.__table__, {
+            "id": profile_id,
+            "auth_user_id": _uuid(rng),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "role": _weighted(rng, ROLES),
+            "created_at": created,
+            "updated_at": created,
+        })
+    done(step, Profile.__table__)
+
+    # ─── bookings: ทีละห้อง เวลาต่อกันไม่ทับ + bitmap ของห้องนั้นเขียนตามทันที
+    step = time.perf_counter()
+    for index, room_id in enumerate(room_ids):
+        cursor = _open_at(start) + STEP * rng.randrange(4)
+        masks: Dict[date, int] = defaultdict(int)
+        for _ in range(per_room + (1 if index < extra else 0)):
+            duration = STEP * rng.choice((1, 2, 2, 3, 4))
+            cursor = _next_slot(cursor + STEP * rng.choice((0, 0, 1, 2, 4)), duration)
+            begin, end = cursor, cursor + duration
+            cursor = end
+
+            statuses = PAST_BOOKING_STATUSES if end <= now else FUTURE_BOOKING_STATUSES
+            status = _weighted(rng, statuses)
+            user_id = rng.choice(profile_ids)
+            created = min(begin - timedelta(days=rng.randint(1, 21), minutes=rng.randint(0, 1439)), now)
+            updated = created if status == BookingStatus.PENDING.value else min(created + timedelta(hours=rng.randint(1, 48)), now)
+            writer.add(Booking.__table__, {
+                "id": _uuid(rng),
+                "user_id": user_id,
+                "room_id": room_id,
+                "start_time": begin,
+                "end_time": end,
+                "status": status,
+                "created_at": created,
+                "updated_at": updated,
+                "created_by": user_id,
+            })
+            if status in ACTIVE_STATUSES:
+                for day in days_covered(begin, end):
+                    masks[day] |= slot_mask(day, begin, end)
+        for day, mask in masks.items():
+            writer.add(RoomBusySlots.__table__, {
+                "room_id": room_id, "day": day, "mask": encode_mask(mask), "updated_at": now,
+            })
+    done(step, Booking.__table__, RoomBusySlots.__table__)
+
+    # ─── damage_reports (ส่วนใหญ่ผูกกับอุปกรณ์ในห้องนั้น)
+    step = time.perf_counter()
+    for _ in range(damage_reports):
+        room_id = rng.choice(room_ids)
+        equipment = [equipment_id for equipment_id, _ in room_equipment[room_id]]
+        reporter_id = rng.choice(profile_ids)
+        status = _weighted(rng, DAMAGE_STATUSES)
+        created = now - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1439))
+        writer.add(DamageReport.__table__, {
+            "id": _uuid(rng),
+            "room_id": room_id,
+            "equipment_id": rng.choice(equipment) if equipment and rng.random() < 0.8 else None,
+            "reporter_id": reporter_id,
+            "description": rng.choice(DAMAGE_DESCRIPTIONS),
+            "status": status,
+            "created_at": created,
+            "updated_at": created if status == DamageStatus.REPORTED.value else min(created + timedelta(days=rng.randint(1, 14)), now),
+            "created_by": reporter_id,
+        })
+    done(step, DamageReport.__table__)
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,72 @@
+"""
+Microbenchmark (pytest-benchmark) ของ endpoint หลัก: 1 request ต่อรอบผ่าน TestClient ใน process
+
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks/bench_api.py --benchmark-json=bench-api.json
+    python -m pytest benchmarks/bench_api.py --benchmark-autosave
+    python -m pytest benchmarks/bench_api.py --benchmark-compare --benchmark-compare-fail=median:20%
+    BENCH_SCALE=0.1 python -m pytest benchmarks/bench_api.py -k "bookings or room"
+
+DB: DATABASE_URL ถ้าตั้งไว้ (seed ให้ถ้ายังว่าง) ไม่งั้น SQLite ชั่วคราวขนาด BENCH_SCALE
+(default 0.01 = 100 rooms, 1k profiles, 10k bookings; 1 = 10k / 100k / 1M เหมือน seed.py)
+request ชุดเดียวกับ load_api.py (SCENARIOS) → ตัวเลข latency เดี่ยว ๆ ไว้ดูคู่กับ p99 ภายใต้โหลด
+"""
+import itertools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_api.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from benchmarks.load_api import SCENARIOS, load_context, request_kwargs  # noqa: E402
+from benchmarks.seed import AUTH_USERS, BOOKINGS, PROFILES, ROOMS, seed_database  # noqa: E402
+
+SCALE = float(os.getenv("BENCH_SCALE", "0.01"))
+# bcrypt (~250ms) → วัดแค่ไม่กี่รอบ
+SLOW_SCENARIOS = {"auth_login_email", "auth_register"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app import fastapi_app
+    from app.db import engine
+
+    seed_database(
+        engine,
+        rooms=max(int(ROOMS * SCALE), 1),
+        profiles=max(int(PROFILES * SCALE), 1),
+        bookings=int(BOOKINGS * SCALE),
+        auth_users=min(AUTH_USERS, 100),
+    )
+    with TestClient(fastapi_app, follow_redirects=False) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def ctx(client):
+    return load_context()
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_endpoint(benchmark, client, ctx, name):
+    scenario = SCENARIOS[name]
+    counter = itertools.count()
+
+    def call():
+        return client.request(**request_kwargs(scenario, ctx, next(counter)))
+
+    if name in SLOW_SCENARIOS:
+        response = benchmark.pedantic(call, rounds=5, iterations=1)
+    else:
+        response = benchmark(call)
+    assert response.status_code == scenario.expected, response.text
@@ -0,0 +1,86 @@
+"""
+เทียบ connection churn ของ engine mode: pooled (QueuePool) vs serverless (NullPool)
+
+    python benchmarks/bench_engine_modes.py
+    python benchmarks/bench_engine_modes.py --requests 5000 --concurrency 32
+    DATABASE_URL=postgresql://...@...pooler.supabase.com:6543/postgres python benchmarks/bench_engine_modes.py
+
+1 request = checkout → SELECT 1 → คืน connection (เหมือน route ที่ query ครั้งเดียว)
+รายงานต่อ mode: connection ที่เปิดใหม่, req/s, latency p50/p95/max
+ไม่ระบุ DATABASE_URL → ใช้ SQLite ไฟล์ชั่วคราว (ดูแนวโน้มได้ แต่ตัวเลขจริงต้องวัดกับ Postgres)
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_engine_modes.db"
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db import InstrumentedQueuePool, pool_options  # noqa: E402
+
+MODES = ("pooled", "serverless")
+
+
+def run_mode(mode: str, requests: int, concurrency: int) -> dict:
+    engine = create_engine(settings.database_url, **pool_options(settings.database_url, InstrumentedQueuePool, mode))
+    connects = 0
+
+    @event.listens_for(engine, "connect")
+    def _count_connect(dbapi_connection, connection_record):
+        nonlocal connects
+        connects += 1
+
+    def one_request(_):
+        started = time.perf_counter()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1")).scalar()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one_request, range(requests)))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    return {
+        "mode": mode,
+        "pool": engine.pool.__class__.__name__,
+        "requests": requests,
+        "connections_opened": connects,
+        "req_per_s": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"DATABASE_URL backend: {settings.database_url.split(':', 1)[0]}, "
+          f"pool_size={settings.db_pool_size}, max_overflow={settings.db_max_overflow}, "
+          f"concurrency={args.concurrency}")
+    header = f"{'mode':<11} {'pool':<22} {'conns':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for mode in MODES:
+        r = run_mode(mode, args.requests, args.concurrency)
+        print(f"{r['mode']:<11} {r['pool']:<22} {r['connections_opened']:>7} {r['req_per_s']:>9.0f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['max_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Microbenchmark ของ JWTAndCSRFMiddleware: BaseHTTPMiddleware (แบบเดิม) vs pure ASGI (app/__init__.py)
+
+    python benchmarks/bench_jwt_middleware.py
+    python benchmarks/bench_jwt_middleware.py --requests 20000 --concurrency 100
+
+ยิง POST ที่ผ่านการเช็ค (JWT cookie + X-CSRF-Token ถูกต้อง) เข้า ASGI app ตรง ๆ ไม่ผ่าน network
+endpoint ข้างในตอบ "ok" ทันที → ส่วนต่างกับ "none" = overhead ของ middleware ต่อ request
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_jwt_middleware.db"
+
+from jose import JWTError  # noqa: E402
+from jose import jwt  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse, PlainTextResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app import JWTAndCSRFMiddleware  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.routers.auth import create_access_token  # noqa: E402
+from app.services.identity_cache import identity_cache  # noqa: E402
+
+
+class LegacyJWTAndCSRFMiddleware(BaseHTTPMiddleware):
+    """แบบเดิมก่อนเปลี่ยนเป็น pure ASGI (ตัด debug log ออกให้เทียบเฉพาะตัว middleware)"""
+
+    async def dispatch(self, request, call_next):
+        excluded_paths = ["/", "/login", "/login/email", "/register", "/google/auth", "/logout"]
+        if request.method not in ["POST", "PUT", "DELETE"] or request.url.path in excluded_paths:
+            return await call_next(request)
+
+        token = request.cookies.get("jwt")
+        if not token:
+            return JSONResponse(status_code=401, content={"detail": "Missing JWT cookie"})
+        try:
+            identity = identity_cache.verify(token)
+            request.state.identity = identity
+        except JWTError:
+            return JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})
+
+        client_csrf = request.headers.get("X-CSRF-Token")
+        if not client_csrf or identity.payload.get("csrf_token") != client_csrf:
+            return JSONResponse(status_code=403, content={"detail": "CSRF token mismatch"})
+        return await call_next(request)
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+def build_app(middleware_cls):
+    middleware = [Middleware(middleware_cls)] if middleware_cls else []
+    return Starlette(routes=[Route("/rooms", ok, methods=["POST"])], middleware=middleware)
+
+
+def build_scope(token: str, csrf: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/rooms",
+        "raw_path": b"/rooms",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"cookie", f"jwt={token}".encode()),
+            (b"x-csrf-token", csrf.encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def call(app, scope: dict) -> int:
+    status = 0
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+        await asyncio.sleep(3600)  # ไม่มี disconnect ระหว่าง benchmark
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(dict(scope, state={}), receive, send)
+    return status
+
+
+async def run(app, scope: dict, requests: int, concurrency: int) -> float:
+    """คืน req/s (ยิงทีละ batch ขนาด concurrency)"""
+    for _ in range(200):  # warm up
+        assert await call(app, scope) == 200
+    started = time.perf_counter()
+    done = 0
+    while done < requests:
+        batch = min(concurrency, requests - done)
+        statuses = await asyncio.gather(*(call(app, scope) for _ in range(batch)))
+        assert all(status == 200 for status in statuses), statuses
+        done += batch
+    return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    token = create_access_token({"sub": "1"})
+    csrf = jwt.decode(token, settings.jwt_secret_key, algorithms=["HS256"])["csrf_token"]
+    scope = build_scope(token, csrf)
+
+    variants = [
+        ("none", build_app(None)),
+        ("BaseHTTPMiddleware", build_app(LegacyJWTAndCSRFMiddleware)),
+        ("pure ASGI", build_app(JWTAndCSRFMiddleware)),
+    ]
+    results = {name: await run(app, scope, args.requests, args.concurrency) for name, app in variants}
+
+    baseline_us = 1e6 / results["none"]
+    print(f"requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'middleware':<20} {'req/s':>10} {'us/req':>9} {'overhead us':>12}")
+    print("-" * 54)
+    for name, rps in results.items():
+        per_request_us = 1e6 / rps
+        print(f"{name:<20} {rps:>10.0f} {per_request_us:>9.1f} {per_request_us - baseline_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
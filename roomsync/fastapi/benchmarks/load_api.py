@@ -0,0 +1,303 @@
+"""
+Load test ของ API หลัก: p50/p99 latency + req/s ต่อ endpoint เขียนผลเป็น JSON (เทียบกับ baseline ได้)
+
+    python benchmarks/seed.py --scale 0.01                      # seed ก่อน (ครั้งเดียว)
+    python benchmarks/load_api.py --output bench.json
+    python benchmarks/load_api.py --baseline bench.json --max-regression 0.2   # exit 1 ถ้าช้าลงเกิน 20%
+    python benchmarks/load_api.py --scenarios get_room,create_booking --requests 2000 --concurrency 50
+    python benchmarks/load_api.py --base-url http://localhost:8000   # ยิง server จริง (DATABASE_URL ต้องชี้ DB เดียวกัน)
+
+ค่าเริ่มต้นยิงเข้า ASGI app ใน process เดียวกัน (httpx.ASGITransport ไม่ผ่าน network)
+ข้อมูลตัวอย่าง (room / profile / auth user) อ่านจาก DATABASE_URL ที่ seed ไว้ (benchmarks/seed.py)
+create_booking ใช้ช่วงเวลาหลัง booking ที่ seed ไว้ ไล่ห้องละ 1 slot → ไม่ชนกัน (ตอบ 201 ทุกครั้ง)
+auth ใช้ bcrypt จริงตาม BCRYPT_ROUNDS (login/register ช้ากว่า endpoint อื่นเป็นเรื่องปกติ)
+google_auth ต้องเปิด OAUTH_STUB_PROVIDER (เปิดให้เองเมื่อยิงใน process)
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/roomsync_bench.db"
+os.environ.setdefault("OAUTH_STUB_PROVIDER", "true")
+os.environ["GOOGLE_CLIENT_ID"] = os.getenv("GOOGLE_CLIENT_ID") or "bench-client"
+os.environ["GOOGLE_CLIENT_SECRET"] = os.getenv("GOOGLE_CLIENT_SECRET") or "bench-secret"
+
+import logging  # noqa: E402
+
+import httpx  # noqa: E402
+from jose import jwt  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.db import engine  # noqa: E402
+from app.models import Profile, Room  # noqa: E402
+from app.models.authuser import AuthUser  # noqa: E402
+from app.routers.auth import create_access_token  # noqa: E402
+from benchmarks.seed import ADMIN_AUTH_USER_ID, BENCH_PASSWORD, counts, seed_end  # noqa: E402
+
+API = "/api/v1"
+SAMPLE_SIZE = 1000
+
+
+@dataclass
+class Context:
+    room_ids: List[str]
+    profile_ids: List[str]
+    auth_users: List[tuple]  # (id, email)
+    booking_start: datetime
+    run_id: str
+    headers: Dict[str, str]
+    jwt: str
+
+
+@dataclass
+class Scenario:
+    name: str
+    expected: int
+    build: Callable[[Context, int], dict]  # i → kwargs ของ client.request
+
+
+def _admin_headers(ctx: Context) -> dict:
+    return {**ctx.headers, "X-Auth-User-ID": str(ADMIN_AUTH_USER_ID)}
+
+
+def _create_booking(ctx: Context, i: int) -> dict:
+    # ห้อง i % n, slot ที่ i // n ของห้องนั้น → ทุก request ได้ช่วงเวลาที่ยังว่าง
+    rooms = len(ctx.room_ids)
+    start = ctx.booking_start + timedelta(hours=i // rooms)
+    return {
+        "method": "POST",
+        "url": f"{API}/bookings/",
+        "params": {"user_id": ctx.profile_ids[i % len(ctx.profile_ids)]},
+        "json": {
+            "room_id": ctx.room_ids[i % rooms],
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=30)).isoformat(),
+        },
+        "headers": ctx.headers,
+    }
+
+
+def _login(ctx: Context, i: int) -> dict:
+    _, email = ctx.auth_users[i % len(ctx.auth_users)]
+    return {
+        "method": "POST",
+        "url": "/login/email",
+        "data": {"username": email, "password": BENCH_PASSWORD},
+    }
+
+
+def _me(ctx: Context, i: int) -> dict:
+    user_id, email = ctx.auth_users[i % len(ctx.auth_users)]
+    token = create_access_token({"sub": str(user_id), "email": email})
+    return {"method": "GET", "url": "/me", "jwt": token}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("get_rooms_status_overview", 200, lambda ctx, i: {"method": "GET", "url": f"{API}/rooms/status"}),
+        Scenario("get_room", 200, lambda ctx, i: {
+            "method": "GET", "url": f"{API}/rooms/{ctx.room_ids[i % len(ctx.room_ids)]}",
+        }),
+        Scenario("get_rooms_with_equipments", 200, lambda ctx, i: {
+            "method": "GET", "url": f"{API}/rooms/",
+            "params": {"limit": 100, "include": "equipments,open_damage_reports"},
+        }),
+        Scenario("get_all_bookings", 200, lambda ctx, i: {"method": "GET", "url": f"{API}/bookings/", "params": {"limit": 100}}),
+        Scenario("get_all_bookings_by_room", 200, lambda ctx, i: {
+            "method": "GET", "url": f"{API}/bookings/",
+            "params": {"limit": 100, "room_id": ctx.room_ids[i % len(ctx.room_ids)]},
+        }),
+        Scenario("get_all_profiles", 200, lambda ctx, i: {
+            "method": "GET", "url": f"{API}/profiles/", "params": {"limit": 100}, "headers": _admin_headers(ctx),
+        }),
+        Scenario("create_booking", 201, _create_booking),
+        Scenario("auth_me", 200, _me),
+        Scenario("auth_login_email", 200, _login),
+        Scenario("auth_register", 200, lambda ctx, i: {
+            "method": "POST", "url": "/register",
+            "json": {"email": f"load-{ctx.run_id}-{i}@example.com", "password": BENCH_PASSWORD, "name": "Load"},
+        }),
+        Scenario("auth_google_callback", 307, lambda ctx, i: {
+            "method": "GET", "url": "/google/auth", "params": {"code": f"load{ctx.run_id}{i % 200}"},
+        }),
+    )
+}
+# bcrypt ~250ms ต่อ request → ยิงน้อยกว่าตัวอื่นโดยอัตโนมัติ (--requests / AUTH_REQUEST_DIVISOR)
+AUTH_REQUEST_DIVISOR = {"auth_login_email": 10, "auth_register": 10}
+
+
+def load_context() -> Context:
+    if not counts(engine).rooms:
+        raise SystemExit("Database is empty: run `python benchmarks/seed.py` first (same DATABASE_URL)")
+
+    rng = random.Random(7)
+    with engine.connect() as conn:
+        room_ids = [str(r) for r in conn.scalars(select(Room.id).limit(SAMPLE_SIZE * 10))]
+        profile_ids = [str(p) for p in conn.scalars(select(Profile.id).limit(SAMPLE_SIZE * 10))]
+        auth_users = [tuple(row) for row in conn.execute(
+            select(AuthUser.id, AuthUser.email).where(AuthUser.email.like("bench%")).limit(SAMPLE_SIZE)
+        )]
+    token = create_access_token({"sub": str(auth_users[0][0]) if auth_users else "1"})
+    csrf = jwt.decode(token, settings.jwt_secret_key, algorithms=["HS256"])["csrf_token"]
+
+    # เริ่มหลัง booking สุดท้ายใน DB (รวมที่รอบก่อนสร้างไว้) → รันซ้ำกี่รอบก็ไม่ชน
+    booking_start = max(seed_end(engine), datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+    return Context(
+        room_ids=rng.sample(room_ids, min(len(room_ids), SAMPLE_SIZE)),
+        profile_ids=rng.sample(profile_ids, min(len(profile_ids), SAMPLE_SIZE)),
+        auth_users=auth_users,
+        booking_start=booking_start,
+        run_id=uuid.uuid4().hex[:8],
+        headers={"X-CSRF-Token": csrf},
+        jwt=token,
+    )
+
+
+def request_kwargs(scenario: Scenario, ctx: Context, i: int) -> dict:
+    kwargs = scenario.build(ctx, i)
+    # Cookie header ตรง ๆ ไม่ใช้ cookie jar ของ client (Set-Cookie ของ request อื่นไม่ปนกัน)
+    kwargs["headers"] = {"Cookie": f"jwt={kwargs.pop('jwt', ctx.jwt)}", **kwargs.get("headers", {})}
+    return kwargs
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, max(0, int(round(q * len(values))) - 1))]
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            kwargs = request_kwargs(scenario, ctx, i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(**kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if status != str(scenario.expected):
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(errors.values()),
+        "error_statuses": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> List[str]:
+    """scenario ที่ p99 สูงขึ้นหรือ rps ลดลงเกิน max_regression (สัดส่วน) หรือมี error เพิ่ม"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        if before["p99_ms"] and current["p99_ms"] > before["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p99 {before['p99_ms']}ms -> {current['p99_ms']}ms")
+        if before["rps"] and current["rps"] < before["rps"] * (1 - max_regression):
+            regressions.append(f"{name}: rps {before['rps']} -> {current['rps']}")
+        if current["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {current['errors']}")
+    return regressions
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="คั่นด้วย , (default: ทั้งหมด)")
+    parser.add_argument("--requests", type=int, default=500, help="ต่อ scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-url", help="ยิง server จริงแทน ASGI app ใน process")
+    parser.add_argument("--output", help="เขียนผลเป็น JSON")
+    parser.add_argument("--baseline", help="JSON จากรอบก่อน เทียบแล้ว exit 1 ถ้าช้าลงเกิน --max-regression")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    ctx = load_context()
+    seeded = counts(engine)
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        from app import fastapi_app
+
+        transport, base_url = httpx.ASGITransport(app=fastapi_app), "http://bench"
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.base_url or "in-process",
+            "database": engine.url.render_as_string(hide_password=True),
+            "db_async": settings.db_async,
+            "python": platform.python_version(),
+            "seeded": {"rooms": seeded.rooms, "profiles": seeded.profiles, "bookings": seeded.bookings},
+        },
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<28} {'req':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    print("-" * 70)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        for name in names:
+            requests = max(args.requests // AUTH_REQUEST_DIVISOR.get(name, 1), 1)
+            r = await run_scenario(client, ctx, SCENARIOS[name], requests, args.concurrency)
+            results["scenarios"][name] = r
+            print(f"{name:<28} {r['requests']:>6} {r['errors']:>5} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nresults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.max_regression)
+        if regressions:
+            print(f"\nREGRESSIONS (> {args.max_regression:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nno regressions against {args.baseline} (> {args.max_regression:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,133 @@
+"""
+Load test: event loop ยังว่างอยู่ไหมระหว่าง OAuth callback กำลัง query/commit AuthUser
+
+    python benchmarks/load_auth_event_loop.py
+    python benchmarks/load_auth_event_loop.py --callbacks 50 --db-latency-ms 40
+
+ยิง GET /google/auth?code=... พร้อมกันหลายตัว (OAUTH_STUB_PROVIDER, ไม่ออก network)
+แต่ละ statement ของ DB ถูกหน่วงด้วย time.sleep (จำลอง round trip ไป Postgres)
+ระหว่างนั้นมี ticker ตื่นทุก 5ms วัดว่า event loop ช้ากว่าที่ควรเท่าไร (loop lag)
+
+เทียบ 2 แบบ:
+- inline      : Session ปกติเรียกตรงบน event loop (แบบเดิมก่อนย้ายไป get_async_db)
+- get_async_db: ThreadpoolSession (DB_ASYNC=false) → DB วิ่งบน threadpool
+(DB_ASYNC=true ต้องวัดกับ Postgres จริง เพราะ latency ของ asyncpg เป็น I/O ไม่ใช่ time.sleep)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/load_auth_event_loop.db"
+os.environ["GOOGLE_CLIENT_ID"] = os.getenv("GOOGLE_CLIENT_ID") or "bench-client"
+os.environ["GOOGLE_CLIENT_SECRET"] = os.getenv("GOOGLE_CLIENT_SECRET") or "bench-secret"
+os.environ["DB_ASYNC"] = "false"
+os.environ["OAUTH_STUB_PROVIDER"] = "true"
+
+import logging  # noqa: E402
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import fastapi_app  # noqa: E402
+from app.db import Base, SessionLocal, engine, get_async_db  # noqa: E402
+
+
+class InlineSession:
+    """Session ปกติห่อด้วย API แบบ await แต่ทำงานบน event loop ตรง ๆ (พฤติกรรมเดิม)"""
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def scalar(self, statement, params=None, **kw):
+        return self.sync_session.scalar(statement, params, **kw)
+
+    async def get(self, entity, ident, **kw):
+        return self.sync_session.get(entity, ident, **kw)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def refresh(self, instance, attribute_names=None):
+        self.sync_session.refresh(instance, attribute_names)
+
+
+async def inline_db():
+    session = SessionLocal()
+    try:
+        yield InlineSession(session)
+    finally:
+        session.close()
+
+
+async def run(callbacks: int, offset: int) -> dict:
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        interval = 0.005
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    transport = httpx.ASGITransport(app=fastapi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tick = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.get("/google/auth", params={"code": str(offset + i)}) for i in range(callbacks)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await tick
+
+    failed = [r for r in responses if r.status_code != 307 or "login-failed" in r.headers.get("location", "")]
+    assert not failed, f"{len(failed)} callbacks failed"
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callbacks", type=int, default=30)
+    parser.add_argument("--db-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    Base.metadata.create_all(bind=engine)
+    latency = args.db_latency_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _simulate_latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency)
+
+    print(f"callbacks={args.callbacks} db_latency={args.db_latency_ms}ms per statement")
+    print(f"{'session':<14} {'elapsed s':>10} {'lag p50 ms':>11} {'lag p99 ms':>11} {'lag max ms':>11}")
+    print("-" * 61)
+    for offset, (name, override) in enumerate((("inline", inline_db), ("get_async_db", None))):
+        if override:
+            fastapi_app.dependency_overrides[get_async_db] = override
+        else:
+            fastapi_app.dependency_overrides.pop(get_async_db, None)
+        r = await run(args.callbacks, offset * args.callbacks)
+        print(f"{name:<14} {r['elapsed_s']:>10.2f} {r['lag_p50_ms']:>11.1f} {r['lag_p99_ms']:>11.1f} {r['lag_max_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,184 @@
+"""
+Seed DB สำหรับ benchmark / load test (bulk insert ผ่าน Core ไม่สร้าง ORM object)
+
+    python benchmarks/seed.py                      # 10k rooms, 100k profiles, 1M bookings
+    python benchmarks/seed.py --scale 0.01         # 100 rooms, 1k profiles, 10k bookings
+    DATABASE_URL=postgresql://... python benchmarks/seed.py --scale 0.1
+
+ข้อมูลที่ได้ (ค่าเดิมทุกครั้งตาม --seed):
+- rooms/equipments/profiles/bookings/damage_reports จาก app/services/synthetic_data.py
+  (เหมือน `python -m app.cli generate-data`) booking ไม่ทับกันในห้องเดียวกัน เริ่มที่ SEED_START
+- auth_users สำหรับ login (รหัสผ่านเดียวกันทุกคน = BENCH_PASSWORD, hash ครั้งเดียว)
+- admin profile ที่ auth_user_id = ADMIN_AUTH_USER_ID (ใช้เป็น X-Auth-User-ID)
+DB มีข้อมูลอยู่แล้ว (มี rooms) → ไม่ seed ซ้ำ ใช้ --reset เพื่อล้างแล้วสร้างใหม่
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.gettempdir()}/roomsync_bench.db"
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db import Base  # noqa: E402
+from app.models import Booking, Profile, Room  # noqa: E402
+from app.models.authuser import AuthUser  # noqa: E402
+from app.services.room_equipment_summary import ensure_summary_columns  # noqa: E402
+from app.services.synthetic_data import generate  # noqa: E402
+
+ROOMS = 10_000
+PROFILES = 100_000
+BOOKINGS = 1_000_000
+AUTH_USERS = 1_000
+EQUIPMENTS = 50
+DAMAGE_REPORTS = 20_000
+
+BENCH_PASSWORD = "bench-password"
+# มีตัวอักษรในค่า hex: SQLite แปลง column UUID ที่เป็นตัวเลขล้วนเป็น number
+ADMIN_AUTH_USER_ID = uuid.UUID("adadadad-0000-4000-8000-000000000001")
+# booking ที่ seed อยู่ก่อนเวลานี้ทั้งหมด → create_booking ใน load test ใช้ช่วงหลังจากนี้ไม่ชน
+SEED_START = datetime(2025, 1, 6, 8, tzinfo=timezone.utc)
+
+BATCH = 10_000
+
+
+@dataclass
+class SeedInfo:
+    rooms: int
+    profiles: int
+    bookings: int
+    auth_users: int
+    seconds: float = 0.0
+
+
+def auth_email(i: int) -> str:
+    return f"bench{i}@example.com"
+
+
+def _insert(engine: Engine, table, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            with engine.begin() as conn:
+                conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+
+
+def counts(engine: Engine) -> SeedInfo:
+    with engine.connect() as conn:
+        return SeedInfo(
+            rooms=conn.scalar(select(func.count()).select_from(Room)),
+            profiles=conn.scalar(select(func.count()).select_from(Profile)),
+            bookings=conn.scalar(select(func.count()).select_from(Booking)),
+            auth_users=conn.scalar(select(func.count()).select_from(AuthUser)),
+        )
+
+
+def seed_database(
+    engine: Engine,
+    rooms: int = ROOMS,
+    profiles: int = PROFILES,
+    bookings: int = BOOKINGS,
+    auth_users: int = AUTH_USERS,
+    seed: int = 42,
+    reset: bool = False,
+) -> SeedInfo:
+    if reset:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    ensure_summary_columns(engine)
+    existing = counts(engine)
+    if existing.rooms:
+        return existing
+
+    from app.services.password_hashing import pwd_context
+
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    generate(
+        engine,
+        rooms=rooms,
+        equipments=EQUIPMENTS,
+        profiles=profiles,
+        bookings=bookings,
+        damage_reports=DAMAGE_REPORTS * rooms // ROOMS,
+        seed=seed,
+        start=SEED_START.date(),
+        batch_size=BATCH,
+    )
+    _insert(engine, Profile.__table__, [{
+        "id": uuid.uuid4(),
+        "auth_user_id": ADMIN_AUTH_USER_ID,
+        "first_name": "Bench",
+        "last_name": "Admin",
+        "role": "admin",
+        "created_at": now,
+        "updated_at": now,
+    }])
+
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+    _insert(engine, AuthUser.__table__, (
+        {"email": auth_email(i), "name": f"Bench {i}", "password_hash": password_hash}
+        for i in range(1, auth_users + 1)
+    ))
+
+    info = counts(engine)
+    info.seconds = time.perf_counter() - started
+    return info
+
+
+def seed_end(engine: Engine) -> datetime:
+    """เวลาสิ้นสุดของ booking สุดท้ายที่ seed (create_booking ใน load test เริ่มหลังจากนี้)"""
+    with engine.connect() as conn:
+        last = conn.scalar(select(func.max(Booking.end_time)))
+    if last is None:
+        return SEED_START
+    if last.tzinfo is None:
+        last = last.replace(tzinfo=timezone.utc)
+    return last + timedelta(days=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="คูณจำนวน rooms/profiles/bookings")
+    parser.add_argument("--auth-users", type=int, default=AUTH_USERS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop ทุกตารางแล้ว seed ใหม่")
+    args = parser.parse_args()
+
+    from app.db import engine
+
+    print(f"DATABASE_URL={engine.url.render_as_string(hide_password=True)}")
+    info = seed_database(
+        engine,
+        rooms=max(int(ROOMS * args.scale), 1),
+        profiles=max(int(PROFILES * args.scale), 1),
+        bookings=int(BOOKINGS * args.scale),
+        auth_users=args.auth_users,
+        seed=args.seed,
+        reset=args.reset,
+    )
+    if info.seconds:
+        print(f"seeded in {info.seconds:.1f}s: ", end="")
+    else:
+        print("already seeded (use --reset to recreate): ", end="")
+    print(f"{info.rooms} rooms, {info.profiles} profiles, {info.bookings} bookings, {info.auth_users} auth users")
+
+
+if __name__ == "__main__":
+    main()
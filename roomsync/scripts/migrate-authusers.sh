@@ -1,11 +1,11 @@
 #!/bin/bash
-# Scripts to run AuthUser migration from Supabase to local database
+# Scripts to copy all tables from Supabase to the local database
 
 set -e
 
 CONTAINER_NAME="${1:-roomsync_fastapi_1}"
 
-echo "🔄 Migrating AuthUser data..."
+echo "🔄 Migrating Supabase data..."
 echo "Container: $CONTAINER_NAME"
 echo ""
 
@@ -19,7 +19,7 @@ if ! docker ps -a --format '{{.Names}}' | grep -q "^${CONTAINER_NAME}$"; then
 fi
 
 # Run migration
-docker exec -it "$CONTAINER_NAME" python /app/migrate_authusers.py
+docker exec -it "$CONTAINER_NAME" python /app/migrate_supabase.py "${@:2}"
 
 echo ""
 echo "Done! Check migration results above."
@@ -65,6 +65,34 @@ CREATE TABLE IF NOT EXISTS bookings (
     updated_by UUID
 );
 
+-- Create booking_series table (recurring bookings, occurrences expanded on read)
+CREATE TABLE IF NOT EXISTS booking_series (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    room_id UUID NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    freq TEXT NOT NULL DEFAULT 'weekly',
+    interval INTEGER NOT NULL DEFAULT 1,
+    count INTEGER,
+    until TIMESTAMPTZ,
+    ends_at TIMESTAMPTZ NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    created_by UUID,
+    updated_by UUID
+);
+
+-- Create room_busy_slots table (per-room, per-day 15-minute free/busy bitmap)
+CREATE TABLE IF NOT EXISTS room_busy_slots (
+    room_id UUID NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    mask BYTEA NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (room_id, day)
+);
+
 -- Create damage_reports table
 CREATE TABLE IF NOT EXISTS damage_reports (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -108,6 +136,18 @@ CREATE TABLE IF NOT EXISTS private_contacts (
     updatedAt TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Equipment summary per room (kept up to date by the API, see app/services/room_equipment_summary.py;
+-- repair with: python -m app.cli reconcile-room-equipment)
+ALTER TABLE rooms ADD COLUMN IF NOT EXISTS equipment_types INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE rooms ADD COLUMN IF NOT EXISTS equipment_total INTEGER NOT NULL DEFAULT 0;
+UPDATE rooms r SET equipment_types = s.types, equipment_total = s.total
+FROM (
+    SELECT rooms.id, COUNT(re.id) AS types, COALESCE(SUM(re.quantity), 0) AS total
+    FROM rooms LEFT JOIN room_equipments re ON re.room_id = rooms.id
+    GROUP BY rooms.id
+) s
+WHERE r.id = s.id AND (r.equipment_types <> s.types OR r.equipment_total <> s.total);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_rooms_status ON rooms(status);
 CREATE INDEX IF NOT EXISTS idx_profiles_auth_user_id ON profiles(auth_user_id);
@@ -120,6 +160,21 @@ CREATE INDEX IF NOT EXISTS idx_bookings_room_id ON bookings(room_id);
 CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
 CREATE INDEX IF NOT EXISTS idx_bookings_start_time ON bookings(start_time);
 CREATE INDEX IF NOT EXISTS idx_bookings_end_time ON bookings(end_time);
+CREATE INDEX IF NOT EXISTS ix_bookings_room_status_time ON bookings(room_id, status, start_time, end_time);
+CREATE INDEX IF NOT EXISTS ix_booking_series_room_status_time ON booking_series(room_id, status, start_time, ends_at);
+-- keyset pagination (ORDER BY <sort column>, id)
+CREATE INDEX IF NOT EXISTS ix_bookings_start_time_id ON bookings(start_time, id);
+CREATE INDEX IF NOT EXISTS ix_booking_series_start_time_id ON booking_series(start_time, id);
+CREATE INDEX IF NOT EXISTS ix_damage_reports_created_at_id ON damage_reports(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_profiles_created_at_id ON profiles(created_at, id);
+-- Incremental sync high-water mark (app/services/db_sync.py)
+CREATE INDEX IF NOT EXISTS ix_rooms_updated_at_id ON rooms(updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_equipments_updated_at_id ON equipments(updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_profiles_updated_at_id ON profiles(updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_bookings_updated_at_id ON bookings(updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_booking_series_updated_at_id ON booking_series(updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_damage_reports_updated_at_id ON damage_reports(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_room_busy_slots_day ON room_busy_slots(day);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -136,6 +191,7 @@ CREATE TRIGGER update_equipments_updated_at BEFORE UPDATE ON equipments FOR EACH
 CREATE TRIGGER update_profiles_updated_at BEFORE UPDATE ON profiles FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_damage_reports_updated_at BEFORE UPDATE ON damage_reports FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_bookings_updated_at BEFORE UPDATE ON bookings FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+CREATE TRIGGER update_booking_series_updated_at BEFORE UPDATE ON booking_series FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
 -- Add trigger for private_contacts updatedAt
 CREATE OR REPLACE FUNCTION update_updated_at_private_contacts()